@@ -1,5 +1,11 @@
+import time
+
 from mesa import Agent
-import heapq
+
+from replanning import DStarLite
+
+# Extra cost of moving into a cell with another robot when repairing a path
+ROBOT_COST = 3
 
 class RandomAgent(Agent):
     """
@@ -12,6 +18,11 @@ class RandomAgent(Agent):
         returning_home: Flag to indicate if the agent is returning to the charging station
         visited_cells: Set of cells visited by the agent and their neighbors
         path_home: List of positions representing the path back to the charging station
+        path_index: Index of the agent's current cell in path_home
+        planner: DStarLite repairing path_home while the agent returns home
+        frontier_target: Uncovered cell the agent is heading to in "frontier" exploration
+        frontier_path: Remaining cells to frontier_target, last one is the next move
+        trash_path: Remaining cells to the trash the dispatcher assigned, last one is the next move
     """
     def __init__(self, unique_id, model, energy=100):
         super().__init__(unique_id, model)
@@ -21,67 +32,29 @@ class RandomAgent(Agent):
         self.returning_home = False
         self.visited_cells = set()
         self.path_home = []
+        self.path_index = 0
+        self.planner = None
+        self.frontier_target = None
+        self.frontier_path = []
+        self.trash_path = []
 
     def heuristic(self, a, b):
         """
-        Heuristic function for A* (Manhattan distance) or staircase distance to home.
+        Manhattan (staircase) distance, used as the distance to home when the
+        navigation field has no path.
         """
         (x1, y1) = a
         (x2, y2) = b
         return abs(x1 - x2) + abs(y1 - y2)
 
     def a_star_search(self, start, goal):
-        # G4G A* info and algorithm: https://www.geeksforgeeks.org/a-search-algorithm-in-python/
         """
         Perform A* search from start to goal.
         start: current position when calculating the path
         goal: charging station to reach
+        Uses the model's shared GridSearch (array backed, Chebyshev heuristic).
         """
-        open_set = []
-        heapq.heappush(open_set, (0, start))
-        came_from = {}
-        # g_score is the cost of the cheapest path from start to the current cell
-        g_score = {start: 0}
-        # f_score is the sum of g_score and the heuristic function (Manhattan distance)
-        f_score = {start: self.heuristic(start, goal)}
-        visited = set()
-
-        while open_set:
-            current = heapq.heappop(open_set)[1]
-            if current == goal:
-                return self.reconstruct_path(came_from, current)
-
-            visited.add(current)
-            neighbors = self.model.grid.get_neighborhood(current, moore=True, include_center=False)
-
-            for neighbor in neighbors:
-                if neighbor in visited:
-                    continue
-                # Check if neighbor is a free cell (not an obstacle)
-                cell_contents = self.model.grid.get_cell_list_contents(neighbor)
-                if any(isinstance(obj, ObstacleAgent) for obj in cell_contents):
-                    continue  # Skip obstacles
-
-                tentative_g_score = g_score[current] + 1  # movement energy cost is 1
-
-                if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g_score
-                    f_score[neighbor] = tentative_g_score + self.heuristic(neighbor, goal)
-                    heapq.heappush(open_set, (f_score[neighbor], neighbor))
-
-        return None  # No path found
-
-    def reconstruct_path(self, came_from, current):
-        """
-        Reconstruct the path from start to goal.
-        """
-        path = [current]
-        while current in came_from:
-            current = came_from[current]
-            path.append(current)
-        path.reverse()
-        return path
+        return self.model.pathfinder.search(start, goal)
 
     def move_randomly(self):
         """
@@ -93,20 +66,13 @@ class RandomAgent(Agent):
             include_center=False
         )
 
-        free_spaces = []
-        for pos in possible_steps:
-            # Get the contents of each cell in the neighborhood
-            cell_contents = self.model.grid.get_cell_list_contents(pos)
-            has_obstacle = any(isinstance(obj, ObstacleAgent) for obj in cell_contents)
-            has_agent = any(isinstance(obj, RandomAgent) for obj in cell_contents)
-            # If there is no obstacle and no agent in the cell, add it to the list
-            if not has_obstacle and not has_agent:
-                free_spaces.append(pos)
+        # Keep the cells with no obstacle and no agent in them
+        grid = self.model.grid
+        free_spaces = [pos for pos in possible_steps if grid.is_free(pos)]
 
         if free_spaces:
             # Record the current position and its neighbors
-            self.visited_cells.add(self.pos)
-            self.visited_cells.update(possible_steps)
+            self.record_visit(possible_steps)
 
             # Move to a random free space
             next_move = self.random.choice(free_spaces)
@@ -129,29 +95,103 @@ class RandomAgent(Agent):
             include_center=False
         )
 
-        # Search for trash in the neighborhood
-        trash_cells = []
-        for pos in possible_steps:
-            cell_contents = self.model.grid.get_cell_list_contents(pos)
-            if any(isinstance(obj, TrashAgent) for obj in cell_contents):
-                has_agent = any(isinstance(obj, RandomAgent) for obj in cell_contents)
-                if not has_agent:
-                    trash_cells.append(pos)
+        # Search for trash in the neighborhood (without another agent on it)
+        grid = self.model.grid
+        trash_cells = [pos for pos in possible_steps if grid.trash[pos] and not grid.robots[pos]]
+        dispatcher = self.model.dispatcher
+        if dispatcher is not None:
+            # Leave the trash the dispatcher gave to other agents to them
+            trash_cells = [pos for pos in trash_cells if not dispatcher.is_reserved(pos, self)]
 
         if trash_cells:
             # Record the current position and its neighbors
-            self.visited_cells.add(self.pos)
-            self.visited_cells.update(possible_steps)
+            self.record_visit(possible_steps)
 
             # Move to the trash
             next_move = self.random.choice(trash_cells)
             self.model.grid.move_agent(self, next_move)
             self.steps_taken += 1
             self.energy -= 1
+        elif dispatcher is not None and dispatcher.target(self) is not None:
+            # Head to the trash the dispatcher assigned
+            self.move_to_trash(dispatcher.target(self), possible_steps)
+        elif self.model.exploration == "frontier":
+            # Head to the nearest cell the fleet has not covered yet
+            self.move_to_frontier(possible_steps)
         else:
             # Move randomly
             self.move_randomly()
 
+    def record_visit(self, possible_steps):
+        """
+        Record the current position and its neighbors, in the agent's visited
+        cells and in the model's shared coverage map.
+        """
+        self.visited_cells.add(self.pos)
+        self.visited_cells.update(possible_steps)
+        self.model.coverage.mark_seen(self.pos)
+
+    def move_to_frontier(self, possible_steps):
+        """
+        Moves one cell along the shortest path to the nearest frontier cell
+        (not covered by any agent and not claimed by another one). Falls back
+        to a random move when another agent is in the way or nothing is left
+        to explore.
+        """
+        coverage = self.model.coverage
+        coverage.mark_seen(self.pos)
+
+        target = self.frontier_target
+        if target is None or not coverage.is_frontier(target) or not self.frontier_path:
+            path = coverage.nearest_frontier(self)
+            if path is None:
+                # Everything reachable is covered
+                coverage.release(self)
+                self.move_randomly()
+                return
+            coverage.claim(self, path[-1])
+            self.frontier_path = path[:0:-1]  # reversed, without the current cell
+
+        if not self.follow_path(self.frontier_path, possible_steps):
+            # Another agent is in the way, plan again next step
+            self.frontier_path = []
+            self.move_randomly()
+
+    def move_to_trash(self, target, possible_steps):
+        """
+        Moves one cell along the shortest path to target (the trash assigned by
+        the model's dispatcher), re-planning with A* when the target changed.
+        """
+        if not self.trash_path or self.trash_path[0] != target:
+            path = self.a_star_search(self.pos, target)
+            if path is None or len(path) < 2:
+                self.model.dispatcher.release(self)
+                self.trash_path = []
+                self.move_randomly()
+                return
+            self.trash_path = path[:0:-1]  # reversed, without the current cell
+
+        if not self.follow_path(self.trash_path, possible_steps):
+            # Another agent is in the way, plan again next step
+            self.trash_path = []
+            self.move_randomly()
+
+    def follow_path(self, path, possible_steps):
+        """
+        Move to the last cell of path (a reversed path) and drop it.
+        Returns False without moving if the cell is not free.
+        """
+        next_move = path[-1]
+        if not self.model.grid.is_free(next_move):
+            return False
+
+        self.record_visit(possible_steps)
+        self.model.grid.move_agent(self, next_move)
+        path.pop()
+        self.steps_taken += 1
+        self.energy -= 1
+        return True
+
     def step(self):
         """ 
         Agent's behavior at each step.
@@ -165,18 +205,25 @@ class RandomAgent(Agent):
             self.home = self.pos
 
         # Check if the agent needs to return home
-        distance_to_home = self.heuristic(self.pos, self.home)
+        # (true path length, read from the model's shared distance field)
+        navigation = self.model.navigation
+        distance_to_home = navigation.distance(self.home, self.pos)
+        if distance_to_home is None:
+            distance_to_home = self.heuristic(self.pos, self.home)
         buffer = 5  # Extra energy units as buffer for wiggle room
         # if im not returning home and my energy is less than the distance to home + buffer
         if not self.returning_home and self.energy <= distance_to_home + buffer:
             # Start returning home
             self.returning_home = True
-            # calculate poath with current knowledge
-            self.path_home = self.a_star_search(self.pos, self.home)
+            self.model.coverage.release(self)
+            if self.model.dispatcher is not None:
+                self.model.dispatcher.release(self)
+            # follow the distance field home, no search needed
+            self.path_home = navigation.path(self.pos, self.home)
+            self.path_index = 0
             if self.path_home is None:
                 # No path found, cannot return home
-                self.returning_home = False
-                self.path_home = []
+                self.stop_returning()
                 return
 
         if self.returning_home:
@@ -186,84 +233,116 @@ class RandomAgent(Agent):
                     self.energy = min(self.energy + 5, 100)  # Recharge 5% per step
                 else:
                     # Fully charged, go wander
-                    self.returning_home = False
-                    self.path_home = []
+                    self.stop_returning()
                 return  # Stay on the charging station
             else:
                 # Follow the path home
-                if len(self.path_home) > 1:
-                    next_move = self.path_home[1]  # Next position in the path
+                if self.path_index + 1 < len(self.path_home):
+                    next_move = self.path_home[self.path_index + 1]  # Next position in the path
                     # Check if next_move is accessible
-                    cell_contents = self.model.grid.get_cell_list_contents(next_move)
-                    if any(isinstance(obj, ObstacleAgent) for obj in cell_contents):
-                        # Path is blocked, need to recalculate
-                        self.path_home = self.a_star_search(self.pos, self.home)
-                        if self.path_home is None:
+                    grid = self.model.grid
+                    if grid.obstacles[next_move] or grid.robots[next_move]:
+                        # Path is blocked, repair it
+                        if not self.replan_home():
                             # No path found, cannot return home
-                            self.returning_home = False
-                            self.path_home = []
+                            self.stop_returning()
                             return
-                        else:
-                            next_move = self.path_home[1]
+                        next_move = self.path_home[self.path_index + 1]
                     # Move to next cell
                     self.model.grid.move_agent(self, next_move)
-                    self.path_home = self.path_home[1:]
+                    self.path_index += 1
                     self.steps_taken += 1
                     self.energy -= 1
                 else:
                     # Path exhausted but not at home
-                    self.returning_home = False
-                    self.path_home = []
+                    self.stop_returning()
         else:
             # Normal behavior
-            cell_contents = self.model.grid.get_cell_list_contents([self.pos])
-            trash = [obj for obj in cell_contents if isinstance(obj, TrashAgent)]
-
-            if trash:
+            trash = self.model.schedule.passive_at(TrashAgent, self.pos)
+            if trash is not None:
                 # Record the current position and its neighbors
                 possible_steps = self.model.grid.get_neighborhood(
                     self.pos,
                     moore=True,
                     include_center=False
                 )
-                self.visited_cells.add(self.pos)
-                self.visited_cells.update(possible_steps)
+                self.record_visit(possible_steps)
 
                 # Remove the trash
-                self.model.grid.remove_agent(trash[0])
-                self.model.schedule.remove(trash[0])
+                self.model.remove_trash(trash)
                 self.steps_taken += 1
                 self.energy -= 1
             else:
                 self.move()
 
-class ObstacleAgent(Agent):
+    def stop_returning(self):
+        self.returning_home = False
+        self.path_home = []
+        self.path_index = 0
+        self.planner = None
+
+    def replan_home(self):
+        """
+        Repair the path home around the robots next to the agent, which cost
+        ROBOT_COST extra to move into (they will likely have moved on later).
+        The D* Lite search is kept while the agent returns, so each repair only
+        expands the cells around what changed. A detour the energy left cannot
+        pay for is dropped for the shortest path (through the robots).
+        Returns False if home cannot be reached.
+        """
+        model = self.model
+        start = time.perf_counter()
+        grid, navigation = model.grid, model.navigation
+        field = navigation.field(self.home)
+        if self.planner is None or self.planner.field is not field:
+            self.planner = DStarLite(grid, self.home, field)
+        neighborhood = grid.get_neighborhood(self.pos, moore=True, include_center=False)
+        costs = {pos: ROBOT_COST for pos in neighborhood if grid.robots[pos]}
+        path = self.planner.plan(self.pos, costs)
+        if path is not None and len(path) - 1 > self.energy:
+            path = navigation.path(self.pos, self.home)
+
+        model.replans += 1
+        model.planning_time += time.perf_counter() - start
+        if model.profiler is not None:
+            model.profiler.count("replans")
+        if path is None:
+            return False
+        self.path_home = path
+        self.path_index = 0
+        return True
+
+class StaticEntity:
     """
-    Obstacle agent. Just to add obstacles to the grid.
+    Light map entity for things that never act (obstacles, trash, chargers).
+    Uses __slots__ instead of a per instance dict and is never activated; it
+    lives on the grid and in the scheduler's passive index.
+    Attributes:
+        unique_id: Entity's ID
+        model: Model the entity belongs to
+        pos: Position on the grid (set by the grid)
     """
+    __slots__ = ("unique_id", "model", "pos")
+
     def __init__(self, unique_id, model):
-        super().__init__(unique_id, model)
+        self.unique_id = unique_id
+        self.model = model
+        self.pos = None
 
-    def step(self):
-        pass  
+class ObstacleAgent(StaticEntity):
+    """
+    Obstacle agent. Just to add obstacles to the grid.
+    """
+    __slots__ = ()
 
-class TrashAgent(Agent):
+class TrashAgent(StaticEntity):
     """
     Agent that acts as trash on the grid.
     """
-    def __init__(self, unique_id, model):
-        super().__init__(unique_id, model)
-
-    def step(self):
-        pass
+    __slots__ = ()
 
-class ChargingStation(Agent):
+class ChargingStation(StaticEntity):
     """
     Agent that acts as a charging station on the grid.
     """
-    def __init__(self, unique_id, model):
-        super().__init__(unique_id, model)
-
-    def step(self):
-        pass
-
+    __slots__ = ()
@@ -0,0 +1,41 @@
+"""
+Construction time and memory of RandomModel.
+Builds the model at several grid sizes and reports the wall time and the
+peak memory traced by tracemalloc while building it.
+Usage: python bench_construction.py [--sizes 100 300 1000] [--N 15 --M 0.1 --O 0.1]
+"""
+import argparse
+import time
+import tracemalloc
+
+from model import RandomModel
+
+def measure(build):
+    """
+    Returns (seconds, peak MiB) of calling build().
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    model = build()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del model
+    return seconds, peak / 2**20
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 1000])
+    parser.add_argument("--N", type=int, default=15)
+    parser.add_argument("--M", type=float, default=0.1)
+    parser.add_argument("--O", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'seconds':>9} {'peak MiB':>9}")
+    for size in args.sizes:
+        seconds, peak = measure(lambda: RandomModel(args.N, args.M, args.O, size, size, seed=args.seed))
+        print(f"{size:6d} {seconds:9.2f} {peak:9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Steps per second of FleetModel (robots in arrays, batched moves) against
+RandomModel (one RandomAgent per robot) as the fleet grows. The grid grows
+with the fleet so the robot density stays the same. RandomModel is skipped
+above --agents-limit robots.
+Usage: python bench_fleet.py [--N 15 100 1000 10000] [--cells-per-robot 25] [--steps 50]
+"""
+import argparse
+import math
+import time
+import warnings
+
+from fleet import FleetModel
+from model import RandomModel
+
+def time_run(build, steps):
+    """
+    (construction seconds, ms per step) of a model, steps keep going after it stops.
+    """
+    start = time.perf_counter()
+    model = build()
+    built = time.perf_counter()
+    for _ in range(steps):
+        model.step()
+    return built - start, 1000 * (time.perf_counter() - built) / steps
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--N", type=int, nargs="+", default=[15, 100, 1000, 10000])
+    parser.add_argument("--cells-per-robot", type=int, default=25)
+    parser.add_argument("--M", type=float, default=0.1)
+    parser.add_argument("--O", type=float, default=0.1)
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--agents-limit", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    print(f"{'N':>6} {'size':>6} {'model':>8} {'init s':>8} {'ms/step':>9} {'us/robot':>9}")
+    for n in args.N:
+        size = math.ceil(math.sqrt(n * args.cells_per_robot))
+        models = [("fleet", FleetModel)]
+        if n <= args.agents_limit:
+            models.insert(0, ("agents", RandomModel))
+        for name, model_cls in models:
+            build = lambda: model_cls(n, args.M, args.O, size, size, max_steps=args.steps + 1, seed=args.seed)
+            init, ms = time_run(build, args.steps)
+            print(f"{n:6d} {size:6d} {name:>8} {init:8.2f} {ms:9.3f} {1000 * ms / n:9.2f}")
+
+if __name__ == "__main__":
+    main()
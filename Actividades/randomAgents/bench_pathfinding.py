@@ -0,0 +1,112 @@
+"""
+Benchmark for the pathfinding in pathfinding.py.
+Counts the nodes each search expands on random maps at several obstacle
+densities ("O"), comparing the previous dict based A* of RandomAgent
+(Manhattan heuristic), the array based A* and jump point search.
+Usage: python bench_pathfinding.py [--size 200] [--pairs 50] [--seed 0]
+"""
+import argparse
+import heapq
+import random
+import time
+
+import numpy as np
+
+from occupancy import OccupancyGrid
+from navigation import NavigationMap
+from pathfinding import GridSearch, MOORE_OFFSETS
+
+def legacy_a_star(blocked, start, goal):
+    """
+    The dict based A* RandomAgent used before GridSearch, kept here for the
+    comparison. Returns (path, expanded nodes).
+    """
+    width, height = blocked.shape
+    heuristic = lambda a, b: abs(a[0] - b[0]) + abs(a[1] - b[1])
+    open_set = [(0, start)]
+    came_from = {}
+    g_score = {start: 0}
+    visited = set()
+    expanded = 0
+    while open_set:
+        current = heapq.heappop(open_set)[1]
+        if current == goal:
+            path = [current]
+            while current in came_from:
+                current = came_from[current]
+                path.append(current)
+            return path[::-1], expanded
+        visited.add(current)
+        expanded += 1
+        for dx, dy in MOORE_OFFSETS:
+            neighbor = (current[0] + dx, current[1] + dy)
+            if not (0 <= neighbor[0] < width and 0 <= neighbor[1] < height):
+                continue
+            if neighbor in visited or blocked[neighbor]:
+                continue
+            tentative = g_score[current] + 1
+            if neighbor not in g_score or tentative < g_score[neighbor]:
+                came_from[neighbor] = current
+                g_score[neighbor] = tentative
+                heapq.heappush(open_set, (tentative + heuristic(neighbor, goal), neighbor))
+    return None, expanded
+
+def make_map(size, density, seed):
+    grid = OccupancyGrid(size, size, torus=False)
+    rng = np.random.default_rng(seed)
+    grid.obstacles[rng.random((size, size)) < density] = 1
+    grid.obstacle_version += 1
+    return grid
+
+def random_pairs(grid, navigation, count, rng):
+    """
+    Start/goal pairs on free cells that are connected.
+    """
+    free = np.argwhere(grid.obstacles == 0)
+    pairs = []
+    while len(pairs) < count:
+        start = tuple(int(v) for v in free[rng.randrange(len(free))])
+        goal = tuple(int(v) for v in free[rng.randrange(len(free))])
+        if navigation.distance(goal, start) is not None:
+            pairs.append((start, goal))
+    return pairs
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--pairs", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.0, 0.1, 0.2, 0.3, 0.4])
+    args = parser.parse_args()
+
+    print(f"{args.size}x{args.size} maps, {args.pairs} connected pairs per density")
+    print(f"{'O':>5} {'search':>10} {'expanded':>10} {'pushed':>10} {'length':>8} {'ms/search':>10}")
+    for density in args.densities:
+        grid = make_map(args.size, density, args.seed)
+        navigation = NavigationMap(grid)
+        pairs = random_pairs(grid, navigation, args.pairs, random.Random(args.seed))
+        blocked = grid.obstacles > 0
+        search = GridSearch(grid)
+
+        rows = {"legacy": [0, 0, 0, 0.0], "astar": [0, 0, 0, 0.0], "jps": [0, 0, 0, 0.0]}
+        for start, goal in pairs:
+            t = time.perf_counter()
+            path, expanded = legacy_a_star(blocked, start, goal)
+            rows["legacy"][3] += time.perf_counter() - t
+            rows["legacy"][0] += expanded
+            rows["legacy"][2] += len(path) - 1
+            for name, jump in (("astar", False), ("jps", True)):
+                t = time.perf_counter()
+                path = search.search(start, goal, jump=jump)
+                rows[name][3] += time.perf_counter() - t
+                rows[name][0] += search.stats.expanded
+                rows[name][1] += search.stats.pushed
+                rows[name][2] += len(path) - 1
+
+        for name, (expanded, pushed, length, seconds) in rows.items():
+            n = len(pairs)
+            pushed = f"{pushed / n:10.1f}" if name != "legacy" else f"{'-':>10}"
+            print(f"{density:5.2f} {name:>10} {expanded / n:10.1f} {pushed} {length / n:8.1f} {1000 * seconds / n:10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Per step cost of RandomModel as the obstacle and trash densities grow.
+Only the robots are activated, so the time per step should stay roughly
+flat in O and M for a fixed fleet size.
+Usage: python bench_step.py [--size 100] [--N 15] [--steps 100]
+"""
+import argparse
+import time
+
+from model import RandomModel
+
+def time_steps(model, steps):
+    """
+    Mean seconds per model.step() over `steps` steps, after one warm up step
+    (which builds the navigation fields). Steps keep going after the model
+    stops so every cell of the table times the same number of steps.
+    """
+    model.step()
+    start = time.perf_counter()
+    for _ in range(steps):
+        model.step()
+    return (time.perf_counter() - start) / steps
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--N", type=int, default=15)
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--O", type=float, nargs="+", default=[0.0, 0.1, 0.2, 0.4])
+    parser.add_argument("--M", type=float, nargs="+", default=[0.0, 0.1, 0.3, 0.6])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"ms per step, {args.size}x{args.size} grid, N={args.N}")
+    print(f"{'O / M':>7}" + "".join(f"{m:>9.2f}" for m in args.M))
+    for o in args.O:
+        row = []
+        for m in args.M:
+            model = RandomModel(args.N, m, o, args.size, args.size, seed=args.seed)
+            row.append(1000 * time_steps(model, args.steps))
+        print(f"{o:7.2f}" + "".join(f"{ms:9.3f}" for ms in row))
+
+if __name__ == "__main__":
+    main()
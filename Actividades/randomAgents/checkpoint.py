@@ -0,0 +1,217 @@
+"""
+Checkpoint and restore for RandomModel runs.
+The file format (a JSON header plus memory-mapped arrays) is in the shared
+checkpoint_file.py. Restored runs continue exactly like the uninterrupted
+run (same RNG state, activation order and collected data).
+Usage:
+    checkpoint.save(model, "warm.ckpt")
+    model = checkpoint.restore("warm.ckpt")
+"""
+import os
+import sys
+
+import numpy as np
+
+# Modules shared with the other projects are in the repo's shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "shared"))
+from agent import RandomAgent, ObstacleAgent, TrashAgent, ChargingStation
+from checkpoint_file import read_checkpoint, rng_state, set_rng_state, write_checkpoint
+from exploration import CoverageMap
+from model import RandomModel
+
+def positions(entities):
+    """
+    (k, 3) int64 array of unique_id, x, y.
+    """
+    return np.array([(e.unique_id, *e.pos) for e in entities], dtype=np.int64).reshape(-1, 3)
+
+def pack_paths(paths):
+    """
+    Ragged lists of cells as (cells, lengths) arrays.
+    """
+    lengths = np.array([len(path) for path in paths], dtype=np.int64)
+    cells = np.array([cell for path in paths for cell in path], dtype=np.int32).reshape(-1, 2)
+    return cells, lengths
+
+def unpack_paths(cells, lengths):
+    cells = cells.tolist()
+    ends = np.cumsum(lengths).tolist()
+    starts = [0] + ends[:-1]
+    return [[tuple(cell) for cell in cells[start:end]] for start, end in zip(starts, ends)]
+
+def optional_cell(cell):
+    return (-1, -1) if cell is None else cell
+
+def save(model, path):
+    """
+    Write the full state of a RandomModel to path.
+    """
+    robots = list(model.schedule.robots)  # activation order
+    grid = model.grid
+    dispatcher = model.dispatcher
+    collector = model.datacollector
+    rng_scalars, rng_internal = rng_state(model.random)
+
+    meta = {
+        "model": "RandomModel",
+        "N": model.num_agents,
+        "M": model.num_trash,
+        "width": grid.width,
+        "height": grid.height,
+        "max_steps": model.max_steps,
+        "exploration": model.exploration,
+        "dispatch": dispatcher.method if dispatcher is not None else None,
+        "seed": model._seed,
+        "rng": rng_scalars,
+        "running": model.running,
+        "current_id": model.current_id,
+        "model_steps": model._steps,
+        "model_time": model._time,
+        "schedule_steps": model.schedule.steps,
+        "schedule_time": model.schedule.time,
+        "accumulated_steps": model.accumulated_steps,
+        "dirty_cells": model.dirty_cells,
+        "replans": model.replans,
+        "planning_time": model.planning_time,
+        "model_reporters": list(collector.model_vars),
+        "agent_columns": collector.columns,
+        "spilled": collector.spilled,
+    }
+    arrays = {
+        "rng": rng_internal,
+        "obstacles": positions(model.schedule.passive[ObstacleAgent].values()),
+        "chargers": positions(model.schedule.passive[ChargingStation].values()),
+        "trash": positions(model.schedule.passive[TrashAgent].values()),
+        "robots": np.array([
+            (r.unique_id, *r.pos, *optional_cell(r.home), r.steps_taken, r.energy,
+             r.returning_home, *optional_cell(r.frontier_target))
+            for r in robots
+        ], dtype=np.int64).reshape(-1, 10),
+        "covered": model.coverage.covered,
+        "claims": np.array(
+            [(*target, robot_id) for target, robot_id in model.coverage.claims.items()], dtype=np.int64
+        ).reshape(-1, 3),
+        "model_vars": np.array(list(zip(*collector.model_vars.values())), dtype=np.int64).reshape(
+            -1, len(collector.model_vars)
+        ),
+        "agent_rows": collector.agent_array(),
+    }
+    for name in ("path_home", "visited_cells", "frontier_path", "trash_path"):
+        if name == "visited_cells":
+            paths = [sorted(r.visited_cells) for r in robots]
+        elif name == "path_home":
+            paths = [r.path_home[r.path_index:] for r in robots]  # from the current cell on
+        else:
+            paths = [getattr(r, name) for r in robots]
+        arrays[name], arrays[name + "_lengths"] = pack_paths(paths)
+
+    if dispatcher is not None:
+        meta["dispatcher"] = {
+            "interval": dispatcher.interval,
+            "reserve": dispatcher.reserve,
+            "last_batch": dispatcher.last_batch,
+            "batches": dispatcher.batches,
+        }
+        arrays["dispatch_targets"] = np.array(
+            [(robot_id, *target) for robot_id, target in dispatcher.targets.items()], dtype=np.int64
+        ).reshape(-1, 3)
+        arrays["dispatch_unassigned"] = np.array(sorted(dispatcher.unassigned), dtype=np.int64)
+
+    write_checkpoint(path, meta, arrays)
+
+def restore(path, max_steps=None, seed=None):
+    """
+    Rebuild a RandomModel from a checkpoint.
+    Args:
+        max_steps: New step limit (default: the saved one)
+        seed: Reseed the RNG after restoring, to fork variants of one state
+    """
+    meta, arrays = read_checkpoint(path)
+    if meta.get("model") != "RandomModel":
+        raise ValueError(f"{path} is not a RandomModel checkpoint")
+
+    model = RandomModel.__new__(RandomModel, seed=meta["seed"])
+    super(RandomModel, model).__init__()
+    model.setup(
+        meta["N"], meta["M"], meta["width"], meta["height"],
+        meta["max_steps"] if max_steps is None else max_steps,
+        meta["exploration"], meta["dispatch"],
+    )
+    grid, schedule = model.grid, model.schedule
+
+    def place(entity_type, rows):
+        rows = np.asarray(rows)
+        entities = [entity_type(unique_id, model) for unique_id in rows[:, 0].tolist()]
+        grid.place_agents(entities, rows[:, 1].tolist(), rows[:, 2].tolist())
+        schedule.add_passives(entities)
+
+    # Same order as the saved passive index
+    place(ObstacleAgent, arrays["obstacles"])
+    model.coverage = CoverageMap(grid)
+    model.coverage.covered[...] = arrays["covered"]
+
+    # Robots are registered with the model in creation (unique_id) order,
+    # then the schedule gets back its activation order
+    robot_rows = arrays["robots"].tolist()
+    paths = {
+        name: unpack_paths(arrays[name], arrays[name + "_lengths"])
+        for name in ("path_home", "visited_cells", "frontier_path", "trash_path")
+    }
+    robots = {}
+    for i, row in sorted(enumerate(robot_rows), key=lambda item: item[1][0]):
+        unique_id, x, y, home_x, home_y, steps_taken, energy, returning_home, target_x, target_y = row
+        robot = RandomAgent(unique_id, model, energy)
+        robot.steps_taken = steps_taken
+        robot.home = None if home_x < 0 else (home_x, home_y)
+        robot.returning_home = bool(returning_home)
+        robot.frontier_target = None if target_x < 0 else (target_x, target_y)
+        robot.path_home = paths["path_home"][i]
+        robot.visited_cells = set(paths["visited_cells"][i])
+        robot.frontier_path = paths["frontier_path"][i]
+        robot.trash_path = paths["trash_path"][i]
+        schedule.add(robot)
+        grid.place_agent(robot, (x, y))
+        robots[unique_id] = robot
+    schedule.robots = [robots[row[0]] for row in robot_rows]
+
+    place(ChargingStation, arrays["chargers"])
+    place(TrashAgent, arrays["trash"])
+    model.coverage.claims = {(x, y): robot_id for x, y, robot_id in arrays["claims"].tolist()}
+
+    dispatcher = model.dispatcher
+    if dispatcher is not None:
+        state = meta["dispatcher"]
+        dispatcher.interval = state["interval"]
+        dispatcher.reserve = state["reserve"]
+        dispatcher.last_batch = state["last_batch"]
+        dispatcher.batches = state["batches"]
+        for robot_id, x, y in arrays["dispatch_targets"].tolist():
+            dispatcher.targets[robot_id] = (x, y)
+            dispatcher.assignee[(x, y)] = robot_id
+        dispatcher.unassigned = set(arrays["dispatch_unassigned"].tolist())
+
+    collector = model.datacollector
+    if collector.columns != meta["agent_columns"] or list(collector.model_vars) != meta["model_reporters"]:
+        raise ValueError(f"{path} was saved with other datacollector reporters")
+    for name, column in zip(meta["model_reporters"], arrays["model_vars"].T.tolist()):
+        collector.model_vars[name] = column
+    rows = arrays["agent_rows"]
+    collector.current = np.empty((len(rows) + collector.chunk_size, len(collector.columns)), dtype=collector.dtype)
+    collector.current[:len(rows)] = rows
+    collector.rows = len(rows)
+    collector.spilled = list(meta["spilled"])
+
+    model.running = meta["running"]
+    model.current_id = meta["current_id"]
+    model._steps = meta["model_steps"]
+    model._time = meta["model_time"]
+    schedule.steps = meta["schedule_steps"]
+    schedule.time = meta["schedule_time"]
+    model.accumulated_steps = meta["accumulated_steps"]
+    model.dirty_cells = meta["dirty_cells"]
+    model.replans = meta["replans"]
+    model.planning_time = meta["planning_time"]
+    set_rng_state(model.random, meta["rng"], arrays["rng"])
+    if seed is not None:
+        model.reset_randomizer(seed)
+    return model
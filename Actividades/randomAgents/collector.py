@@ -0,0 +1,161 @@
+import os
+from operator import attrgetter
+
+import numpy as np
+import pandas as pd
+from mesa import DataCollector
+
+class ColumnarDataCollector(DataCollector):
+    """
+    DataCollector that stores agent reporters in typed NumPy arrays.
+    Only agents of agent_type are recorded. Each row is (Step, AgentID,
+    reporters...) in a preallocated chunk of chunk_size rows; when a chunk is
+    full a new one is allocated, so collecting never copies old rows. Full
+    chunks can be spilled to .npz files in spill_dir to keep memory bounded.
+    Model reporters and tables work like in mesa's DataCollector.
+    Args:
+        model_reporters: Same as DataCollector
+        agent_reporters: Dict of column name to attribute name or function
+        agent_type: Only agents of this type are recorded
+        dtype: NumPy dtype of every agent column (Step and AgentID included)
+        chunk_size: Rows per chunk
+        spill_dir: Directory where full chunks are written, None keeps all in memory
+        max_chunks: Full chunks kept in memory before spilling to spill_dir
+    """
+    def __init__(self, model_reporters=None, agent_reporters=None, tables=None,
+                 agent_type=None, dtype=np.int32, chunk_size=65536,
+                 spill_dir=None, max_chunks=4):
+        super().__init__(model_reporters=model_reporters, tables=tables)
+        self.agent_type = agent_type
+        self.dtype = np.dtype(dtype)
+        self.chunk_size = chunk_size
+        self.spill_dir = spill_dir
+        self.max_chunks = max_chunks
+
+        # Kept out of self.agent_reporters so DataCollector.collect only
+        # handles the model reporters
+        self.columns = ["Step", "AgentID"]
+        self.agent_getters = []
+        for name, reporter in (agent_reporters or {}).items():
+            self.columns.append(name)
+            self.agent_getters.append(attrgetter(reporter) if isinstance(reporter, str) else reporter)
+
+        self.chunks = []  # full chunks still in memory
+        self.current = self._new_chunk()
+        self.rows = 0  # rows used in self.current
+        self.spilled = []  # paths of chunks written to spill_dir
+
+    def _new_chunk(self):
+        return np.empty((self.chunk_size, len(self.columns)), dtype=self.dtype)
+
+    def _agents(self, model):
+        if self.agent_type is not None:
+            return model.get_agents_of_type(self.agent_type)
+        return model.schedule.agents
+
+    def collect(self, model):
+        """
+        Collect model reporters like DataCollector and one row per agent.
+        """
+        super().collect(model)
+        if not self.agent_getters:
+            return
+        step = model._steps
+        getters = self.agent_getters
+        for agent in self._agents(model):
+            if self.rows == len(self.current):
+                self._close_chunk()
+            self.current[self.rows] = (step, agent.unique_id, *[getter(agent) for getter in getters])
+            self.rows += 1
+
+    def collect_arrays(self, model, ids, *columns):
+        """
+        Collect model reporters like DataCollector and one row per entry of
+        ids, with the agent reporters given as arrays (in column order), for
+        models that keep their agents in arrays.
+        """
+        DataCollector.collect(self, model)
+        block = np.empty((len(ids), len(self.columns)), dtype=self.dtype)
+        block[:, 0] = model._steps
+        block[:, 1] = ids
+        for i, column in enumerate(columns, start=2):
+            block[:, i] = column
+        self.add_rows(block)
+
+    def add_rows(self, block):
+        """
+        Append a (rows, columns) block, filling the current chunk first.
+        """
+        while len(block):
+            if self.rows == len(self.current):
+                self._close_chunk()
+            count = min(len(block), len(self.current) - self.rows)
+            self.current[self.rows:self.rows + count] = block[:count]
+            self.rows += count
+            block = block[count:]
+
+    def _close_chunk(self):
+        self.chunks.append(self.current)
+        self.current = self._new_chunk()
+        self.rows = 0
+        if self.spill_dir is not None and len(self.chunks) > self.max_chunks:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            while len(self.chunks) > self.max_chunks:
+                path = os.path.join(self.spill_dir, f"agents_{len(self.spilled):06d}.npz")
+                np.savez(path, **self._as_columns(self.chunks.pop(0)))
+                self.spilled.append(path)
+
+    def _as_columns(self, block):
+        return {name: block[:, i] for i, name in enumerate(self.columns)}
+
+    def agent_array(self):
+        """
+        All in-memory rows as one (rows, columns) array.
+        If several chunks are in memory they are merged once into a single
+        chunk, so later calls return a view.
+        """
+        if self.chunks:
+            merged = np.concatenate(self.chunks + [self.current[:self.rows]])
+            # keep the merged rows as the current chunk, with room to grow
+            capacity = len(merged) + self.chunk_size
+            self.current = np.empty((capacity, len(self.columns)), dtype=self.dtype)
+            self.current[:len(merged)] = merged
+            self.rows = len(merged)
+            self.chunks = []
+        return self.current[:self.rows]
+
+    def get_agent_vars_dataframe(self):
+        """
+        DataFrame indexed by (Step, AgentID) with one column per agent reporter,
+        like DataCollector's. The reporter columns are a view of the stored
+        array, not a copy. Rows spilled to disk are not included, see load_spilled.
+        """
+        if not self.agent_getters:
+            raise UserWarning(
+                "No agent reporters have been defined in the DataCollector, returning empty DataFrame."
+            )
+        data = self.agent_array()
+        index = pd.MultiIndex.from_arrays([data[:, 0], data[:, 1]], names=["Step", "AgentID"])
+        return pd.DataFrame(data[:, 2:], index=index, columns=self.columns[2:], copy=False)
+
+    def load_spilled(self):
+        """
+        DataFrame with the rows spilled to spill_dir (in the same layout).
+        """
+        frames = []
+        for path in self.spilled:
+            with np.load(path) as columns:
+                frames.append(pd.DataFrame({name: columns[name] for name in self.columns}))
+        if not frames:
+            return pd.DataFrame(columns=self.columns).set_index(["Step", "AgentID"])
+        return pd.concat(frames, ignore_index=True).set_index(["Step", "AgentID"])
+
+    def save(self, path):
+        """
+        Write the in-memory agent rows to a .npz or .parquet file (parquet needs pyarrow).
+        """
+        columns = self._as_columns(self.agent_array())
+        if path.endswith(".parquet"):
+            pd.DataFrame(columns).to_parquet(path, index=False)
+        else:
+            np.savez(path, **columns)
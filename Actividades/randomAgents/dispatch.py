@@ -0,0 +1,218 @@
+import numpy as np
+
+from navigation import NavigationMap
+
+def greedy_assignment(cost):
+    """
+    Repeatedly take the cheapest (robot, trash) pair whose robot and trash are
+    both still free. Infinite costs are never taken.
+    Returns a list of (row, column) pairs.
+    """
+    rows, columns = np.nonzero(np.isfinite(cost))
+    order = np.argsort(cost[rows, columns], kind="stable")
+    taken_rows, taken_columns, pairs = set(), set(), []
+    for i in order:
+        row, column = int(rows[i]), int(columns[i])
+        if row not in taken_rows and column not in taken_columns:
+            taken_rows.add(row)
+            taken_columns.add(column)
+            pairs.append((row, column))
+    return pairs
+
+def hungarian_assignment(cost):
+    """
+    Minimum cost assignment of rows to columns (Hungarian method with
+    potentials, O(rows^2 * columns), the inner loop over columns in NumPy).
+    Infinite costs are forbidden pairs: rows that can only be matched through
+    them are left unassigned.
+    Returns a list of (row, column) pairs.
+    """
+    cost = np.asarray(cost, dtype=float)
+    if cost.size == 0:
+        return []
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    finite = np.isfinite(cost)
+    # Forbidden pairs cost more than any assignment made only of allowed ones
+    big = (np.abs(cost[finite]).sum() + 1) if finite.any() else 1.0
+    a = np.where(finite, cost, big)
+
+    # 1-based e-maxx formulation: column 0 is the virtual start column
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    match = np.zeros(m + 1, dtype=int)  # row matched to each column, 0 = free
+    way = np.zeros(m + 1, dtype=int)
+    for row in range(1, n + 1):
+        match[0] = row
+        column = 0
+        min_value = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[column] = True
+            current_row = match[column]
+            free = ~used
+            free[0] = False
+            reduced = a[current_row - 1] - u[current_row] - v[1:]
+            better = free[1:] & (reduced < min_value[1:])
+            min_value[1:][better] = reduced[better]
+            way[1:][better] = column
+            candidates = np.where(free[1:], min_value[1:], np.inf)
+            next_column = int(np.argmin(candidates)) + 1
+            delta = candidates[next_column - 1]
+            u[match[used]] += delta
+            v[used] -= delta
+            min_value[~used] -= delta
+            column = next_column
+            if match[column] == 0:
+                break
+        while column:
+            previous = way[column]
+            match[column] = match[previous]
+            column = previous
+
+    pairs = []
+    for column in range(1, m + 1):
+        row = match[column]
+        if row and finite[row - 1, column - 1]:
+            pair = (row - 1, column - 1)
+            pairs.append(pair[::-1] if transposed else pair)
+    return pairs
+
+ASSIGNMENTS = {
+    "greedy": greedy_assignment,
+    "hungarian": hungarian_assignment,
+}
+
+class TrashDispatcher:
+    """
+    Central planner that assigns trash cells to robots in batches.
+    The remaining trash is read from the grid's trash layer, the spatial index
+    of every TrashAgent left. On each dispatch every robot that is out
+    wandering gets a BFS distance field from its position, and the cost of a
+    (robot, trash) pair is the path length to the trash. A pair is only
+    allowed if the robot can reach the trash, clean it and still get back to
+    its charging station with reserve energy to spare. Each robot only
+    considers its N nearest allowed trash cells (N = robots in the batch),
+    which never changes the optimal assignment and keeps the matrix small.
+    Every interval steps a batch re-plans the whole fleet; in between, robots
+    left without a target (their trash was cleaned) are assigned in a small
+    batch of their own, among the trash no other robot is heading to.
+    Attributes:
+        model: RandomModel being dispatched
+        method: "greedy" or "hungarian"
+        interval: Steps between full re-plans
+        reserve: Energy a robot must have left when it gets home
+        targets: Dict of robot unique_id to its assigned trash position
+        batches: Number of batches run
+    """
+    def __init__(self, model, method="hungarian", interval=10, reserve=5):
+        if method not in ASSIGNMENTS:
+            raise ValueError(f"Unknown dispatch method: {method}")
+        self.model = model
+        self.method = method
+        self.assign = ASSIGNMENTS[method]
+        self.interval = interval
+        self.reserve = reserve
+        self.targets = {}
+        self.assignee = {}  # trash position to the unique_id of its robot
+        self.unassigned = set()  # robots the last batch could not assign
+        self.last_batch = None
+        self.batches = 0
+
+    def target(self, robot):
+        return self.targets.get(robot.unique_id)
+
+    def is_reserved(self, pos, robot):
+        """
+        True if the trash at pos is assigned to a robot other than robot.
+        """
+        return self.assignee.get(pos, robot.unique_id) != robot.unique_id
+
+    def release(self, robot):
+        target = self.targets.pop(robot.unique_id, None)
+        if target is not None:
+            del self.assignee[target]
+
+    def trash_removed(self, pos):
+        """
+        Called by the model when the trash at pos is cleaned.
+        """
+        robot_id = self.assignee.pop(pos, None)
+        if robot_id is not None:
+            del self.targets[robot_id]
+
+    def available_robots(self):
+        return [
+            robot for robot in self.model.schedule.robots
+            if not robot.returning_home and robot.energy > 0
+        ]
+
+    def step(self):
+        """
+        Run a batch if it is time to re-plan or a robot is waiting for a target.
+        """
+        robots = self.available_robots()
+        if self.last_batch is None or self.model.accumulated_steps - self.last_batch >= self.interval:
+            self.last_batch = self.model.accumulated_steps
+            self.unassigned = set()
+            self.dispatch(robots)
+            return
+        waiting = [
+            robot for robot in robots
+            if robot.unique_id not in self.targets and robot.unique_id not in self.unassigned
+        ]
+        if waiting:
+            self.dispatch(waiting)
+
+    def dispatch(self, robots):
+        """
+        Assign trash to robots, replacing their current targets.
+        """
+        self.batches += 1
+        for robot in robots:
+            self.release(robot)
+        self.unassigned.update(robot.unique_id for robot in robots)
+
+        xs, ys = np.nonzero(self.model.grid.trash)
+        # Trash another robot is heading to but is not in this batch
+        free = np.array([(x, y) not in self.assignee for x, y in zip(xs.tolist(), ys.tolist())], dtype=bool)
+        xs, ys = xs[free], ys[free]
+        if not robots or not len(xs):
+            return
+
+        cost = self.cost_matrix(robots, xs, ys)
+        # Each robot only needs its len(robots) nearest candidates
+        keep = min(len(robots), cost.shape[1])
+        nearest = np.argpartition(cost, keep - 1, axis=1)[:, :keep]
+        columns = np.unique(nearest)
+        columns = columns[np.isfinite(cost[:, columns]).any(axis=0)]
+
+        for row, column in self.assign(cost[:, columns]):
+            robot = robots[row]
+            target = (int(xs[columns[column]]), int(ys[columns[column]]))
+            self.targets[robot.unique_id] = target
+            self.assignee[target] = robot.unique_id
+            self.unassigned.discard(robot.unique_id)
+
+    def cost_matrix(self, robots, xs, ys):
+        """
+        Path length from each robot to each trash cell, inf if the pair is
+        unreachable or would leave the robot without energy to get home.
+        """
+        navigation = self.model.navigation
+        cost = np.full((len(robots), len(xs)), np.inf)
+        for row, robot in enumerate(robots):
+            to_trash = navigation.build_field(robot.pos)[xs, ys]
+            home = robot.home if robot.home is not None else robot.pos
+            to_home = navigation.field(home)[xs, ys]
+            # move there, clean (1 energy), walk back home
+            needed = to_trash + 1 + to_home + self.reserve
+            allowed = (
+                (to_trash != NavigationMap.UNREACHABLE)
+                & (to_home != NavigationMap.UNREACHABLE)
+                & (needed <= robot.energy)
+            )
+            cost[row, allowed] = to_trash[allowed]
+        return cost
@@ -0,0 +1,87 @@
+from collections import deque
+import numpy as np
+
+from navigation import MOORE_OFFSETS
+
+class CoverageMap:
+    """
+    Shared map of the cells the fleet already knows are clean.
+    A cell is covered once a robot has been on it, or has seen it from a
+    neighboring cell without trash on it. Obstacles count as covered. The
+    uncovered cells that are not obstacles form the frontier robots head to
+    in "frontier" exploration.
+    Attributes:
+        grid: OccupancyGrid of the model
+        covered: Boolean array indexed [x, y]
+        claims: Dict of frontier target to the unique_id of the robot heading there
+    """
+    def __init__(self, grid):
+        self.grid = grid
+        self.covered = grid.obstacles > 0
+        self.claims = {}
+
+    def mark_seen(self, pos):
+        """
+        Cover pos and every neighbor of pos without trash.
+        """
+        x, y = pos
+        area = (slice(max(x - 1, 0), x + 2), slice(max(y - 1, 0), y + 2))
+        self.covered[area] |= self.grid.trash[area] == 0
+        self.covered[x, y] = True
+
+    def mark_clean(self, pos):
+        self.covered[pos] = True
+
+    def is_frontier(self, pos):
+        return not self.covered[pos]
+
+    def fraction(self):
+        """
+        Fraction of the cells that are not obstacles already covered.
+        """
+        free = self.grid.obstacles == 0
+        return float(np.count_nonzero(self.covered & free)) / max(int(np.count_nonzero(free)), 1)
+
+    def claim(self, robot, target):
+        """
+        Reserve target for robot, releasing the robot's previous target.
+        """
+        self.release(robot)
+        if target is not None:
+            self.claims[target] = robot.unique_id
+            robot.frontier_target = target
+
+    def release(self, robot):
+        target = getattr(robot, "frontier_target", None)
+        if target is not None and self.claims.get(target) == robot.unique_id:
+            del self.claims[target]
+        robot.frontier_target = None
+
+    def nearest_frontier(self, robot):
+        """
+        BFS from the robot over the cells without obstacles to the nearest
+        frontier cell no other robot has claimed.
+        Returns the path to it (start included) or None if there is none.
+        """
+        start = robot.pos
+        width, height = self.grid.width, self.grid.height
+        obstacles, covered, claims = self.grid.obstacles, self.covered, self.claims
+        parents = {start: None}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            if not covered[current] and claims.get(current, robot.unique_id) == robot.unique_id:
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = parents[current]
+                path.reverse()
+                return path
+            x, y = current
+            for dx, dy in MOORE_OFFSETS:
+                neighbor = (x + dx, y + dy)
+                if (0 <= neighbor[0] < width and 0 <= neighbor[1] < height
+                        and neighbor not in parents and not obstacles[neighbor]):
+                    parents[neighbor] = current
+                    queue.append(neighbor)
+        return None
@@ -0,0 +1,255 @@
+"""
+RandomModel with the robot fleet kept in NumPy arrays, for fleets of
+thousands of robots. Robots follow the same rules as RandomAgent (clean the
+trash they stand on, step onto neighboring trash, otherwise move to a random
+free neighbor, head home when the energy left is close to the distance home,
+recharge +5 per step at the station), but every robot decides at once:
+    1. Robots whose energy may be down to their distance home + 5 get their
+       exact distance (and path) home from A*; the ones that are close
+       enough start returning.
+    2. Returning robots take the next cell of their path or recharge.
+    3. The other robots clean or pick a move from their 8 neighbors in one
+       batch. A reservation pass gives each target cell to the first of its
+       candidates in a random activation order; the others pick again among
+       the cells still free (a few rounds) or stay.
+    4. All moves are applied at once.
+Random exploration only (no frontier exploration or dispatcher), and the
+robots do not keep their visited cells.
+Usage:
+    model = FleetModel(10000, 0.1, 0.1, 500, 500, seed=0)
+    while model.running:
+        model.step()
+"""
+import numpy as np
+from mesa import Model
+
+from collector import ColumnarDataCollector
+from pathfinding import GridSearch, MOORE_OFFSETS
+
+BUFFER = 5  # Extra energy units as buffer for wiggle room, like RandomAgent
+MAX_ENERGY = 100
+RECHARGE = 5
+
+class ObstacleMap:
+    """
+    Static obstacle layer, the part of OccupancyGrid GridSearch reads.
+    """
+    def __init__(self, obstacles):
+        self.obstacles = obstacles
+        self.width, self.height = obstacles.shape
+        self.obstacle_version = 0
+
+class FleetModel(Model):
+    """
+    Args:
+        N: Number of robots
+        M: Density of trash (value between 0 and 1)
+        O: Density of obstacles (value between 0 and 1)
+        width, height: The size of the grid
+        max_steps: Steps after which the model stops even if trash is left
+        rounds: Reservation rounds for robots that lost their first choice
+        seed: Seed for the model's random generators
+    Attributes:
+        obstacles, trash, chargers: bool layers indexed [x, y]
+        robots: Number of robots in each cell
+        x, y, home_x, home_y: Position and charging station of every robot
+        energy, steps_taken: Per robot counters, like RandomAgent's
+        returning: Robots heading home
+        paths, path_length, path_cursor: Path home of the returning robots
+            (flat cell indices x * height + y) and the index of their cell in it
+        known_distance, drift: Exact distance home when it was last computed
+            and the moves made since, so known_distance + drift bounds it
+        stranded: Robots with no path home (their home is walled off)
+    """
+    def __init__(self, N, M, O, width, height, max_steps=250, rounds=3, seed=None):
+        super().__init__()
+        self.rng = np.random.default_rng(seed)
+        self.num_agents = N
+        self.num_trash = M
+        self.max_steps = max_steps
+        self.rounds = rounds
+        self.width, self.height = width, height
+        self.running = True
+        self.accumulated_steps = 0
+
+        rng = self.rng
+        self.obstacles = rng.random((width, height)) < O
+        free = np.flatnonzero(~self.obstacles)
+        if len(free) < N:
+            raise ValueError(f"{N} robots do not fit in {len(free)} free cells")
+        # Robots start on their charging station, one per free cell
+        start = rng.choice(free, N, replace=False)
+        self.x, self.y = np.divmod(start, height)
+        self.home_x, self.home_y = self.x.copy(), self.y.copy()
+        self.chargers = np.zeros((width, height), dtype=bool)
+        self.chargers.ravel()[start] = True
+        self.robots = np.zeros((width, height), dtype=np.int32)
+        self.robots.ravel()[start] = 1
+        self.trash = (rng.random((width, height)) < M) & ~self.obstacles & ~self.chargers
+        self.dirty_cells = int(np.count_nonzero(self.trash))
+
+        self.ids = np.arange(N)
+        self.energy = np.full(N, MAX_ENERGY, dtype=np.int32)
+        self.steps_taken = np.zeros(N, dtype=np.int32)
+        self.returning = np.zeros(N, dtype=bool)
+        self.known_distance = np.zeros(N, dtype=np.int32)
+        self.drift = np.zeros(N, dtype=np.int32)
+        self.stranded = np.zeros(N, dtype=bool)
+        self.paths = np.zeros((N, 2 * MAX_ENERGY), dtype=np.int64)
+        self.path_length = np.zeros(N, dtype=np.int32)
+        self.path_cursor = np.zeros(N, dtype=np.int32)
+        self.pathfinder = GridSearch(ObstacleMap(self.obstacles))
+        self.offsets = np.array(MOORE_OFFSETS)
+
+        self.datacollector = ColumnarDataCollector(
+            model_reporters={
+                "CleanCells": lambda m: m.count_clean_cells(),
+                "DirtyCells": lambda m: m.count_dirty_cells(),
+                "Time": lambda m: m.accumulated_steps,
+            },
+            agent_reporters={
+                "Steps": "steps_taken",
+                "Battery": "energy",
+            },
+        )
+        self.collect()
+
+    def collect(self):
+        self.datacollector.collect_arrays(self, self.ids, self.steps_taken, self.energy)
+
+    def step(self):
+        '''Advance the model by one step.'''
+        active = self.energy > 0
+        idle = self.check_energy(active & ~self.returning)
+        returning = active & self.returning
+        wandering = active & ~returning & ~idle
+        self.step_returning(returning)
+        self.step_wandering(wandering)
+        self._advance_time()
+        self.collect()
+        self.accumulated_steps += 1
+
+        # Check if all trash is cleaned
+        if self.count_dirty_cells() == 0:
+            self.running = False
+
+        # Stop the model after max_steps (250 by default)
+        if self.accumulated_steps >= self.max_steps:
+            self.running = False
+
+    def check_energy(self, wandering):
+        """
+        Send home the wandering robots with energy <= distance home + BUFFER.
+        Returns the robots that have no path home and should head back: like
+        RandomAgent they give up and do nothing this step.
+        """
+        manhattan = np.abs(self.x - self.home_x) + np.abs(self.y - self.home_y)
+        idle = wandering & self.stranded & (self.energy <= manhattan + BUFFER)
+        # Only robots whose upper bound on the distance is close need A*
+        candidates = wandering & ~self.stranded & (self.energy <= self.known_distance + self.drift + BUFFER)
+        height = self.height
+        for i in np.flatnonzero(candidates).tolist():
+            start = (int(self.x[i]), int(self.y[i]))
+            path = self.pathfinder.search(start, (int(self.home_x[i]), int(self.home_y[i])))
+            if path is None:
+                self.stranded[i] = True
+                idle[i] = self.energy[i] <= manhattan[i] + BUFFER
+                continue
+            self.known_distance[i] = len(path) - 1
+            self.drift[i] = 0
+            if self.energy[i] <= len(path) - 1 + BUFFER:
+                self.returning[i] = True
+                if len(path) > self.paths.shape[1]:
+                    grown = np.zeros((len(self.paths), 2 * len(path)), dtype=self.paths.dtype)
+                    grown[:, :self.paths.shape[1]] = self.paths
+                    self.paths = grown
+                self.paths[i, :len(path)] = [px * height + py for px, py in path]
+                self.path_length[i] = len(path)
+                self.path_cursor[i] = 0
+        return idle
+
+    def step_returning(self, returning):
+        """
+        Recharge the returning robots at their station, move the others one
+        cell along their path (robots on the way do not stop them).
+        """
+        at_home = returning & (self.x == self.home_x) & (self.y == self.home_y)
+        charging = at_home & (self.energy < MAX_ENERGY)
+        self.energy[charging] = np.minimum(self.energy[charging] + RECHARGE, MAX_ENERGY)
+        # Fully charged, go wander (from the next step)
+        charged = at_home & ~charging
+        self.returning[charged] = False
+        self.known_distance[charged] = 0
+        self.drift[charged] = 0
+
+        on_the_way = returning & ~at_home
+        exhausted = on_the_way & (self.path_cursor + 1 >= self.path_length)
+        self.returning[exhausted] = False
+        moving = np.flatnonzero(on_the_way & ~exhausted)
+        self.path_cursor[moving] += 1
+        target = self.paths[moving, self.path_cursor[moving]]
+        self.move(moving, *np.divmod(target, self.height))
+
+    def step_wandering(self, wandering):
+        """
+        Clean the trash under the robots, then move the rest to neighboring
+        trash or a random free neighbor, with a reservation pass.
+        """
+        width, height = self.width, self.height
+        robots = np.flatnonzero(wandering)
+        cells = self.x[robots] * height + self.y[robots]
+        on_trash = self.trash.ravel()[cells]
+        # One robot cleans each cell, the others (on it with a returning robot) move
+        cells_with_trash, first = np.unique(cells[on_trash], return_index=True)
+        cleaners = robots[on_trash][first]
+        self.trash.ravel()[cells_with_trash] = False
+        self.dirty_cells -= len(cells_with_trash)
+        self.steps_taken[cleaners] += 1
+        self.energy[cleaners] -= 1
+
+        movers = np.setdiff1d(robots, cleaners)
+        # Activation order: the first robot asking for a cell gets it
+        movers = self.rng.permutation(movers)
+        robots_layer = self.robots.ravel()
+        reserved = np.zeros(width * height, dtype=bool)
+        for _ in range(self.rounds):
+            if not len(movers):
+                break
+            nx = self.x[movers, None] + self.offsets[:, 0]
+            ny = self.y[movers, None] + self.offsets[:, 1]
+            inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+            flat = np.where(inside, nx * height + ny, 0)
+            empty = inside & (robots_layer[flat] == 0) & ~reserved[flat]
+            trash = empty & self.trash.ravel()[flat]
+            free = empty & ~self.obstacles.ravel()[flat]
+            # Uniform choice among the trash cells if any, else the free cells
+            score = self.rng.random(flat.shape) + trash
+            score[~free] = -1
+            choice = score.argmax(axis=1)
+            has_move = score[np.arange(len(movers)), choice] >= 0
+            movers, target = movers[has_move], flat[has_move, choice[has_move]]
+            _, first = np.unique(target, return_index=True)
+            won = np.zeros(len(movers), dtype=bool)
+            won[first] = True
+            reserved[target[won]] = True
+            self.move(movers[won], *np.divmod(target[won], height))
+            self.drift[movers[won]] += 1
+            movers = movers[~won]
+
+    def move(self, robots, x, y):
+        """
+        Move robots to (x, y), each move costs one unit of energy.
+        """
+        robots_layer = self.robots.ravel()
+        np.subtract.at(robots_layer, self.x[robots] * self.height + self.y[robots], 1)
+        np.add.at(robots_layer, x * self.height + y, 1)
+        self.x[robots] = x
+        self.y[robots] = y
+        self.steps_taken[robots] += 1
+        self.energy[robots] -= 1
+
+    def count_dirty_cells(self):
+        return self.dirty_cells
+
+    def count_clean_cells(self):
+        return self.width * self.height - self.dirty_cells
@@ -1,8 +1,22 @@
+import numpy as np
 from mesa import Model, agent
-from mesa.time import RandomActivation
-from mesa.space import MultiGrid
-from mesa import DataCollector
 from agent import RandomAgent, ObstacleAgent, TrashAgent, ChargingStation
+from occupancy import OccupancyGrid
+from navigation import NavigationMap
+from pathfinding import GridSearch
+from collector import ColumnarDataCollector
+from scheduler import FleetActivation
+from exploration import CoverageMap
+from dispatch import TrashDispatcher
+from profiling import StepProfiler
+
+def random_mask(random, width, height, density):
+    """
+    (width, height) bool array, True where a draw of random is under density.
+    One draw is taken per cell in coord_iter order (x outer, y inner).
+    """
+    draws = [random.random() < density for _ in range(width * height)]
+    return np.array(draws, dtype=bool).reshape(width, height)
 
 class RandomModel(Model):
     """
@@ -12,83 +26,149 @@ class RandomModel(Model):
         M: Density of trash (value between 0 and 1)
         O: Density of obstacles (value between 0 and 1)
         height, width: The size of the grid to model
+        max_steps: Steps after which the model stops even if trash is left
+        exploration: "random" (random walk) or "frontier" (head to the nearest
+            cell the fleet has not covered yet)
+        dispatch: None (robots find trash on their own), "greedy" or
+            "hungarian" (a central TrashDispatcher assigns trash to robots)
+        profile: Time each phase of step() and count searches and moves in
+            model.profiler (a StepProfiler). Off by default, at no cost.
+        seed: Seed for the model's random generator (read by mesa's Model)
     """
 
-    def __init__(self, N, M, O, width, height):
+    def __init__(self, N, M, O, width, height, max_steps=250, exploration="random",
+                 dispatch=None, profile=False, seed=None):
         super().__init__()  # Call the parent class's __init__ method
-        self.num_agents = N
-        self.num_trash = M
-        self.grid = MultiGrid(width, height, torus=False) 
+        self.setup(N, M, width, height, max_steps, exploration, dispatch)
 
-        self.schedule = RandomActivation(self)
-        self.running = True 
-
-        self.accumulated_steps = 0  # for setting a runtime limit
-
-        self.datacollector = DataCollector( 
-            model_reporters={
-                "CleanCells": lambda m: m.count_clean_cells(),
-                "DirtyCells": lambda m: m.count_dirty_cells(),
-                "Time": lambda m: m.accumulated_steps,
-            },
-            agent_reporters={
-                "Steps": lambda a: a.steps_taken if isinstance(a, RandomAgent) else 0,
-                "Battery": lambda a: a.energy if isinstance(a, RandomAgent) else None
-            }
-        )
+        width, height = self.grid.width, self.grid.height
 
         # Place obstacles on the grid based on obstacle density value "O"
-        for contents, (x, y) in self.grid.coord_iter():
-            if self.random.random() < O:
-                obs = ObstacleAgent(self.next_id(), self)
-                self.grid.place_agent(obs, (x, y))
-                self.schedule.add(obs)            
-
-        # Function to generate random positions
-        pos_gen = lambda w, h: (self.random.randrange(w), self.random.randrange(h))
-
-        # Add the agents and charging stations to random empty grid cells
-        for i in range(self.num_agents):
+        obstacles = random_mask(self.random, width, height, O)
+        self.place_passive(ObstacleAgent, *np.nonzero(obstacles))
+
+        # Cells the fleet knows are clean (obstacles start covered)
+        self.coverage = CoverageMap(self.grid)
+
+        # Add the agents and charging stations to distinct random free cells
+        free = np.flatnonzero(~obstacles)
+        if len(free) < self.num_agents:
+            raise ValueError(
+                f"Cannot place {self.num_agents} robots: only {len(free)} of the "
+                f"{width}x{height} cells are free of obstacles (O={O})"
+            )
+        cells = free[self.random.sample(range(len(free)), self.num_agents)]
+        for cell in cells.tolist():
+            pos = divmod(cell, height)
             # Create agent
-            a = RandomAgent(self.next_id(), self, 100) 
+            a = RandomAgent(self.next_id(), self, 100)
             self.schedule.add(a)
 
-            # Create charging station
+            # Create charging station (only on the grid, it never acts)
             b = ChargingStation(self.next_id(), self)
-            self.schedule.add(b)
-
-            pos = pos_gen(self.grid.width, self.grid.height)
-            while not self.grid.is_cell_empty(pos):
-                pos = pos_gen(self.grid.width, self.grid.height)
 
             self.grid.place_agent(a, pos)
             self.grid.place_agent(b, pos)
+            self.schedule.add_passive(b)
 
-        # Generate trash based on trash density value "M"
-        for contents, (x, y) in self.grid.coord_iter():
-            if self.random.random() < M and self.grid.is_cell_empty((x, y)):
-                trash = TrashAgent(self.next_id(), self)
-                self.grid.place_agent(trash, (x, y))
-                self.schedule.add(trash)
+        # Generate trash based on trash density value "M" on the empty cells
+        trash = random_mask(self.random, width, height, M) & ~obstacles
+        trash.ravel()[cells] = False
+        self.place_passive(TrashAgent, *np.nonzero(trash))
+        self.dirty_cells += int(np.count_nonzero(trash))
         
         self.datacollector.collect(self)
+        if profile:
+            StepProfiler(self)
+
+    def setup(self, N, M, width, height, max_steps, exploration, dispatch):
+        """
+        Build the empty model: grid, shared navigation, schedule, dispatcher
+        and datacollector, with nothing placed on the grid yet. Used by
+        __init__ and by checkpoint.restore.
+        """
+        if exploration not in ("random", "frontier"):
+            raise ValueError(f"Unknown exploration: {exploration}")
+        self.max_steps = max_steps
+        self.exploration = exploration
+        self.num_agents = N
+        self.num_trash = M
+        self.grid = OccupancyGrid(width, height, torus=False)
+        # Distance fields to the charging stations, shared by all agents
+        self.navigation = NavigationMap(self.grid)
+        # A* / jump point search for paths that are not to a station
+        self.pathfinder = GridSearch(self.grid)
+
+        # Only the roombas are activated, the rest is indexed by position
+        self.schedule = FleetActivation(self)
+        self.running = True 
+
+        self.accumulated_steps = 0  # for setting a runtime limit
+        self.dirty_cells = 0  # trash left on the grid, updated on place/remove
+        self.replans = 0  # paths home repaired around other robots
+        self.planning_time = 0.0  # seconds spent repairing them
+
+        self.datacollector = ColumnarDataCollector(
+            model_reporters={
+                "CleanCells": lambda m: m.count_clean_cells(),
+                "DirtyCells": lambda m: m.count_dirty_cells(),
+                "Time": lambda m: m.accumulated_steps,
+                "Replans": lambda m: m.replans,
+            },
+            # Only the roombas are recorded, in typed arrays
+            agent_reporters={
+                "Steps": "steps_taken",
+                "Battery": "energy",
+            },
+            agent_type=RandomAgent,
+        )
+        self.dispatcher = TrashDispatcher(self, dispatch) if dispatch is not None else None
+        self.profiler = None  # StepProfiler when profiling
 
     def step(self):
         '''Advance the model by one step.'''
+        if self.dispatcher is not None:
+            self.dispatcher.step()
         self.schedule.step()
         self.datacollector.collect(self)
+        self.check_termination()
+
+    def check_termination(self):
+        '''Count the step and stop the model when it is done.'''
         self.accumulated_steps += 1
 
         # Check if all trash is cleaned
         if self.count_dirty_cells() == 0:
             self.running = False
 
-        # Stop the model after 250 steps
-        if self.accumulated_steps >= 250:
+        # Stop the model after max_steps (250 by default)
+        if self.accumulated_steps >= self.max_steps:
             self.running = False
 
+    def place_passive(self, entity_type, xs, ys):
+        """
+        Create one entity_type entity at each (xs[i], ys[i]), with consecutive
+        ids, and place and index them all at once.
+        """
+        first = self.current_id + 1
+        self.current_id += len(xs)  # the ids next_id() would have given
+        entities = [entity_type(unique_id, self) for unique_id in range(first, self.current_id + 1)]
+        self.grid.place_agents(entities, xs.tolist(), ys.tolist())
+        self.schedule.add_passives(entities)
+
+    def remove_trash(self, trash):
+        """
+        Remove a trash agent from the grid and the passive index.
+        """
+        self.schedule.remove_passive(trash)
+        self.coverage.mark_clean(trash.pos)
+        if self.dispatcher is not None:
+            self.dispatcher.trash_removed(trash.pos)
+        self.grid.remove_agent(trash)
+        self.dirty_cells -= 1
+
     def count_dirty_cells(self):
-        return sum(1 for agent in self.schedule.agents if isinstance(agent, TrashAgent))
+        return self.dirty_cells
 
     def count_clean_cells(self):
         total_cells = self.grid.width * self.grid.height
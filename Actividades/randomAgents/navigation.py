@@ -0,0 +1,103 @@
+import numpy as np
+
+# Moore neighborhood offsets, in the same order as grid.get_neighborhood
+MOORE_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+class NavigationMap:
+    """
+    Shared distance fields to the charging stations.
+    Each field is a reverse BFS from a station over the cells without obstacles
+    (Moore neighborhood, every move costs 1), so the distance home and the next
+    step home of any agent are array lookups. Fields are built the first time a
+    station is asked for and cached until the obstacles on the grid change.
+    Attributes:
+        grid: OccupancyGrid the fields are computed on
+        fields: Cached distance field of each goal position
+    """
+    UNREACHABLE = -1
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.fields = {}
+        self.obstacle_version = grid.obstacle_version
+
+    def field(self, goal):
+        """
+        Distance from every cell to goal, UNREACHABLE for obstacles and cells
+        that cannot reach it.
+        """
+        if self.obstacle_version != self.grid.obstacle_version:
+            # Obstacles changed, every cached field is stale
+            self.fields.clear()
+            self.obstacle_version = self.grid.obstacle_version
+
+        field = self.fields.get(goal)
+        if field is None:
+            field = self.build_field(goal)
+            self.fields[goal] = field
+        return field
+
+    def build_field(self, goal):
+        """
+        Level by level BFS from goal using flat indices over a grid padded with a
+        blocked border, so the neighbors of a whole level are computed at once.
+        """
+        width, height = self.grid.width, self.grid.height
+        padded_height = height + 2
+        blocked = np.ones((width + 2, padded_height), dtype=bool)
+        blocked[1:-1, 1:-1] = self.grid.obstacles > 0
+        blocked = blocked.ravel()
+
+        distance = np.full(blocked.shape, self.UNREACHABLE, dtype=np.int32)
+        offsets = np.array([dx * padded_height + dy for dx, dy in MOORE_OFFSETS])
+
+        start = (goal[0] + 1) * padded_height + goal[1] + 1
+        if not blocked[start]:
+            distance[start] = 0
+            frontier = np.array([start])
+            level = 0
+            while frontier.size:
+                level += 1
+                neighbors = np.unique((frontier[:, None] + offsets).ravel())
+                neighbors = neighbors[~blocked[neighbors] & (distance[neighbors] == self.UNREACHABLE)]
+                distance[neighbors] = level
+                frontier = neighbors
+
+        return distance.reshape(width + 2, padded_height)[1:-1, 1:-1].copy()
+
+    def distance(self, goal, pos):
+        """
+        Length of the shortest path from pos to goal, None if there is none.
+        """
+        d = self.field(goal)[pos]
+        return None if d == self.UNREACHABLE else int(d)
+
+    def next_step(self, goal, pos):
+        """
+        Neighbor of pos one move closer to goal, None if pos is the goal or
+        cannot reach it.
+        """
+        field = self.field(goal)
+        d = field[pos]
+        if d <= 0:
+            return None
+        x, y = pos
+        for dx, dy in MOORE_OFFSETS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.grid.width and 0 <= ny < self.grid.height and field[nx, ny] == d - 1:
+                return (nx, ny)
+        return None
+
+    def path(self, start, goal):
+        """
+        Shortest path from start to goal (both included) following the field,
+        None if there is no path. Same format as RandomAgent.a_star_search.
+        """
+        if self.distance(goal, start) is None:
+            return None
+        path = [start]
+        current = start
+        while current != goal:
+            current = self.next_step(goal, current)
+            path.append(current)
+        return path
@@ -0,0 +1,103 @@
+from mesa.space import MultiGrid
+import numpy as np
+
+from agent import RandomAgent, ObstacleAgent, TrashAgent, ChargingStation
+
+class OccupancyGrid(MultiGrid):
+    """
+    MultiGrid that keeps one NumPy layer per agent type, so agents can check
+    what is in a cell with an array index instead of scanning its contents.
+    Layers are indexed [x, y] and hold how many agents of that type are in
+    the cell; they are updated on place_agent/move_agent/remove_agent.
+    The empty cells (empties, empty_mask, ...) are read from the count of
+    all agents in each cell, not from MultiGrid's own cache, so place_agents
+    can add many agents without going through it.
+    Attributes:
+        obstacles: ObstacleAgent layer
+        trash: TrashAgent layer
+        robots: RandomAgent layer
+        chargers: ChargingStation layer
+        occupants: Agents of any type in each cell
+        obstacle_version: Number of times the obstacles layer has changed
+    """
+    def __init__(self, width, height, torus):
+        super().__init__(width, height, torus)
+        self.obstacles = np.zeros((width, height), dtype=np.uint16)
+        self.trash = np.zeros((width, height), dtype=np.uint16)
+        self.robots = np.zeros((width, height), dtype=np.uint16)
+        self.chargers = np.zeros((width, height), dtype=np.uint16)
+        self.occupants = np.zeros((width, height), dtype=np.uint16)
+        self.layers = {
+            ObstacleAgent: self.obstacles,
+            TrashAgent: self.trash,
+            RandomAgent: self.robots,
+            ChargingStation: self.chargers,
+        }
+        # Bumped whenever an obstacle is placed or removed, so cached
+        # navigation fields know when to rebuild
+        self.obstacle_version = 0
+
+    def place_agent(self, agent, pos):
+        x, y = pos
+        already_there = agent.pos is not None and agent in self[x, y]
+        super().place_agent(agent, pos)
+        if already_there:
+            return
+        self.occupants[x, y] += 1
+        layer = self.layers.get(type(agent))
+        if layer is not None:
+            layer[x, y] += 1
+            if layer is self.obstacles:
+                self.obstacle_version += 1
+
+    def place_agents(self, agents, xs, ys):
+        """
+        Place many new agents of one type at once (agent i at (xs[i], ys[i])),
+        updating their layer with one array operation. The agents must not be
+        on the grid yet.
+        """
+        for agent, x, y in zip(agents, xs, ys):
+            self[x, y].append(agent)
+            agent.pos = (x, y)
+        if not agents:
+            return
+        cells = (np.asarray(xs), np.asarray(ys))
+        np.add.at(self.occupants, cells, 1)
+        layer = self.layers.get(type(agents[0]))
+        if layer is not None:
+            np.add.at(layer, cells, 1)
+            if layer is self.obstacles:
+                self.obstacle_version += 1
+
+    def remove_agent(self, agent):
+        x, y = agent.pos
+        super().remove_agent(agent)
+        self.occupants[x, y] -= 1
+        layer = self.layers.get(type(agent))
+        if layer is not None:
+            layer[x, y] -= 1
+            if layer is self.obstacles:
+                self.obstacle_version += 1
+
+    @property
+    def empties(self):
+        return set(zip(*(axis.tolist() for axis in np.nonzero(self.occupants == 0))))
+
+    @property
+    def empty_mask(self):
+        return self.occupants == 0
+
+    def is_cell_empty(self, pos):
+        return not self.occupants[pos]
+
+    def exists_empty_cells(self):
+        return not self.occupants.all()
+
+    def is_free(self, pos):
+        """
+        True if a robot can move into the cell (no obstacle and no robot).
+        """
+        return not (self.obstacles[pos] or self.robots[pos])
+
+    def has_trash(self, pos):
+        return bool(self.trash[pos])
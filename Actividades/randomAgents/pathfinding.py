@@ -0,0 +1,215 @@
+import heapq
+
+# Moore neighborhood offsets, in the same order as grid.get_neighborhood
+MOORE_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+class SearchStats:
+    """
+    Counters for the last search.
+    Attributes:
+        expanded: Nodes popped from the open set and expanded
+        pushed: Entries pushed into the open set
+    """
+    def __init__(self):
+        self.expanded = 0
+        self.pushed = 0
+
+class GridSearch:
+    """
+    A* and jump point search over the obstacle layer of an OccupancyGrid.
+    Scores, parents and the closed set live in flat lists indexed by
+    x * height + y. Each search gets a new id and a cell's entries are only
+    valid when its stamp matches it, so nothing has to be cleared between
+    searches. Every move (diagonal too) costs 1, so the Chebyshev distance is
+    the exact heuristic on an open map.
+    Attributes:
+        grid: OccupancyGrid to search on
+        stats: SearchStats of the last search
+    """
+    def __init__(self, grid):
+        self.grid = grid
+        self.width = grid.width
+        self.height = grid.height
+        size = self.width * self.height
+        self.g_score = [0] * size
+        self.parent = [0] * size
+        self.seen = [0] * size  # search id that last touched the cell
+        self.closed = [0] * size  # search id that last closed the cell
+        self.search_id = 0
+        self.blocked = None
+        self.obstacle_version = None
+        self.stats = SearchStats()
+
+    def refresh(self):
+        """
+        Rebuild the flat obstacle list if the obstacles changed.
+        """
+        if self.obstacle_version != self.grid.obstacle_version:
+            self.blocked = (self.grid.obstacles > 0).ravel().tolist()
+            self.obstacle_version = self.grid.obstacle_version
+
+    def is_blocked(self, x, y):
+        """
+        Obstacles and cells outside the grid are blocked.
+        """
+        return not (0 <= x < self.width and 0 <= y < self.height) or self.blocked[x * self.height + y]
+
+    def search(self, start, goal, jump=False):
+        """
+        Shortest path from start to goal (both included), None if there is none.
+        Args:
+            start, goal: (x, y) positions
+            jump: Use jump point search instead of plain A*
+        """
+        self.refresh()
+        self.stats = SearchStats()
+        height = self.height
+        start_index = start[0] * height + start[1]
+        goal_index = goal[0] * height + goal[1]
+        if self.blocked[start_index] or self.blocked[goal_index]:
+            return None
+
+        self.search_id += 1
+        search_id = self.search_id
+        g_score, parent, seen, closed = self.g_score, self.parent, self.seen, self.closed
+        gx, gy = goal
+        successors = self.jump_successors if jump else self.neighbors
+
+        g_score[start_index] = 0
+        parent[start_index] = start_index
+        seen[start_index] = search_id
+        h = max(abs(start[0] - gx), abs(start[1] - gy))
+        # (f, h, g, index): among equal f the node closer to the goal goes first
+        open_set = [(h, h, 0, start_index)]
+        stats = self.stats
+        stats.pushed = 1
+
+        while open_set:
+            _, _, g, current = heapq.heappop(open_set)
+            if closed[current] == search_id:
+                continue  # stale duplicate entry
+            if current == goal_index:
+                return self.reconstruct_path(current)
+            closed[current] = search_id
+            stats.expanded += 1
+
+            x, y = divmod(current, height)
+            for nx, ny in successors(x, y, parent[current], goal):
+                neighbor = nx * height + ny
+                if closed[neighbor] == search_id:
+                    continue
+                tentative = g + max(abs(nx - x), abs(ny - y))
+                if seen[neighbor] != search_id or tentative < g_score[neighbor]:
+                    seen[neighbor] = search_id
+                    g_score[neighbor] = tentative
+                    parent[neighbor] = current
+                    h = max(abs(nx - gx), abs(ny - gy))
+                    heapq.heappush(open_set, (tentative + h, h, tentative, neighbor))
+                    stats.pushed += 1
+
+        return None  # No path found
+
+    def neighbors(self, x, y, parent, goal):
+        """
+        Free Moore neighbors of (x, y).
+        """
+        width, height, blocked = self.width, self.height, self.blocked
+        return [
+            (nx, ny)
+            for nx, ny in ((x + dx, y + dy) for dx, dy in MOORE_OFFSETS)
+            if 0 <= nx < width and 0 <= ny < height and not blocked[nx * height + ny]
+        ]
+
+    def jump_successors(self, x, y, parent, goal):
+        """
+        Jump points reached from (x, y) along its pruned directions.
+        """
+        px, py = divmod(parent, self.height)
+        for dx, dy in self.pruned_directions(x, y, px, py):
+            point = self.jump(x, y, dx, dy, goal)
+            if point is not None:
+                yield point
+
+    def pruned_directions(self, x, y, px, py):
+        """
+        Natural and forced directions out of (x, y) when arriving from (px, py).
+        """
+        if (px, py) == (x, y):
+            return MOORE_OFFSETS  # start node, every direction
+        dx = (x > px) - (x < px)
+        dy = (y > py) - (y < py)
+        blocked = self.is_blocked
+        directions = []
+        if dx and dy:
+            directions.append((dx, dy))
+            directions.append((dx, 0))
+            directions.append((0, dy))
+            if blocked(x - dx, y) and not blocked(x - dx, y + dy):
+                directions.append((-dx, dy))
+            if blocked(x, y - dy) and not blocked(x + dx, y - dy):
+                directions.append((dx, -dy))
+        elif dx:
+            directions.append((dx, 0))
+            if blocked(x, y + 1) and not blocked(x + dx, y + 1):
+                directions.append((dx, 1))
+            if blocked(x, y - 1) and not blocked(x + dx, y - 1):
+                directions.append((dx, -1))
+        else:
+            directions.append((0, dy))
+            if blocked(x + 1, y) and not blocked(x + 1, y + dy):
+                directions.append((1, dy))
+            if blocked(x - 1, y) and not blocked(x - 1, y + dy):
+                directions.append((-1, dy))
+        return directions
+
+    def jump(self, x, y, dx, dy, goal):
+        """
+        Walk from (x, y) in direction (dx, dy) until a jump point: the goal, a
+        cell with a forced neighbor, or (moving diagonally) a cell from which a
+        straight jump finds one. None if the walk hits an obstacle or the edge.
+        """
+        blocked = self.is_blocked
+        while True:
+            x += dx
+            y += dy
+            if blocked(x, y):
+                return None
+            if (x, y) == goal:
+                return x, y
+            if dx and dy:
+                if (blocked(x - dx, y) and not blocked(x - dx, y + dy)) or (
+                    blocked(x, y - dy) and not blocked(x + dx, y - dy)
+                ):
+                    return x, y
+                if self.jump(x, y, dx, 0, goal) is not None or self.jump(x, y, 0, dy, goal) is not None:
+                    return x, y
+            elif dx:
+                if (blocked(x, y + 1) and not blocked(x + dx, y + 1)) or (
+                    blocked(x, y - 1) and not blocked(x + dx, y - 1)
+                ):
+                    return x, y
+            else:
+                if (blocked(x + 1, y) and not blocked(x + 1, y + dy)) or (
+                    blocked(x - 1, y) and not blocked(x - 1, y + dy)
+                ):
+                    return x, y
+
+    def reconstruct_path(self, current):
+        """
+        Path from the start to current, filling in the cells between jump points.
+        """
+        height = self.height
+        points = [divmod(current, height)]
+        while self.parent[current] != current:
+            current = self.parent[current]
+            points.append(divmod(current, height))
+        points.reverse()
+
+        path = [points[0]]
+        for (x, y) in points[1:]:
+            cx, cy = path[-1]
+            while (cx, cy) != (x, y):
+                cx += (x > cx) - (x < cx)
+                cy += (y > cy) - (y < cy)
+                path.append((cx, cy))
+        return path
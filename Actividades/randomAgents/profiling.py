@@ -0,0 +1,157 @@
+"""
+Per phase timers and counters for RandomModel.step.
+Profiling is off unless the model is built with profile=True or a
+StepProfiler is attached to it. When it is off nothing is timed or wrapped,
+RandomModel.step runs as usual. When it is on, the profiler times the calls
+RandomModel.step makes for each phase (dispatcher.step, schedule.step,
+datacollector.collect and check_termination), wrapped on the instances, so
+the real step still runs. It also wraps the pathfinder, grid and navigation
+of the model to count A* searches, expanded nodes, neighborhood scans and
+moves.
+Usage:
+    model = RandomModel(5, 0.2, 0.1, 50, 50, profile=True)
+    for _ in range(100):
+        model.step()
+    print(model.profiler.report())
+"""
+import time
+
+# Phases of RandomModel.step, in order
+PHASES = ("dispatch", "agents", "collect", "termination")
+# Stands for an attribute the instance did not have before wrap()
+MISSING = object()
+# Time spent on these inside the agents phase
+SUBPHASES = ("astar", "neighborhood", "navigation")
+COUNTERS = ("astar_calls", "expanded", "replans", "moves", "scans")
+
+class StepProfiler:
+    """
+    Records the time of each phase and the counters of every model step.
+    Attributes:
+        model: Profiled RandomModel (model.profiler is this profiler)
+        model_vars: Dict of "<phase>_ms" or counter name to a list with one
+            value per profiled step (read by ChartModule like a datacollector)
+        current: Values of the step in progress
+    """
+    def __init__(self, model):
+        self.model = model
+        self.model_vars = {f"{name}_ms": [] for name in PHASES + SUBPHASES}
+        self.model_vars.update({name: [] for name in COUNTERS})
+        self.current = dict.fromkeys(self.model_vars, 0)
+        self.wrapped = []
+        self.depth = dict.fromkeys(PHASES + SUBPHASES, 0)
+
+        pathfinder, grid, navigation = model.pathfinder, model.grid, model.navigation
+        search = self.timed("astar", pathfinder.search)
+
+        def counted_search(*args, **kwargs):
+            path = search(*args, **kwargs)
+            self.current["astar_calls"] += 1
+            self.current["expanded"] += pathfinder.stats.expanded
+            return path
+
+        get_neighborhood = self.timed("neighborhood", grid.get_neighborhood)
+
+        def counted_neighborhood(*args, **kwargs):
+            self.current["scans"] += 1
+            return get_neighborhood(*args, **kwargs)
+
+        move_agent = grid.move_agent
+
+        def counted_move(*args, **kwargs):
+            self.current["moves"] += 1
+            return move_agent(*args, **kwargs)
+
+        self.wrap(pathfinder, "search", counted_search)
+        self.wrap(grid, "get_neighborhood", counted_neighborhood)
+        self.wrap(grid, "move_agent", counted_move)
+        for name in ("distance", "next_step", "path"):
+            self.wrap(navigation, name, self.timed("navigation", getattr(navigation, name)))
+        # The calls RandomModel.step makes for each phase
+        if model.dispatcher is not None:
+            self.wrap(model.dispatcher, "step", self.timed("dispatch", model.dispatcher.step))
+        self.wrap(model.schedule, "step", self.timed("agents", model.schedule.step))
+        self.wrap(model.datacollector, "collect", self.timed("collect", model.datacollector.collect))
+        self.wrap(model, "check_termination", self.timed("termination", model.check_termination))
+        model_step = model.step
+
+        def step(*args, **kwargs):
+            try:
+                return model_step(*args, **kwargs)
+            finally:
+                self.end_step()
+
+        self.wrap(model, "step", step)
+        model.profiler = self
+
+    def wrap(self, owner, name, function):
+        """
+        Replace a method on one instance, remembered so detach() can undo it.
+        """
+        self.wrapped.append((owner, name, owner.__dict__.get(name, MISSING), function))
+        setattr(owner, name, function)
+
+    def timed(self, phase, function):
+        """
+        function, adding its time to phase. Nested calls (navigation.path
+        calls distance) are only timed once.
+        """
+        current, depth, clock = self.current, self.depth, time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            if depth[phase]:
+                return function(*args, **kwargs)
+            depth[phase] += 1
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                current[f"{phase}_ms"] += 1000 * (clock() - start)
+                depth[phase] -= 1
+
+        return wrapper
+
+    def detach(self):
+        """
+        Stop profiling: put back what each wrapped attribute was before and
+        clear model.profiler. A wrapper something else has replaced since
+        (like FastForwardServer's step) is left alone.
+        """
+        for owner, name, previous, function in reversed(self.wrapped):
+            if owner.__dict__.get(name) is not function:
+                continue
+            if previous is MISSING:
+                del owner.__dict__[name]
+            else:
+                setattr(owner, name, previous)
+        self.wrapped = []
+        self.model.profiler = None
+
+    def count(self, name):
+        self.current[name] += 1
+
+    def end_step(self):
+        """
+        Close the row of the step that just ran.
+        """
+        current = self.current
+        for name, values in self.model_vars.items():
+            values.append(current[name])
+            current[name] = 0
+
+    def totals(self):
+        """
+        Dict of every timer and counter added up over the profiled steps.
+        """
+        return {name: sum(values) for name, values in self.model_vars.items()}
+
+    def report(self):
+        """
+        Table of the total and mean per step of every timer and counter.
+        """
+        steps = len(self.model_vars["agents_ms"])
+        lines = [f"{steps} profiled steps", f"{'':>16} {'total':>12} {'per step':>12}"]
+        for name, total in self.totals().items():
+            total_text = f"{total:12.3f}" if name.endswith("_ms") else f"{total:12d}"
+            lines.append(f"{name:>16} {total_text} {total / max(steps, 1):12.4f}")
+        return "\n".join(lines)
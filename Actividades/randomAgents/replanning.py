@@ -0,0 +1,153 @@
+import heapq
+import math
+
+from pathfinding import MOORE_OFFSETS
+
+class DStarLite:
+    """
+    D* Lite search towards a fixed goal (a charging station), repaired in
+    place when the cost of entering some cells changes.
+    Every move costs 1 plus the extra cost of the cell it enters (robots in
+    the way); obstacles cannot be entered. The search starts from the
+    station's navigation field, which already holds the exact distances with
+    no extra costs, so g and rhs only store the cells whose value differs
+    from the field and a repair only expands the cells around a change.
+    Attributes:
+        grid: OccupancyGrid (obstacles layer)
+        goal: Station the paths lead to
+        field: Navigation field of goal (distances with no extra costs)
+        costs: Extra cost of entering each cell that has one
+        start: Cell the last path was planned from
+        expanded: Cells expanded by all repairs
+    """
+    def __init__(self, grid, goal, field):
+        self.grid = grid
+        self.goal = goal
+        self.field = field
+        self.costs = {}
+        self.g = {}
+        self.rhs = {}
+        self.queue = []  # (key, cell), entries not matching queued are stale
+        self.queued = {}  # cell -> its current key
+        self.km = 0
+        self.start = None
+        self.expanded = 0
+
+    def heuristic(self, a, b):
+        return max(abs(a[0] - b[0]), abs(a[1] - b[1]))
+
+    def base(self, cell):
+        distance = self.field[cell]
+        return math.inf if distance < 0 else int(distance)
+
+    def g_value(self, cell):
+        return self.g[cell] if cell in self.g else self.base(cell)
+
+    def rhs_value(self, cell):
+        return self.rhs[cell] if cell in self.rhs else self.base(cell)
+
+    def neighbors(self, cell):
+        """
+        Neighbors of cell without obstacles.
+        """
+        x, y = cell
+        width, height, obstacles = self.grid.width, self.grid.height, self.grid.obstacles
+        return [
+            (nx, ny)
+            for nx, ny in ((x + dx, y + dy) for dx, dy in MOORE_OFFSETS)
+            if 0 <= nx < width and 0 <= ny < height and not obstacles[nx, ny]
+        ]
+
+    def cost(self, cell):
+        """
+        Cost of moving into cell from one of its neighbors.
+        """
+        return 1 + self.costs.get(cell, 0)
+
+    def key(self, cell):
+        value = min(self.g_value(cell), self.rhs_value(cell))
+        return (value + self.heuristic(self.start, cell) + self.km, value)
+
+    def update_vertex(self, cell):
+        if cell != self.goal:
+            self.rhs[cell] = min(
+                (self.cost(n) + self.g_value(n) for n in self.neighbors(cell)), default=math.inf
+            )
+        if self.g_value(cell) != self.rhs_value(cell):
+            key = self.key(cell)
+            self.queued[cell] = key
+            heapq.heappush(self.queue, (key, cell))
+        else:
+            self.queued.pop(cell, None)
+
+    def top_key(self):
+        """
+        Smallest key in the queue (dropping stale entries), None if empty.
+        """
+        queue, queued = self.queue, self.queued
+        while queue and queued.get(queue[0][1]) != queue[0][0]:
+            heapq.heappop(queue)
+        return queue[0][0] if queue else None
+
+    def set_costs(self, costs):
+        """
+        Replace the extra costs by costs (dict of cell to extra cost) and
+        queue the cells whose moves changed.
+        """
+        changed = {cell for cell in costs.keys() | self.costs.keys()
+                   if costs.get(cell, 0) != self.costs.get(cell, 0)}
+        self.costs = dict(costs)
+        for cell in changed:
+            # Moves into cell changed: the rhs of every neighbor may have too
+            for neighbor in self.neighbors(cell):
+                self.update_vertex(neighbor)
+
+    def move_start(self, start):
+        """
+        The robot moved: keep the queued keys valid (km) without reordering.
+        """
+        if self.start is not None:
+            self.km += self.heuristic(self.start, start)
+        self.start = start
+
+    def compute_shortest_path(self):
+        start = self.start
+        while True:
+            top = self.top_key()
+            if top is None:
+                break
+            if not (top < self.key(start) or self.rhs_value(start) != self.g_value(start)):
+                break
+            _, cell = heapq.heappop(self.queue)
+            del self.queued[cell]
+            self.expanded += 1
+            new_key = self.key(cell)
+            if top < new_key:
+                self.queued[cell] = new_key
+                heapq.heappush(self.queue, (new_key, cell))
+            elif self.g_value(cell) > self.rhs_value(cell):
+                self.g[cell] = self.rhs_value(cell)
+                for neighbor in self.neighbors(cell):
+                    self.update_vertex(neighbor)
+            else:
+                self.g[cell] = math.inf
+                self.update_vertex(cell)
+                for neighbor in self.neighbors(cell):
+                    self.update_vertex(neighbor)
+
+    def plan(self, start, costs):
+        """
+        Cheapest path from start to the goal (both included) with the given
+        extra costs, None if there is none.
+        """
+        self.move_start(start)
+        self.set_costs(costs)
+        self.compute_shortest_path()
+        if self.g_value(start) == math.inf:
+            return None
+        path = [start]
+        current = start
+        while current != self.goal and len(path) <= self.grid.width * self.grid.height:
+            current = min(self.neighbors(current), key=lambda n: self.cost(n) + self.g_value(n))
+            path.append(current)
+        return path
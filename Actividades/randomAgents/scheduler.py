@@ -0,0 +1,61 @@
+from collections import defaultdict
+from mesa.time import BaseScheduler
+
+class FleetActivation(BaseScheduler):
+    """
+    Scheduler that keeps the active robots apart from the passive map entities.
+    Robots are activated once per step in random order, like RandomActivation
+    (the same order for the same seed). Passive entities (obstacles, trash,
+    chargers) are never activated; they are kept in a per type index by
+    position so they can be found and removed in O(1).
+    Attributes:
+        robots: Active agents, in their current activation order
+        passive: Dict of entity type to a dict of position to entity
+    """
+    def __init__(self, model):
+        super().__init__(model)
+        self.robots = []
+        self.passive = defaultdict(dict)
+
+    def add(self, agent):
+        super().add(agent)
+        self.robots.append(agent)
+
+    def remove(self, agent):
+        super().remove(agent)
+        self.robots.remove(agent)
+
+    def add_passive(self, entity):
+        """
+        Index a passive entity at its position (it must already be on the grid).
+        """
+        self.passive[type(entity)][entity.pos] = entity
+
+    def add_passives(self, entities):
+        """
+        Index many passive entities of one type (already on the grid).
+        """
+        if entities:
+            self.passive[type(entities[0])].update((entity.pos, entity) for entity in entities)
+
+    def remove_passive(self, entity):
+        del self.passive[type(entity)][entity.pos]
+
+    def passive_at(self, entity_type, pos):
+        """
+        Passive entity of entity_type at pos, None if there is none.
+        """
+        return self.passive[entity_type].get(pos)
+
+    def passive_count(self, entity_type):
+        return len(self.passive[entity_type])
+
+    def step(self):
+        """
+        Shuffle the robots (in place, like RandomActivation) and step each one.
+        """
+        self.model.random.shuffle(self.robots)
+        for robot in self.robots:
+            robot.step()
+        self.steps += 1
+        self.time += 1
@@ -1,15 +1,54 @@
+import os
+import sys
+
 import mesa
+import numpy as np
 
+# Modules shared with the other projects are in the repo's shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "shared"))
 from model import RandomModel, ObstacleAgent, TrashAgent, ChargingStation, RandomAgent
 from mesa.visualization import CanvasGrid, BarChartModule, ChartModule, PieChartModule
-from mesa.visualization import ModularServer
+from delta_canvas import DeltaCanvasGrid
+from fastforward import FastForwardServer
 
 from mesa.visualization.modules import TextElement
 
+# Draw the grid with DeltaCanvasGrid from the occupancy layers instead of a
+# portrayal per agent: one color per cell (a robot over trash over a
+# station or obstacle), and only the cells that changed are sent
+DELTA_CANVAS = False
+
+# Cell values of occupancy_frame and their colors, the portrayal's colors
+ROBOT_COLORS = ["#FF0000", "#A52A2A", "#00FFFF", "#808080", "#FFFF00"]
+CELL_COLORS = {1: "#808080", 2: "#0000FF", 3: "#008000"}
+CELL_COLORS.update({4 + i: color for i, color in enumerate(ROBOT_COLORS)})
+
 class TimeElement(TextElement):
     def render(self, model):
         return f"<b>Tiempo actual:</b> {model.accumulated_steps} pasos"
 
+class ProfileElement(TextElement):
+    """
+    Phase times and counters of the last step, when the model is profiled.
+    """
+    def render(self, model):
+        profiler = model.profiler
+        if profiler is None or not profiler.model_vars["agents_ms"]:
+            return ""
+        last = {name: values[-1] for name, values in profiler.model_vars.items()}
+        times = ", ".join(f"{name[:-3]} {value:.2f}" for name, value in last.items() if name.endswith("_ms"))
+        counts = ", ".join(f"{name} {value}" for name, value in last.items() if not name.endswith("_ms"))
+        return f"<b>Last step (ms):</b> {times}<br><b>Counters:</b> {counts}"
+
+class ProfileChart(ChartModule):
+    """
+    ChartModule over the profiler's series, empty when the model is not profiled.
+    """
+    def render(self, model):
+        if model.profiler is None:
+            return [0 for _ in self.series]
+        return super().render(model)
+
 def agent_portrayal(agent):
     colors = ["red", "brown", "cyan", "grey", "yellow"]
     if agent is None:
@@ -48,14 +87,33 @@ def agent_portrayal(agent):
 
     return portrayal
 
+def occupancy_frame(model):
+    """
+    uint8 [x, y] values for DeltaCanvasGrid: 0 empty, 1 obstacle, 2 trash,
+    3 charging station, 4 + unique_id % 5 a robot.
+    """
+    grid = model.grid
+    frame = np.zeros((grid.width, grid.height), dtype=np.uint8)
+    frame[grid.obstacles > 0] = 1
+    frame[grid.chargers > 0] = 3
+    frame[grid.trash > 0] = 2
+    for robot in model.schedule.robots:
+        frame[robot.pos] = 4 + robot.unique_id % len(ROBOT_COLORS)
+    return frame
+
 model_params = {
         "N": mesa.visualization.Slider("Roombas", 5, 1, 15, 1),
         "M": mesa.visualization.Slider("Trash Density", value=0.1, min_value=0, max_value=1, step=0.05),
         "O": mesa.visualization.Slider("Obstacle Density", value=0.1, min_value=0, max_value=1, step=0.05),
         "width": 20,
-        "height": 20
+        "height": 20,
+        "exploration": mesa.visualization.Choice("Exploration", value="random", choices=["random", "frontier"]),
+        "profile": mesa.visualization.Checkbox("Profile steps", False)
 }
-grid = CanvasGrid(agent_portrayal, 20, 20, 500, 500)
+if DELTA_CANVAS:
+    grid = DeltaCanvasGrid(CELL_COLORS, 20, 20, 500, 500, frame=occupancy_frame)
+else:
+    grid = CanvasGrid(agent_portrayal, 20, 20, 500, 500)
 
 bar_chart = BarChartModule(
     [{"Label":"Steps", "Color":"#AA0000"}], 
@@ -72,7 +130,20 @@ pie_chart = PieChartModule(
     data_collector_name='datacollector'
 )
 
-server = ModularServer(RandomModel, [grid, trash_chart, TimeElement(), pie_chart, bar_chart], "Random Agents", model_params)
+profile_chart = ProfileChart(
+    [{"Label": "dispatch_ms", "Color": "Purple"},
+     {"Label": "agents_ms", "Color": "Blue"},
+     {"Label": "astar_ms", "Color": "Red"},
+     {"Label": "collect_ms", "Color": "Orange"},
+     {"Label": "termination_ms", "Color": "Grey"}],
+    data_collector_name='profiler'
+)
+
+server = FastForwardServer(
+    RandomModel,
+    [grid, trash_chart, TimeElement(), pie_chart, bar_chart, ProfileElement(), profile_chart],
+    "Random Agents", model_params,
+)
                        
 server.port = 8523  # The default
 server.launch()
@@ -0,0 +1,175 @@
+"""
+Headless parameter sweep for RandomModel.
+Runs every combination of N, M, O, width and height for a number of
+replicates across a process pool, without the server. Each run gets its
+own seed derived from the base seed, its parameters and its replicate
+number, so results do not depend on the number of workers or the order in
+which runs finish. Rows are appended to a CSV file as runs finish.
+Strategy parameters (exploration, dispatch) are left out of the seed, so
+every strategy runs on the same maps; --compare prints them side by side.
+Usage:
+    python sweep.py --N 5 10 15 --M 0.1 0.3 --O 0.1 0.2 --replicates 100 --out sweep.csv
+    python sweep.py --exploration random frontier --width 40 --height 40 --compare
+    python sweep.py --dispatch none greedy hungarian --compare
+"""
+import argparse
+import csv
+import hashlib
+import itertools
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from model import RandomModel
+from agent import RandomAgent
+
+FIELDS = [
+    "N", "M", "O", "width", "height", "max_steps", "exploration", "dispatch", "replicate", "seed",
+    "steps", "initial_dirty", "dirty_left", "cleaned", "covered", "robot_steps", "replans",
+    "planning_seconds", "seconds",
+]
+
+# Parameters that change how the robots behave, not the map they start on
+STRATEGY_PARAMS = {"exploration", "dispatch"}
+
+def run_seed(base_seed, params, replicate):
+    """
+    Deterministic 64 bit seed for one run (strategy parameters are ignored).
+    """
+    params = {key: value for key, value in params.items() if key not in STRATEGY_PARAMS}
+    key = repr((base_seed, sorted(params.items()), replicate)).encode()
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+def make_runs(grid, replicates, base_seed):
+    """
+    Yield the keyword arguments of every run in the sweep.
+    Args:
+        grid: Dict of parameter name to the list of values to sweep
+        replicates: Runs per parameter combination
+        base_seed: Seed every run seed is derived from
+    """
+    names = list(grid)
+    for values in itertools.product(*(grid[name] for name in names)):
+        params = dict(zip(names, values))
+        for replicate in range(replicates):
+            yield dict(params, replicate=replicate, seed=run_seed(base_seed, params, replicate))
+
+def run_one(run):
+    """
+    Run one model until it stops and summarize it (runs in a worker process).
+    """
+    start = time.perf_counter()
+    params = {key: value for key, value in run.items() if key != "replicate"}
+    if params.get("dispatch") == "none":
+        params["dispatch"] = None
+    model = RandomModel(**params)
+    initial_dirty = model.count_dirty_cells()
+    while model.running:
+        model.step()
+    robot_steps = sum(a.steps_taken for a in model.schedule.agents if isinstance(a, RandomAgent))
+    return dict(
+        run,
+        steps=model.accumulated_steps,
+        initial_dirty=initial_dirty,
+        dirty_left=model.count_dirty_cells(),
+        cleaned=model.count_dirty_cells() == 0,
+        covered=round(model.coverage.fraction(), 4),
+        robot_steps=robot_steps,
+        replans=model.replans,
+        planning_seconds=round(model.planning_time, 4),
+        seconds=round(time.perf_counter() - start, 4),
+    )
+
+def write_rows(writer, f, futures):
+    for future in futures:
+        writer.writerow(future.result())
+    f.flush()
+    return len(futures)
+
+def sweep(grid, replicates, out, base_seed=0, workers=None):
+    """
+    Run the sweep, writing one CSV row per run as it finishes.
+    At most a few runs per worker are queued at a time, so memory does not
+    grow with the size of the sweep.
+    Returns the number of runs written.
+    """
+    runs = make_runs(grid, replicates, base_seed)
+    fields = FIELDS + [name for name in grid if name not in FIELDS]
+    write_header = not os.path.exists(out) or os.path.getsize(out) == 0
+    workers = workers or os.cpu_count() or 1
+    written = 0
+
+    with open(out, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        if write_header:
+            writer.writeheader()
+
+        if workers == 1:
+            for run in runs:
+                writer.writerow(run_one(run))
+                f.flush()
+                written += 1
+            return written
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            for run in runs:
+                if len(pending) >= workers * 4:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    written += write_rows(writer, f, done)
+                pending.add(pool.submit(run_one, run))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                written += write_rows(writer, f, done)
+    return written
+
+def compare(out):
+    """
+    Mean steps, cleaned rate and trash left per strategy (exploration and
+    dispatch), for every map configuration in the CSV (runs are paired by seed).
+    """
+    import pandas as pd
+
+    runs = pd.read_csv(out)
+    config = [name for name in ("N", "M", "O", "width", "height", "max_steps") if name in runs]
+    strategy = [name for name in STRATEGY_PARAMS if name in runs]
+    runs = runs.fillna({name: "none" for name in strategy})
+    summary = runs.groupby(config + sorted(strategy)).agg(
+        runs=("steps", "size"),
+        steps=("steps", "mean"),
+        cleaned=("cleaned", "mean"),
+        dirty_left=("dirty_left", "mean"),
+        covered=("covered", "mean"),
+    )
+    return summary.unstack(sorted(strategy))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--N", type=int, nargs="+", default=[5], help="Roombas")
+    parser.add_argument("--M", type=float, nargs="+", default=[0.1], help="Trash density")
+    parser.add_argument("--O", type=float, nargs="+", default=[0.1], help="Obstacle density")
+    parser.add_argument("--width", type=int, nargs="+", default=[20])
+    parser.add_argument("--height", type=int, nargs="+", default=[20])
+    parser.add_argument("--max-steps", type=int, nargs="+", default=[250])
+    parser.add_argument("--exploration", nargs="+", default=["random"], choices=["random", "frontier"])
+    parser.add_argument("--dispatch", nargs="+", default=["none"], choices=["none", "greedy", "hungarian"])
+    parser.add_argument("--replicates", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0, help="Base seed")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: all cores)")
+    parser.add_argument("--out", default="sweep.csv")
+    parser.add_argument("--compare", action="store_true", help="Print a summary per strategy")
+    args = parser.parse_args()
+
+    grid = {
+        "N": args.N, "M": args.M, "O": args.O,
+        "width": args.width, "height": args.height, "max_steps": args.max_steps,
+        "exploration": args.exploration, "dispatch": args.dispatch,
+    }
+    start = time.perf_counter()
+    written = sweep(grid, args.replicates, args.out, args.seed, args.workers)
+    print(f"{written} runs written to {args.out} in {time.perf_counter() - start:.1f}s")
+    if args.compare:
+        print(compare(args.out).to_string())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# Restored runs must continue exactly like the uninterrupted run
+import pytest
+
+import checkpoint
+from model import RandomModel
+
+def saved_bytes(model, path):
+    checkpoint.save(model, path)
+    with open(path, "rb") as f:
+        return f.read()
+
+@pytest.mark.parametrize("options", [
+    dict(),
+    dict(exploration="frontier"),
+    dict(dispatch="hungarian"),
+    dict(exploration="frontier", dispatch="greedy"),
+])
+@pytest.mark.parametrize("cut", [0, 7, 40])
+def test_round_trip_is_bit_for_bit(tmp_path, options, cut):
+    original = RandomModel(6, 0.15, 0.15, 25, 25, max_steps=120, seed=cut, **options)
+    for _ in range(cut):
+        original.step()
+    first = saved_bytes(original, tmp_path / "a.ckpt")
+    restored = checkpoint.restore(tmp_path / "a.ckpt")
+    assert saved_bytes(restored, tmp_path / "b.ckpt") == first
+
+    while original.running:
+        original.step()
+    while restored.running:
+        restored.step()
+    assert saved_bytes(restored, tmp_path / "b.ckpt") == saved_bytes(original, tmp_path / "a.ckpt")
+    assert restored.datacollector.get_agent_vars_dataframe().equals(original.datacollector.get_agent_vars_dataframe())
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not.ckpt"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError):
+        checkpoint.restore(path)
@@ -0,0 +1,80 @@
+# ColumnarDataCollector must keep every agent row, in memory, spilled or saved
+import numpy as np
+import pandas as pd
+import pytest
+
+from agent import RandomAgent
+from collector import ColumnarDataCollector
+from model import RandomModel
+
+def run(collector, steps=12):
+    """
+    Step a RandomModel collecting into collector, and return the rows a
+    plain loop over the robots gives, in the same order.
+    """
+    model = RandomModel(4, 0.3, 0.1, 12, 12, seed=6)
+    model.datacollector = collector
+    expected = []
+    for step in range(steps + 1):
+        if step:
+            model.step()
+        else:
+            collector.collect(model)
+        expected.extend(
+            (model._steps, robot.unique_id, robot.steps_taken, robot.energy)
+            for robot in model.get_agents_of_type(RandomAgent)
+        )
+    return model, np.array(expected)
+
+def columnar(**options):
+    return ColumnarDataCollector(
+        model_reporters={"DirtyCells": lambda m: m.count_dirty_cells()},
+        agent_reporters={"Steps": "steps_taken", "Battery": "energy"},
+        agent_type=RandomAgent,
+        **options,
+    )
+
+def frame_rows(frame):
+    return np.column_stack([frame.index.get_level_values(0), frame.index.get_level_values(1), frame.to_numpy()])
+
+def test_rows_match_the_agents():
+    collector = columnar(chunk_size=5)
+    _, expected = run(collector)
+    assert (collector.agent_array() == expected).all()
+    assert (frame_rows(collector.get_agent_vars_dataframe()) == expected).all()
+    assert list(collector.get_agent_vars_dataframe().columns) == ["Steps", "Battery"]
+    assert len(collector.get_model_vars_dataframe()) == 13
+
+def test_spilled_rows_come_first(tmp_path):
+    collector = columnar(chunk_size=7, spill_dir=str(tmp_path / "spill"), max_chunks=2)
+    _, expected = run(collector)
+    assert collector.spilled and len(collector.chunks) <= 2
+    spilled = frame_rows(collector.load_spilled())
+    in_memory = collector.agent_array()
+    assert len(spilled) == 7 * len(collector.spilled)
+    assert (np.concatenate([spilled, in_memory]) == expected).all()
+
+def test_save_npz(tmp_path):
+    collector = columnar(chunk_size=6)
+    run(collector)
+    path = str(tmp_path / "agents.npz")
+    collector.save(path)
+    with np.load(path) as saved:
+        assert sorted(saved.files) == sorted(collector.columns)
+        stored = np.column_stack([saved[name] for name in collector.columns])
+    assert (stored == collector.agent_array()).all()
+
+def test_save_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    collector = columnar()
+    run(collector)
+    path = str(tmp_path / "agents.parquet")
+    collector.save(path)
+    assert (pd.read_parquet(path)[collector.columns].to_numpy() == collector.agent_array()).all()
+
+def test_add_rows_fills_chunks():
+    collector = columnar(chunk_size=4)
+    blocks = [np.arange(start, start + 4 * count).reshape(count, 4) for start, count in ((0, 3), (12, 6), (36, 1))]
+    for block in blocks:
+        collector.add_rows(block)
+    assert (collector.agent_array() == np.concatenate(blocks)).all()
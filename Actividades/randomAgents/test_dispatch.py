@@ -0,0 +1,52 @@
+# The Hungarian dispatch must find the optimal assignment
+import itertools
+import math
+
+import numpy as np
+import pytest
+
+from dispatch import greedy_assignment, hungarian_assignment
+
+def best_assignment(cost):
+    """
+    Brute force (forbidden pairs, total cost) of the best assignment: as few
+    forbidden (infinite) pairs as possible, then the lowest cost.
+    """
+    rows, columns = cost.shape
+    best = (math.inf, math.inf)
+    if rows <= columns:
+        options = (list(zip(range(rows), chosen)) for chosen in itertools.permutations(range(columns), rows))
+    else:
+        options = (list(zip(chosen, range(columns))) for chosen in itertools.permutations(range(rows), columns))
+    for pairs in options:
+        values = [cost[pair] for pair in pairs]
+        finite = [value for value in values if math.isfinite(value)]
+        best = min(best, (len(values) - len(finite), sum(finite)))
+    return best
+
+def check(cost, pairs):
+    """
+    (forbidden pairs, total cost) of pairs, checking it is an assignment.
+    """
+    assert len({row for row, _ in pairs}) == len(pairs)
+    assert len({column for _, column in pairs}) == len(pairs)
+    assert all(math.isfinite(cost[pair]) for pair in pairs)
+    return min(cost.shape) - len(pairs), sum(cost[pair] for pair in pairs)
+
+@pytest.mark.parametrize("shape", [(1, 1), (3, 3), (4, 6), (6, 4), (5, 5)])
+@pytest.mark.parametrize("seed", range(5))
+def test_hungarian_is_optimal(shape, seed):
+    rng = np.random.default_rng(seed)
+    cost = rng.integers(0, 30, size=shape).astype(float)
+    cost[rng.random(shape) < 0.2] = math.inf
+    forbidden, total = check(cost, hungarian_assignment(cost))
+    expected = best_assignment(cost)
+    assert forbidden == expected[0]
+    assert total == pytest.approx(expected[1])
+
+    # Greedy is never better
+    greedy_forbidden, greedy_total = check(cost, greedy_assignment(cost))
+    assert (greedy_forbidden, greedy_total) >= (forbidden, total)
+
+def test_empty_cost():
+    assert hungarian_assignment(np.zeros((0, 3))) == []
@@ -0,0 +1,94 @@
+# CoverageMap must send robots to the nearest frontier cell nobody else claimed
+from collections import deque
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from exploration import CoverageMap
+from model import RandomModel
+from navigation import MOORE_OFFSETS
+from occupancy import OccupancyGrid
+
+def bfs_distances(obstacles, start):
+    width, height = obstacles.shape
+    distances = {start: 0}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        for dx, dy in MOORE_OFFSETS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height and not obstacles[nx, ny] and (nx, ny) not in distances:
+                distances[(nx, ny)] = distances[(x, y)] + 1
+                queue.append((nx, ny))
+    return distances
+
+def random_coverage(seed):
+    rng = np.random.default_rng(seed)
+    grid = OccupancyGrid(14, 10, torus=False)
+    grid.obstacles[...] = rng.random((14, 10)) < 0.2
+    coverage = CoverageMap(grid)
+    coverage.covered |= rng.random((14, 10)) < 0.85
+    free = [tuple(int(v) for v in cell) for cell in np.argwhere(grid.obstacles == 0)]
+    return rng, grid, coverage, free
+
+@pytest.mark.parametrize("seed", range(8))
+def test_nearest_frontier_is_nearest(seed):
+    rng, grid, coverage, free = random_coverage(seed)
+    robots = [SimpleNamespace(unique_id=i, pos=free[rng.integers(len(free))], frontier_target=None) for i in range(4)]
+
+    for robot in robots:
+        path = coverage.nearest_frontier(robot)
+        distances = bfs_distances(grid.obstacles, robot.pos)
+        targets = [cell for cell in distances if coverage.is_frontier(cell) and cell not in coverage.claims]
+        if not targets:
+            assert path is None
+            continue
+        assert path[0] == robot.pos and path[-1] in targets
+        assert len(path) - 1 == min(distances[cell] for cell in targets)
+        for (x, y), (nx, ny) in zip(path, path[1:]):
+            assert max(abs(nx - x), abs(ny - y)) == 1 and not grid.obstacles[nx, ny]
+        coverage.claim(robot, path[-1])
+
+    # One robot per target
+    assert len(coverage.claims) == len(set(coverage.claims.values()))
+
+def test_claims_are_released():
+    grid = OccupancyGrid(5, 1, torus=False)
+    coverage = CoverageMap(grid)
+    coverage.covered[:3, 0] = True
+    first = SimpleNamespace(unique_id=1, pos=(0, 0), frontier_target=None)
+    second = SimpleNamespace(unique_id=2, pos=(0, 0), frontier_target=None)
+
+    coverage.claim(first, coverage.nearest_frontier(first)[-1])
+    assert first.frontier_target == (3, 0)
+    # Its own claim does not stop the first robot
+    assert coverage.nearest_frontier(first)[-1] == (3, 0)
+    assert coverage.nearest_frontier(second)[-1] == (4, 0)
+    coverage.release(first)
+    assert coverage.claims == {} and first.frontier_target is None
+    assert coverage.nearest_frontier(second)[-1] == (3, 0)
+
+    coverage.covered[...] = True
+    assert coverage.nearest_frontier(second) is None
+
+def test_mark_seen_skips_trash():
+    grid = OccupancyGrid(4, 4, torus=False)
+    grid.trash[2, 2] = 1
+    grid.obstacles[3, 3] = 1
+    coverage = CoverageMap(grid)
+    coverage.mark_seen((1, 1))
+    assert coverage.covered[:3, :3].sum() == 8 and not coverage.covered[2, 2]
+    assert coverage.fraction() == 8 / 15
+    coverage.mark_clean((2, 2))
+    assert coverage.fraction() == 9 / 15
+
+def test_frontier_run_keeps_claims_unique():
+    model = RandomModel(5, 0.2, 0.1, 15, 15, exploration="frontier", seed=2)
+    covered = []
+    for _ in range(40):
+        model.step()
+        claims = model.coverage.claims
+        assert len(claims) == len(set(claims.values()))
+        covered.append(model.coverage.fraction())
+    assert covered == sorted(covered) and covered[-1] > covered[0]
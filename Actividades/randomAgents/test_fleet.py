@@ -0,0 +1,51 @@
+# FleetModel's reservation pass must never put two wandering robots in a cell
+import numpy as np
+import pytest
+
+from fleet import FleetModel
+
+def positions(model):
+    return model.x * model.height + model.y
+
+def check_step(model):
+    """
+    Step the model and check the moves and the robots layer.
+    """
+    before = positions(model)
+    trash_before = model.trash.copy()
+    model.step()
+    after = positions(model)
+
+    counts = np.bincount(after, minlength=model.width * model.height)
+    assert (model.robots.ravel() == counts).all()
+    moved = np.flatnonzero(before != after)
+    bx, by = np.divmod(before[moved], model.height)
+    ax, ay = np.divmod(after[moved], model.height)
+    assert (np.maximum(abs(ax - bx), abs(ay - by)) == 1).all()
+    assert not model.obstacles.ravel()[after].any()
+    # Wandering robots only take cells no other robot is in
+    wandered = moved[~model.returning[moved]]
+    assert (counts[after[wandered]] == 1).all()
+    assert model.dirty_cells == np.count_nonzero(model.trash) <= np.count_nonzero(trash_before)
+
+@pytest.mark.parametrize("seed", range(4))
+def test_crowded_fleet_never_shares_cells(seed):
+    # Far from running low, so every robot wanders
+    model = FleetModel(60, 0.3, 0.1, 10, 10, rounds=3, seed=seed)
+    for _ in range(25):
+        check_step(model)
+        assert model.robots.max() <= 1
+    assert not model.returning.any()
+
+@pytest.mark.parametrize("rounds", [1, 3])
+def test_returning_fleet_keeps_wanderers_apart(rounds):
+    model = FleetModel(40, 0.2, 0.15, 16, 16, max_steps=300, rounds=rounds, seed=5)
+    returned = False
+    for _ in range(150):
+        check_step(model)
+        returned |= model.returning.any()
+    assert returned
+
+def test_more_robots_than_free_cells():
+    with pytest.raises(ValueError):
+        FleetModel(30, 0.1, 0.9, 5, 5, seed=0)
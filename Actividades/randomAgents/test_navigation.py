@@ -0,0 +1,66 @@
+# NavigationMap's distance fields must match a plain BFS from the goal
+from collections import deque
+
+import numpy as np
+import pytest
+
+from agent import ObstacleAgent
+from model import RandomModel
+from navigation import MOORE_OFFSETS, NavigationMap
+from occupancy import OccupancyGrid
+
+def bfs_field(obstacles, goal):
+    """
+    Moves from every cell to goal, -1 where it cannot be reached.
+    """
+    width, height = obstacles.shape
+    field = np.full((width, height), -1)
+    if obstacles[goal]:
+        return field
+    field[goal] = 0
+    queue = deque([goal])
+    while queue:
+        x, y = queue.popleft()
+        for dx, dy in MOORE_OFFSETS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height and not obstacles[nx, ny] and field[nx, ny] < 0:
+                field[nx, ny] = field[x, y] + 1
+                queue.append((nx, ny))
+    return field
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("density", [0.0, 0.2, 0.4])
+def test_fields_match_bfs(seed, density):
+    rng = np.random.default_rng(seed)
+    grid = OccupancyGrid(16, 11, torus=False)
+    grid.obstacles[...] = rng.random((16, 11)) < density
+    navigation = NavigationMap(grid)
+    cells = [(x, y) for x in range(16) for y in range(11)]
+
+    for goal in [cells[i] for i in rng.choice(len(cells), size=6, replace=False)]:
+        expected = bfs_field(grid.obstacles, goal)
+        assert (navigation.field(goal) == expected).all()
+        for start in [cells[i] for i in rng.choice(len(cells), size=10, replace=False)]:
+            path = navigation.path(start, goal)
+            if expected[start] < 0:
+                assert path is None and navigation.distance(goal, start) is None
+                continue
+            assert navigation.distance(goal, start) == expected[start]
+            assert path[0] == start and path[-1] == goal and len(path) - 1 == expected[start]
+            for (x, y), (nx, ny) in zip(path, path[1:]):
+                assert max(abs(nx - x), abs(ny - y)) == 1 and not grid.obstacles[nx, ny]
+
+def test_fields_rebuild_when_obstacles_change():
+    model = RandomModel(1, 0, 0, 9, 9, seed=3)
+    grid, navigation = model.grid, model.navigation
+    goal = (0, 0)
+    assert navigation.distance(goal, (8, 0)) == 8
+    assert navigation.field(goal) is navigation.field(goal)
+
+    # A wall at x = 4 with one gap at the top
+    for y in range(8):
+        grid.place_agent(ObstacleAgent(model.next_id(), model), (4, y))
+    assert (navigation.field(goal) == bfs_field(grid.obstacles, goal)).all()
+    # Up to the gap at (4, 8) and back down
+    assert navigation.distance(goal, (8, 0)) == 16
+    assert navigation.next_step(goal, goal) is None
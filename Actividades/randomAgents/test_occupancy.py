@@ -0,0 +1,48 @@
+# OccupancyGrid's layers and empty cells must agree with the agents on the grid
+import numpy as np
+import pytest
+
+from agent import ObstacleAgent, TrashAgent
+from model import RandomModel
+from occupancy import OccupancyGrid
+
+def check_empties(grid):
+    """
+    Compare every empty cell view with a scan of the cell contents.
+    """
+    empty = np.array([[not grid[x, y] for y in range(grid.height)] for x in range(grid.width)])
+    assert grid.empties == set(zip(*(axis.tolist() for axis in np.nonzero(empty))))
+    assert (grid.empty_mask == empty).all()
+    assert all(grid.is_cell_empty((x, y)) == empty[x, y] for x in range(grid.width) for y in range(grid.height))
+    assert grid.exists_empty_cells() == empty.any()
+
+def test_place_agents_keeps_empties():
+    model = RandomModel(3, 0.3, 0.2, 12, 9, seed=5)
+    grid = model.grid
+    check_empties(grid)
+
+    obstacles = [ObstacleAgent(model.next_id(), model) for _ in range(3)]
+    free = sorted(grid.empties)[:3]
+    grid.place_agents(obstacles, [x for x, _ in free], [y for _, y in free])
+    check_empties(grid)
+    assert all(grid.obstacles[pos] == 1 for pos in free)
+
+    robot = model.schedule.robots[0]
+    grid.move_agent(robot, free[0])
+    grid.remove_agent(obstacles[1])
+    check_empties(grid)
+    grid.move_to_empty(robot)
+    check_empties(grid)
+
+def test_place_agents_counts_stacked_agents():
+    grid = OccupancyGrid(4, 3, torus=False)
+    model = RandomModel(1, 0, 0, 4, 3, seed=0)
+    trash = [TrashAgent(model.next_id(), model) for _ in range(3)]
+    grid.place_agents(trash, [1, 1, 2], [0, 0, 2])
+    assert grid.trash[1, 0] == 2 and grid.trash[2, 2] == 1
+    assert grid.occupants.sum() == 3
+    check_empties(grid)
+
+def test_more_robots_than_free_cells():
+    with pytest.raises(ValueError, match="Cannot place 5 robots"):
+        RandomModel(5, 0, 1, 3, 3, seed=0)
@@ -0,0 +1,76 @@
+# A* and jump point search must find valid shortest paths
+from collections import deque
+
+import numpy as np
+import pytest
+
+from agent import ObstacleAgent
+from model import RandomModel
+from occupancy import OccupancyGrid
+from pathfinding import MOORE_OFFSETS, GridSearch
+
+def bfs_distances(obstacles, start):
+    """
+    Moves from start to every free cell it reaches (every move costs 1).
+    """
+    width, height = obstacles.shape
+    distances = {start: 0}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        for dx, dy in MOORE_OFFSETS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height and not obstacles[nx, ny] and (nx, ny) not in distances:
+                distances[(nx, ny)] = distances[(x, y)] + 1
+                queue.append((nx, ny))
+    return distances
+
+def check_path(obstacles, path, start, goal):
+    assert path[0] == start and path[-1] == goal
+    for (x, y), (nx, ny) in zip(path, path[1:]):
+        assert max(abs(nx - x), abs(ny - y)) == 1
+        assert not obstacles[nx, ny]
+
+@pytest.mark.parametrize("jump", [False, True])
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("density", [0.1, 0.3])
+def test_paths_are_shortest(jump, seed, density):
+    rng = np.random.default_rng(seed)
+    grid = OccupancyGrid(17, 13, torus=False)
+    grid.obstacles[...] = rng.random((17, 13)) < density
+    search = GridSearch(grid)
+    free = [tuple(int(v) for v in cell) for cell in np.argwhere(grid.obstacles == 0)]
+
+    for _ in range(15):
+        start = free[rng.integers(len(free))]
+        distances = bfs_distances(grid.obstacles, start)
+        for _ in range(10):
+            goal = free[rng.integers(len(free))]
+            path = search.search(start, goal, jump=jump)
+            if goal not in distances:
+                assert path is None
+                continue
+            check_path(grid.obstacles, path, start, goal)
+            assert len(path) - 1 == distances[goal]
+
+def test_blocked_ends_have_no_path():
+    grid = OccupancyGrid(5, 5, torus=False)
+    grid.obstacles[2, 2] = 1
+    search = GridSearch(grid)
+    assert search.search((0, 0), (2, 2)) is None
+    assert search.search((2, 2), (4, 4), jump=True) is None
+    assert search.search((1, 1), (1, 1)) == [(1, 1)]
+
+def test_new_obstacles_are_searched_around():
+    model = RandomModel(1, 0, 0, 7, 7, seed=1)
+    grid, search = model.grid, model.pathfinder
+    assert len(search.search((0, 3), (6, 3))) == 7
+
+    # A wall at x = 3 with one gap at the top
+    wall = [ObstacleAgent(model.next_id(), model) for _ in range(6)]
+    for agent, y in zip(wall, range(6)):
+        grid.place_agent(agent, (3, y))
+    for jump in (False, True):
+        path = search.search((0, 0), (6, 0), jump=jump)
+        check_path(grid.obstacles, path, (0, 0), (6, 0))
+        assert len(path) - 1 == bfs_distances(grid.obstacles, (0, 0))[(6, 0)]
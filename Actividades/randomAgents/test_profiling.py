@@ -0,0 +1,61 @@
+# StepProfiler must time the real RandomModel.step and undo only its own wrappers
+import checkpoint
+from model import RandomModel
+from profiling import PHASES, StepProfiler
+
+def saved_bytes(model, path):
+    checkpoint.save(model, path)
+    with open(path, "rb") as f:
+        return f.read()
+
+def test_profiled_run_matches_plain_run(tmp_path):
+    plain = RandomModel(5, 0.2, 0.1, 20, 20, max_steps=30, dispatch="hungarian", seed=4)
+    profiled = RandomModel(5, 0.2, 0.1, 20, 20, max_steps=30, dispatch="hungarian", profile=True, seed=4)
+    for _ in range(30):
+        plain.step()
+        profiled.step()
+    assert saved_bytes(profiled, tmp_path / "a.ckpt") == saved_bytes(plain, tmp_path / "b.ckpt")
+
+    model_vars = profiled.profiler.model_vars
+    assert all(len(values) == 30 for values in model_vars.values())
+    assert all(value > 0 for name in PHASES for value in model_vars[f"{name}_ms"])
+    assert sum(model_vars["moves"]) > 0
+
+def test_times_the_model_step(monkeypatch):
+    calls = []
+    original = RandomModel.step
+
+    def step(self):
+        calls.append(self)
+        original(self)
+
+    # A later change to RandomModel.step is what gets profiled
+    monkeypatch.setattr(RandomModel, "step", step)
+    model = RandomModel(3, 0.1, 0.1, 10, 10, profile=True, seed=0)
+    model.step()
+    assert calls == [model]
+    assert len(model.profiler.model_vars["agents_ms"]) == 1
+
+def test_detach_restores_the_attributes():
+    model = RandomModel(3, 0.1, 0.1, 10, 10, seed=0)
+    model.step = model.step  # an instance attribute from before attaching
+    owners = (model, model.schedule, model.datacollector, model.pathfinder, model.grid, model.navigation)
+    before = [dict(vars(owner)) for owner in owners]
+    StepProfiler(model).detach()
+    for owner, attributes in zip(owners, before):
+        after = vars(owner)
+        assert after.keys() == attributes.keys()
+        assert all(after[name] is value for name, value in attributes.items() if name != "profiler")
+
+def test_detach_keeps_later_wrappers():
+    model = RandomModel(3, 0.1, 0.1, 10, 10, profile=True, seed=0)
+    profiled_step = model.step
+
+    def outer():
+        profiled_step()
+
+    model.step = outer  # like FastForwardServer.reset_model
+    model.profiler.detach()
+    assert model.step is outer
+    assert model.profiler is None
+    assert "check_termination" not in vars(model)
@@ -0,0 +1,61 @@
+# D* Lite repairs must find paths as cheap as a fresh Dijkstra search
+import heapq
+import math
+
+import numpy as np
+import pytest
+
+from navigation import NavigationMap
+from occupancy import OccupancyGrid
+from pathfinding import MOORE_OFFSETS
+from replanning import DStarLite
+
+def dijkstra(obstacles, costs, start, goal):
+    """
+    Cost of the cheapest path from start to goal, entering a cell costing 1
+    plus its extra cost.
+    """
+    width, height = obstacles.shape
+    best = {start: 0}
+    queue = [(0, start)]
+    while queue:
+        distance, (x, y) = heapq.heappop(queue)
+        if (x, y) == goal:
+            return distance
+        if distance > best[(x, y)]:
+            continue
+        for dx, dy in MOORE_OFFSETS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height and not obstacles[nx, ny]:
+                new = distance + 1 + costs.get((nx, ny), 0)
+                if new < best.get((nx, ny), math.inf):
+                    best[(nx, ny)] = new
+                    heapq.heappush(queue, (new, (nx, ny)))
+    return math.inf
+
+@pytest.mark.parametrize("seed", range(6))
+def test_repairs_match_dijkstra(seed):
+    rng = np.random.default_rng(seed)
+    grid = OccupancyGrid(15, 12, torus=False)
+    grid.obstacles[...] = rng.random((15, 12)) < 0.25
+    free = [tuple(int(v) for v in cell) for cell in np.argwhere(grid.obstacles == 0)]
+    goal = free[rng.integers(len(free))]
+    position = free[rng.integers(len(free))]
+    planner = DStarLite(grid, goal, NavigationMap(grid).field(goal))
+
+    for _ in range(30):
+        # Robots in the way: new extra costs every time the path is repaired
+        picks = rng.choice(len(free), size=20, replace=False)
+        costs = {free[i]: int(rng.integers(1, 6)) for i in picks if free[i] != goal}
+        path = planner.plan(position, costs)
+        expected = dijkstra(grid.obstacles, costs, position, goal)
+        if path is None:
+            assert expected == math.inf
+            return
+        assert path[0] == position and path[-1] == goal
+        for (x, y), (nx, ny) in zip(path, path[1:]):
+            assert max(abs(nx - x), abs(ny - y)) == 1 and not grid.obstacles[nx, ny]
+        assert sum(1 + costs.get(cell, 0) for cell in path[1:]) == expected
+        if len(path) == 1:
+            return
+        position = path[min(2, len(path) - 1)]
@@ -2,11 +2,30 @@
 # OCT 30 2024
 # Cell script for game of life
 
-from mesa import Agent
+# Result map from game rules, keyed by the 3 cells over a cell
+STATE_RESULT = {
+    "111": 0,
+    "110": 1,
+    "101": 0,
+    "100": 1,
+    "011": 1,
+    "010": 0,
+    "001": 1,
+    "000": 0,
+}
 
 
-class EntityCell(Agent):
-    """ """
+class EntityCell:
+    """
+    Cell agent stepped by the model's SimultaneousActivation.
+
+    Has the parts of mesa's Agent the scheduler and the grid use (unique_id,
+    model, pos, step, advance) but does not subclass it: Agent has no
+    __slots__, so every subclass instance keeps a __dict__. __weakref__ lets
+    the scheduler's AgentSet hold the cells.
+    """
+
+    __slots__ = ("unique_id", "model", "pos", "_next_condition", "__weakref__")
 
     def __init__(self, pos, model):
         """
@@ -16,29 +35,37 @@ class EntityCell(Agent):
             pos: The entity's coordinates on the grid.
             model: standard model reference for agent.
         """
-        super().__init__(pos, model)
+        self.unique_id = pos
+        self.model = model
         self.pos = pos
         self.condition = 0
         self._next_condition = None
 
+    # The condition lives in the model's uint8 cells array, not on the agent
+    @property
+    def condition(self):
+        return int(self.model.cells[self.pos])
+
+    @condition.setter
+    def condition(self, value):
+        self.model.cells[self.pos] = value
+
     def step(self):
+        if self.model.life_rule is not None:
+            # 2D Life-like rule: count the live cells around this one
+            birth, survive = self.model.life_rule
+            alive = sum(
+                neighbor.condition
+                for neighbor in self.model.grid.iter_neighbors(self.pos, True)
+            )
+            self._next_condition = int(alive in (survive if self.condition else birth))
+            return
+
         neighbor_list = []  # stores all neighbors around the cell
         top_neighbors = ["", "", ""]  # stores the 3 neighbors over the cell
 
-        state_result = {
-            "111": 0,
-            "110": 1,
-            "101": 0,
-            "100": 1,
-            "011": 1,
-            "010": 0,
-            "001": 1,
-            "000": 0,
-        }
-
         for neighbor in self.model.grid.iter_neighbors(self.pos, True):
             neighbor_list.append(str(neighbor.condition))
-        print(neighbor_list)
 
         # Assuming grid
         # 2 4 7
@@ -47,11 +74,35 @@ class EntityCell(Agent):
         top_neighbors = [neighbor_list[2], neighbor_list[4], neighbor_list[7]]
 
         combined_states = "".join(top_neighbors)  # combined state string for top cells
-        self._next_condition = state_result[combined_states]
+        self._next_condition = STATE_RESULT[combined_states]
 
     def advance(self):
         """
         Advance the model by one step.
         """
         if self._next_condition is not None:
+            if self._next_condition != self.condition:
+                # keep the model's population counters up to date
+                self.model.counts[self.condition] -= 1
+                self.model.counts[self._next_condition] += 1
             self.condition = self._next_condition
+
+
+class CellView:
+    """
+    Light grid entry for the array engines.
+
+    Never added to the schedule; it only lets CanvasGrid and GoL_portrayal
+    read a cell's condition from the model's cells array. Uses __slots__
+    instead of a per instance dict.
+    """
+
+    __slots__ = ("pos", "model")
+
+    def __init__(self, model):
+        self.pos = None  # set by the grid
+        self.model = model
+
+    @property
+    def condition(self):
+        return int(self.model.cells[self.pos])
@@ -0,0 +1,229 @@
+# Headless batch runner for the game of life rules
+# Runs many (rule, density, seed) combinations without building agents or a server.
+#
+# Every row of the GameOfLife grid is computed from the row over it, so row y
+# after t steps is the 1D elementary automaton started from row (y + t) after
+# t steps. Each row is packed into 64 bit words and advanced with bitwise
+# operations, 64 cells per word operation.
+#
+# A configuration whose grid repeats one of its recent grids is cycling: it is
+# dropped from the packed rows and the rest of its counts repeat the cycle.
+
+import random
+
+import numpy as np
+
+from engine import random_cells
+
+WORD_BITS = 64
+ONE = np.uint64(1)
+# Recent grids kept per configuration to detect cycles
+DEFAULT_WINDOW = 64
+
+# Bit count per byte, used when numpy has no bitwise_count
+_BYTE_COUNTS = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def pack_rows(cells):
+    """
+    Pack the rows of a (width, height) grid into 64 bit words.
+
+    Returns:
+        uint64 array of shape (height, words), cell x of a row is bit x % 64
+        of word x // 64. Bits past the width are 0.
+    """
+    width, height = cells.shape
+    words = -(-width // WORD_BITS)
+    rows = np.zeros((height, words * WORD_BITS), dtype=np.uint8)
+    rows[:, :width] = cells.T
+    packed = np.packbits(rows, axis=1, bitorder="little")
+    return packed.view("<u8").astype(np.uint64)
+
+
+def unpack_rows(packed, width):
+    """
+    Inverse of pack_rows, returns a (width, height) uint8 grid.
+    """
+    bits = np.unpackbits(
+        packed.astype("<u8").view(np.uint8), axis=1, bitorder="little"
+    )
+    return np.ascontiguousarray(bits[:, :width].T)
+
+
+def popcount(packed):
+    """
+    Count live cells in each packed row.
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(packed).sum(axis=-1, dtype=np.int64)
+    as_bytes = packed.view(np.uint8).reshape(packed.shape[:-1] + (-1,))
+    return _BYTE_COUNTS[as_bytes].sum(axis=-1, dtype=np.int64)
+
+
+def _tail_mask(width):
+    """Mask of the valid bits in the last word of a row."""
+    used = width % WORD_BITS
+    if used == 0:
+        return ~np.uint64(0)
+    return np.uint64((1 << used) - 1)
+
+
+def _left_neighbors(rows, width):
+    """
+    Shift each row so bit x holds cell x - 1, wrapping cell width - 1 into bit 0.
+    """
+    shifted = rows << ONE
+    shifted[:, 1:] |= rows[:, :-1] >> np.uint64(WORD_BITS - 1)
+    last = (width - 1) % WORD_BITS
+    shifted[:, 0] |= (rows[:, -1] >> np.uint64(last)) & ONE
+    shifted[:, -1] &= _tail_mask(width)
+    return shifted
+
+
+def _right_neighbors(rows, width):
+    """
+    Shift each row so bit x holds cell x + 1, wrapping cell 0 into bit width - 1.
+    """
+    shifted = rows >> ONE
+    shifted[:, :-1] |= rows[:, 1:] << np.uint64(WORD_BITS - 1)
+    last = (width - 1) % WORD_BITS
+    shifted[:, -1] |= (rows[:, 0] & ONE) << np.uint64(last)
+    return shifted
+
+
+def rule_masks(rules):
+    """
+    Per row word masks for each of the 8 neighborhood patterns.
+
+    Args:
+        rules: Rule number of each row.
+
+    Returns:
+        uint64 array of shape (8, rows, 1), all ones where the rule sends
+        that pattern to 1.
+    """
+    rules = np.asarray(rules, dtype=np.int64)
+    masks = np.zeros((8, len(rules), 1), dtype=np.uint64)
+    for pattern in range(8):
+        masks[pattern, (rules >> pattern) & 1 == 1] = ~np.uint64(0)
+    return masks
+
+
+def step_packed(rows, width, masks):
+    """
+    Advance packed rows of an elementary automaton on a ring by one step.
+
+    Args:
+        rows: uint64 array of shape (rows, words) from pack_rows().
+        width: Number of cells in each row.
+        masks: Output of rule_masks() for these rows.
+    """
+    left = _left_neighbors(rows, width)
+    right = _right_neighbors(rows, width)
+    tail = _tail_mask(width)
+    not_left, not_center, not_right = ~left, ~rows, ~right
+
+    result = np.zeros_like(rows)
+    for pattern in range(8):
+        term = (left if pattern & 4 else not_left) & (rows if pattern & 2 else not_center)
+        term &= right if pattern & 1 else not_right
+        result |= term & masks[pattern]
+    result[:, -1] &= tail
+    return result
+
+
+def state_keys(height, words, seed=0):
+    """
+    Random 64 bit multipliers for the 32 bit halves of a packed grid's words,
+    two sets of them.
+    """
+    return np.random.default_rng(seed).integers(0, 2**64, size=(2, height * words * 2), dtype=np.uint64)
+
+
+def hash_grids(grids, keys):
+    """
+    64 bit hash of each packed grid.
+
+    Multilinear hashing: each set of keys gives the high 32 bits of the sum
+    of key * half word (wrapping at 64 bits), and the two are put together.
+
+    Args:
+        grids: uint64 array of shape (grids, height, words).
+        keys: Output of state_keys(height, words).
+    """
+    halves = grids.reshape(len(grids), -1).view(np.uint32).astype(np.uint64)
+    high = halves @ keys.T >> np.uint64(32)
+    return high[:, 0] | high[:, 1] << np.uint64(32)
+
+
+def run_batch(configs, steps, height=50, width=50, window=DEFAULT_WINDOW):
+    """
+    Run many game of life configurations and report cell counts over time.
+
+    Args:
+        configs: Iterable of (rule, density, seed). The rule is an elementary
+            rule number (90 is the one EntityCell uses); the seed gives the same
+            starting grid as GameOfLife(height, width, density, seed=seed).
+        steps: Number of steps to run every configuration.
+        height, width: Model parameters, passed in the same order as GameOfLife.
+        window: Recent grids kept per configuration. A configuration whose
+            grid repeats one of them stops being stepped, and its remaining
+            counts repeat the cycle (as GameOfLife.project_model_vars does).
+            0 steps every configuration to the end.
+
+    Returns:
+        Dict with keys 0 and 1 like the model's DataCollector, each an int64
+        array of shape (len(configs), steps + 1) with the number of cells in
+        that condition at every step, starting with the initial grid.
+    """
+    configs = list(configs)
+    # GameOfLife builds SingleGrid(height, width), so x runs over `height`
+    grid_width, grid_height = height, width
+
+    rows, rules = [], []
+    for rule, density, seed in configs:
+        cells = random_cells(random.Random(seed), grid_width, grid_height, density)
+        rows.append(pack_rows(cells))
+        rules.extend([rule] * grid_height)
+    rows = np.concatenate(rows) if rows else np.zeros((0, 1), dtype=np.uint64)
+    masks = rule_masks(rules)
+
+    total = grid_width * grid_height
+    alive = np.zeros((len(configs), steps + 1), dtype=np.int64)
+    alive[:, 0] = popcount(rows).reshape(len(configs), grid_height).sum(axis=1)
+    # Configurations still stepped, in the order of their rows in `rows`
+    active = np.arange(len(configs))
+    words = rows.shape[1]
+    if window:
+        keys = state_keys(grid_height, words)
+        recent = np.zeros((len(configs), window), dtype=np.uint64)
+        recent[:, 0] = hash_grids(rows.reshape(len(configs), grid_height, words), keys)
+
+    for step in range(1, steps + 1):
+        if not len(active):
+            break
+        rows = step_packed(rows, grid_width, masks)
+        alive[active, step] = popcount(rows).reshape(len(active), grid_height).sum(axis=1)
+        if not window:
+            continue
+
+        hashes = hash_grids(rows.reshape(len(active), grid_height, words), keys)
+        # Slot j of the ring holds step seen[j], the last `window` steps
+        seen = step - window + (np.arange(window) - step) % window
+        matches = (recent == hashes[:, None]) & (seen >= 0)
+        cycling = matches.any(axis=1)
+        for index in np.flatnonzero(cycling).tolist():
+            # The latest repeat gives the shortest period
+            start = int(seen[matches[index]].max())
+            period = step - start
+            later = np.arange(step + 1, steps + 1)
+            alive[active[index], later] = alive[active[index], start + (later - start) % period]
+        recent[:, step % window] = hashes
+
+        if cycling.any():
+            keep = ~cycling
+            active, recent = active[keep], recent[keep]
+            rows = rows.reshape(len(keep), grid_height, words)[keep].reshape(-1, words)
+            masks = masks.reshape(8, len(keep), grid_height, 1)[:, keep].reshape(8, -1, 1)
+
+    return {0: total - alive, 1: alive}
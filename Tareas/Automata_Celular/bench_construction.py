@@ -0,0 +1,44 @@
+"""
+Construction time and memory of GameOfLife for each engine.
+Builds the model at several grid sizes and reports the wall time and the
+peak memory traced by tracemalloc while building it.
+Usage: python bench_construction.py [--sizes 50 200 500] [--engines ENGINES]
+"""
+import argparse
+import time
+import tracemalloc
+import warnings
+
+from model import GameOfLife
+
+ENGINES = ["agents", "numpy"]
+
+def measure(build):
+    """
+    Returns (seconds, peak MiB) of calling build().
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    model = build()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del model
+    return seconds, peak / 2**20
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--engines", nargs="+", default=ENGINES)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    print(f"{'size':>6} {'engine':>8} {'seconds':>9} {'peak MiB':>9}")
+    for size in args.sizes:
+        for engine in args.engines:
+            seconds, peak = measure(lambda: GameOfLife(size, size, engine=engine, seed=args.seed))
+            print(f"{size:6d} {engine:>8} {seconds:9.2f} {peak:9.1f}")
+
+if __name__ == "__main__":
+    main()
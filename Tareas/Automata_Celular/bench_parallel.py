@@ -0,0 +1,69 @@
+"""
+Steps per second of the parallel engine against the single process one.
+Builds one grid, times the numpy engine on it, then times ParallelStepper
+on the same starting cells for each number of workers, checks that every
+run ends on the same grid and reports the speedup.
+Usage: python bench_parallel.py [--size 4000] [--workers 1 2 4] [--rule B3/S23]
+"""
+import argparse
+import os
+import time
+import warnings
+from functools import partial
+
+from engine import step_cells
+from life import life_table, step_dense
+from model import GameOfLife
+from parallel import ParallelStepper
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=4000)
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--workers", type=int, nargs="+", default=None, help="Default: 1, 2, 4 ... up to the core count")
+    parser.add_argument("--rule", default=None, help="Life-like rule, default the original one")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    cores = os.cpu_count() or 1
+    workers = args.workers
+    if workers is None:
+        workers = [1]
+        while workers[-1] * 2 <= cores:
+            workers.append(workers[-1] * 2)
+        if workers[-1] != cores:
+            workers.append(cores)
+
+    model = GameOfLife(args.size, args.size, engine="numpy", display=False, seed=args.seed, rule=args.rule)
+    start_cells = model.cells.copy()
+    if model.life_rule is not None:
+        step = partial(step_dense, table=life_table(*model.life_rule))
+    else:
+        step = partial(step_cells, table=model.state_table)
+
+    # Single process baseline: the same dense step the workers run
+    cells = start_cells.copy()
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        cells = step(cells)
+    baseline = args.steps / (time.perf_counter() - start)
+
+    print(f"{args.size}x{args.size}, {args.steps} steps, rule {args.rule or 'original'}, {cores} cores")
+    print(f"{'workers':>8} {'steps/s':>9} {'speedup':>8}")
+    print(f"{'numpy':>8} {baseline:9.2f} {1:8.2f}")
+    for count in workers:
+        stepper = ParallelStepper(start_cells, step, count)
+        try:
+            stepper.step()  # warm up the processes
+            start = time.perf_counter()
+            stepper.step(args.steps - 1)
+            rate = (args.steps - 1) / (time.perf_counter() - start)
+            if not (stepper.cells == cells).all():
+                raise RuntimeError(f"{count} workers ended on a different grid")
+        finally:
+            stepper.close()
+        print(f"{count:8d} {rate:9.2f} {rate / baseline:8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# Checkpoint and restore for GameOfLife runs
+# The file format (a JSON header plus memory-mapped arrays) is in the shared
+# checkpoint_file.py. Restored runs continue exactly like the uninterrupted
+# run.
+
+import os
+import sys
+
+import numpy as np
+
+# Modules shared with the other projects are in the repo's shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "shared"))
+from checkpoint_file import read_checkpoint, rng_state, set_rng_state, write_checkpoint
+from hashlife import DEFAULT_MAX_BYTES
+from model import GameOfLife
+
+
+def save(model, path):
+    """
+    Write the full state of a GameOfLife to path.
+    """
+    rng_scalars, rng_internal = rng_state(model.random)
+    collector = model.datacollector
+    meta = {
+        "model": "GameOfLife",
+        # GameOfLife(height, width) builds SingleGrid(height, width), whose
+        # width is the height argument
+        "height": model.grid.width,
+        "width": model.grid.height,
+        "engine": model.engine,
+        "rule": model.rule,
+        "seed": model._seed,
+        "rng": rng_scalars,
+        "running": model.running,
+        "model_steps": model._steps,
+        "model_time": model._time,
+        "schedule_steps": model.schedule.steps,
+        "schedule_time": model.schedule.time,
+        "counts": [model.counts[0], model.counts[1]],
+        "generation": model.generation,
+        "model_reporters": list(collector.model_vars),
+        "cycle": model.cycle,
+        "cycle_states": model.cycles.max_states if model.cycles is not None else 0,
+        "workers": model.parallel.workers if model.parallel is not None else 1,
+        "jump_memory": model.jump_memory,
+    }
+    arrays = {
+        "rng": rng_internal,
+        "cells": model.cells,
+        "model_vars": np.array(list(zip(*collector.model_vars.values())), dtype=np.int64).reshape(
+            -1, len(collector.model_vars)
+        ),
+        "row_generations": np.array(model.row_generations, dtype=np.int64),
+    }
+    if model.cycles is not None:
+        arrays["cycle_digests"], arrays["cycle_steps"] = model.cycles.arrays()
+    write_checkpoint(path, meta, arrays)
+
+
+def restore(path, display=False):
+    """
+    Rebuild a GameOfLife from a checkpoint.
+
+    Args:
+        display: Place grid entries for CanvasGrid (array engines only).
+    """
+    meta, arrays = read_checkpoint(path)
+    if meta.get("model") != "GameOfLife":
+        raise ValueError(f"{path} is not a GameOfLife checkpoint")
+
+    # Build the model with every cell dead, without drawing a random start,
+    # then load the saved state
+    model = GameOfLife.__new__(GameOfLife, seed=meta["seed"])
+    model.setup(
+        meta["height"], meta["width"], meta["engine"], display, meta["rule"],
+        meta.get("workers", 1), meta.get("cycle_states", 0), meta.get("jump_memory", DEFAULT_MAX_BYTES),
+    )
+    model.cells[...] = arrays["cells"]
+    # Start SparseLife with every tile active, the first step finds the quiet ones
+    model.load_cells()
+
+    collector = model.datacollector
+    columns = arrays["model_vars"].T.tolist()
+    collector.model_vars = {
+        name: column for name, column in zip(collector.model_vars, columns)
+    }
+    # Files from before jump() counted generations with the rows
+    rows = len(arrays["model_vars"])
+    model.generation = meta.get("generation", rows - 1)
+    if "row_generations" in arrays:
+        model.row_generations = arrays["row_generations"].tolist()
+    else:
+        model.row_generations = list(range(rows))
+
+    if model.cycles is not None:
+        model.cycles.load(arrays["cycle_digests"], arrays["cycle_steps"])
+    model.cycle = tuple(meta["cycle"]) if meta.get("cycle") else None
+    model.running = meta["running"]
+    model._steps = meta["model_steps"]
+    model._time = meta["model_time"]
+    model.schedule.steps = meta["schedule_steps"]
+    model.schedule.time = meta["schedule_time"]
+    set_rng_state(model.random, meta["rng"], arrays["rng"])
+    return model
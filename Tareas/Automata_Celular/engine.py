@@ -0,0 +1,64 @@
+# Array engine for the game of life model
+# Applies the same rule as EntityCell.step to the whole grid at once
+
+import numpy as np
+
+from agent import STATE_RESULT
+
+
+def rule_table(state_result=STATE_RESULT):
+    """
+    Build a lookup table from a result map.
+
+    Args:
+        state_result: Result map keyed by the 3 cells over a cell ("101", ...).
+
+    Returns:
+        uint8 array where index (left << 2) | (center << 1) | right holds
+        the next condition.
+    """
+    table = np.zeros(8, dtype=np.uint8)
+    for pattern, result in state_result.items():
+        table[int(pattern, 2)] = result
+    return table
+
+
+def random_cells(random, width, height, density):
+    """
+    Draw the starting conditions the same way GameOfLife places its cells.
+
+    One draw is taken per cell in coord_iter order (x outer, y inner), so
+    the same seed gives the same grid as the agent based model.
+
+    Args:
+        random: The model's random.Random instance.
+        width, height: Size of the grid (as in model.grid).
+        density: What fraction of grid cells start alive.
+    """
+    draws = [random.random() < density for _ in range(width * height)]
+    return np.array(draws, dtype=np.uint8).reshape(width, height)
+
+
+def step_cells(cells, table):
+    """
+    Compute the next generation of a (width, height) uint8 grid.
+
+    Each cell looks at the 3 cells over it (x - 1, x, x + 1 on row y + 1),
+    wrapping around the edges like the torus grid.
+
+    Args:
+        cells: Current conditions, indexed [x, y].
+        table: Lookup table from rule_table().
+    """
+    # top[x, y] holds the cell over (x, y)
+    top = np.empty_like(cells)
+    top[:, :-1] = cells[:, 1:]
+    top[:, -1] = cells[:, 0]
+
+    index = top << 1
+    index[1:] |= top[:-1] << 2
+    index[0] |= top[-1] << 2
+    index[:-1] |= top[1:]
+    index[-1] |= top[0]
+
+    return table[index]
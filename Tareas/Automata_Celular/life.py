@@ -0,0 +1,169 @@
+# 2D Life-like (outer totalistic) rules for the game of life model
+# A rule like "B3/S23" says how many of the 8 Moore neighbors a dead cell
+# needs to be born (B) and a live cell needs to survive (S). The grid wraps
+# around like the torus SingleGrid.
+#
+# SparseLife only steps the tiles that can change: the tiles where a cell
+# changed last tick and the tiles around them. When most of the grid is
+# active it falls back to a dense step over the whole array.
+
+import re
+
+import numpy as np
+
+RULE_PATTERN = re.compile(r"^B([0-8]*)/?S([0-8]*)$", re.IGNORECASE)
+# Classic "survive/birth" notation, e.g. "23/3"
+SB_PATTERN = re.compile(r"^([0-8]*)/([0-8]*)$")
+
+
+def parse_rule(rule):
+    """
+    Parse a Life-like rule.
+
+    Args:
+        rule: "B3/S23", "b36s23" or "23/3" (survive/birth).
+
+    Returns:
+        (birth, survive) frozensets of neighbor counts.
+    """
+    text = rule.replace(" ", "")
+    match = RULE_PATTERN.match(text)
+    if match:
+        birth, survive = match.groups()
+    else:
+        match = SB_PATTERN.match(text)
+        if not match:
+            raise ValueError(f"Unknown rule: {rule}")
+        survive, birth = match.groups()
+    return frozenset(int(c) for c in birth), frozenset(int(c) for c in survive)
+
+
+def life_table(birth, survive):
+    """
+    Lookup table indexed by condition * 9 + live neighbors.
+    """
+    table = np.zeros(18, dtype=np.uint8)
+    table[list(birth)] = 1
+    table[[9 + count for count in survive]] = 1
+    return table
+
+
+def neighbor_counts(cells):
+    """
+    Live Moore neighbors of every cell of a (width, height) grid, with wrap.
+    """
+    # Sum the 3 cells of each column, then 3 columns, then remove the center
+    cells = cells.astype(np.uint8)
+    columns = cells + np.roll(cells, 1, axis=1) + np.roll(cells, -1, axis=1)
+    return columns + np.roll(columns, 1, axis=0) + np.roll(columns, -1, axis=0) - cells
+
+
+def step_dense(cells, table):
+    """
+    Next generation of the whole grid.
+    """
+    return table[cells * 9 + neighbor_counts(cells)]
+
+
+class SparseLife:
+    """
+    Steps a Life-like rule on a (width, height) uint8 array in place.
+
+    The grid is split in tile x tile blocks. Only the active tiles are
+    computed: the tiles where a cell changed last tick, grown by one tile
+    in every direction (wrapping around), since only their cells can change.
+    When more than dense_fraction of the tiles are active the whole grid is
+    stepped at once.
+
+    Attributes:
+        cells: The model's cells array, updated in place.
+        table: Lookup table from life_table().
+        active: bool array, one entry per tile, True if it must be computed.
+        alive: Number of live cells.
+        dense_steps, sparse_steps: How many ticks used each path.
+    """
+
+    def __init__(self, cells, table, tile=32, dense_fraction=0.3):
+        if not cells.flags.c_contiguous:
+            raise ValueError("SparseLife needs a C contiguous cells array")
+        self.cells = cells
+        self.table = table
+        self.tile = tile
+        self.dense_fraction = dense_fraction
+        width, height = cells.shape
+        self.tiles = (-(-width // tile), -(-height // tile))
+        self.active = np.ones(self.tiles, dtype=bool)
+        self.alive = int(np.count_nonzero(cells))
+        self.dense_steps = 0
+        self.sparse_steps = 0
+
+        # Window indices of every tile row / column: the tile plus one cell
+        # on each side, wrapping around. A partial last tile wraps too; the
+        # cells past the edge are computed but never written back.
+        window = np.arange(-1, tile + 1)
+        self.window_x = [(i * tile + window) % width for i in range(self.tiles[0])]
+        self.window_y = [(j * tile + window) % height for j in range(self.tiles[1])]
+
+    def step(self):
+        """
+        Advance the cells one generation.
+        """
+        if self.active.mean() > self.dense_fraction:
+            self.step_dense()
+        elif self.active.any():
+            self.step_sparse()
+        else:
+            self.sparse_steps += 1  # nothing can change
+
+    def step_dense(self):
+        self.dense_steps += 1
+        new = step_dense(self.cells, self.table)
+        changed = new != self.cells
+        self.cells[...] = new
+        self.alive = int(np.count_nonzero(new))
+
+        # Changed tiles: pad to whole tiles and reduce each block
+        width, height = self.cells.shape
+        tile = self.tile
+        padded = np.zeros((self.tiles[0] * tile, self.tiles[1] * tile), dtype=bool)
+        padded[:width, :height] = changed
+        changed_tiles = padded.reshape(self.tiles[0], tile, self.tiles[1], tile).any(axis=(1, 3))
+        self.active = self.grow(changed_tiles)
+
+    def step_sparse(self):
+        self.sparse_steps += 1
+        cells = self.cells
+        width, height = cells.shape
+        tile = self.tile
+        tile_x, tile_y = np.nonzero(self.active)
+
+        # (tiles, tile + 2, tile + 2) windows around the active tiles
+        wx = np.stack([self.window_x[i] for i in tile_x])
+        wy = np.stack([self.window_y[j] for j in tile_y])
+        window = cells[wx[:, :, None], wy[:, None, :]]
+
+        old = window[:, 1:-1, 1:-1]
+        columns = window[:, :, :-2] + window[:, :, 1:-1] + window[:, :, 2:]
+        count = columns[:, :-2] + columns[:, 1:-1] + columns[:, 2:] - old
+        new = self.table[old * 9 + count]
+
+        # Only the cells inside the grid are written back
+        x = (tile_x * tile)[:, None] + np.arange(tile)
+        y = (tile_y * tile)[:, None] + np.arange(tile)
+        valid = (x < width)[:, :, None] & (y < height)[:, None, :]
+        changed = (new != old) & valid
+        flat = (x[:, :, None] * height + y[:, None, :])[changed]
+        cells.reshape(-1)[flat] = new[changed]
+        self.alive += int(np.count_nonzero(new[changed])) - int(np.count_nonzero(old[changed]))
+
+        changed_tiles = np.zeros(self.tiles, dtype=bool)
+        changed_tiles[tile_x, tile_y] = changed.any(axis=(1, 2))
+        self.active = self.grow(changed_tiles)
+
+    @staticmethod
+    def grow(tiles):
+        """
+        Tiles plus their 8 neighbors, wrapping around.
+        """
+        rows = tiles | np.roll(tiles, 1, axis=1) | np.roll(tiles, -1, axis=1)
+        return rows | np.roll(rows, 1, axis=0) | np.roll(rows, -1, axis=0)
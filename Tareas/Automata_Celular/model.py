@@ -1,9 +1,25 @@
+import os
+import sys
+from bisect import bisect_right
+
 import mesa
 from mesa import Model, DataCollector
 from mesa.space import SingleGrid
 from mesa.time import SimultaneousActivation
 
-from agent import EntityCell
+import numpy as np
+import pandas as pd
+
+# Modules shared with the other projects are in the repo's shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "shared"))
+from agent import CellView, EntityCell
+from functools import partial
+
+from cycles import DEFAULT_STATES, StateCache, project_series
+from engine import random_cells, rule_table, step_cells
+from hashlife import DEFAULT_MAX_BYTES, HashLife, linear_coefficients
+from life import SparseLife, life_table, parse_rule, step_dense
+from parallel import ParallelStepper
 
 
 class GameOfLife(Model):
@@ -13,16 +29,98 @@ class GameOfLife(Model):
     Attributes:
         height, width: Grid size.
         density: What fraction of grid cells have a tree in them.
+        engine: "agents" steps one EntityCell per cell, "numpy" steps the
+            whole cells array at once.
+        rule: None for the original rule (read from the row over the cell),
+            or a 2D Life-like rule such as "B3/S23".
+        cells: uint8 array with the condition of every cell, indexed [x, y].
+        generation: Generations advanced since the random start, by step()
+            (1 each) and jump() (n each).
+        row_generations: The generation of each DataCollector row. A jump
+            collects one row for n generations, so after one the row index
+            and the generation differ.
+        cycle: (start, period) once generation start + period repeated
+            generation start, None until then.
     """
 
-    def __init__(self, height=50, width=50, density=0.65):
+    def __init__(
+        self,
+        height=50,
+        width=50,
+        density=0.65,
+        engine="agents",
+        display=True,
+        seed=None,
+        rule=None,
+        workers=1,
+        cycle_states=DEFAULT_STATES,
+        jump_memory=DEFAULT_MAX_BYTES,
+    ):
         """
         Create a new game of life model.
 
         Args:
             height, width: The size of the grid to model
             density: What fraction of grid cells have a tree in them.
+            engine: "agents" or "numpy". Both give the same results for the same seed.
+            display: With the numpy engine, place a CellView in every grid cell
+                so CanvasGrid can draw it. Headless runs can skip it.
+            seed: Seed for the model's random generator (read by mesa's Model).
+            rule: None, or a Life-like rule ("B3/S23", "B36/S23", "23/3", ...)
+                counting the 8 neighbors around each cell. The numpy engine
+                then only steps the tiles that changed last tick (SparseLife).
+            workers: With the numpy engine and more than 1 worker, step the
+                grid in strips in a process pool (ParallelStepper). Call
+                close() when done to stop the processes. The agents engine
+                only takes 1.
+            cycle_states: Generations kept to detect cycles (see cycles.py).
+                The model stops on the first repeated generation; 0 turns
+                detection off and the model never stops by itself.
+            jump_memory: Bytes the memo of jump() may keep (see hashlife.py).
         """
+        self.setup(height, width, engine, display, rule, workers, cycle_states, jump_memory)
+
+        if self.engine == "numpy":
+            # The array engine draws the cells in the same order as coord_iter
+            self.cells[...] = random_cells(
+                self.random, self.grid.width, self.grid.height, density
+            )
+        else:
+            # Place a tree in each cell with Prob = density
+            # coord_iter is an iterator that returns positions as well as cell contents.
+            for contents, (x, y) in self.grid.coord_iter():
+                if self.random.random() < density:
+                    # Bring the tree to life
+                    contents.condition = 1
+
+        self.load_cells()
+        self.running = True
+        self.collect()
+        self.check_cycle()
+
+    def setup(self, height, width, engine, display, rule, workers, cycle_states, jump_memory):
+        """
+        Build the model with every cell dead: grid, cells array, engine,
+        schedule and datacollector. Used by __init__ and by
+        checkpoint.restore, which then write the cells array and call
+        load_cells().
+        """
+        if engine not in ("agents", "numpy"):
+            raise ValueError(f"Unknown engine: {engine}")
+        if workers > 1 and engine != "numpy":
+            raise ValueError(f"The {engine} engine cannot use workers, use engine=\"numpy\"")
+        self.engine = engine
+        self.rule = rule
+        # (birth, survive) neighbor counts, None for the original rule
+        self.life_rule = parse_rule(rule) if rule is not None else None
+        self.parallel = None
+        self.life = None
+        self.cycles = StateCache(cycle_states) if cycle_states else None
+        self.cycle = None
+        self.generation = 0
+        self.row_generations = []
+        self.jump_memory = jump_memory
+        self.hashlife = None
 
         # Set up model objects
         # SimultaneousActivation is a Mesa object that runs all the agents at the same time.
@@ -31,6 +129,11 @@ class GameOfLife(Model):
         # The step() method computes the next state of the agent, and the advance() method sets the state to the new computed state.
         self.schedule = SimultaneousActivation(self)
         self.grid = SingleGrid(height, width, torus=True)
+        self.cells = np.zeros((self.grid.width, self.grid.height), dtype=np.uint8)
+
+        # Number of cells in each condition, updated as cells change so the
+        # datacollector does not have to scan every agent
+        self.counts = {0: self.cells.size, 1: 0}
 
         # A datacollector is a Mesa object for collecting data about the model.
         # We'll use it to count the number of trees in each condition each step.
@@ -41,31 +144,142 @@ class GameOfLife(Model):
             }
         )
 
-        # Place a tree in each cell with Prob = density
-        # coord_iter is an iterator that returns positions as well as cell contents.
-        for contents, (x, y) in self.grid.coord_iter():
-            if self.random.random() < density:
-                # Create a tree
-                new_cell = EntityCell((x, y), self)
-                new_cell.condition = 1
-
-            else:
-                new_cell = EntityCell((x, y), self)
-                new_cell.condition = 0
+        if self.engine == "numpy":
+            # The array engine only places light views of the array on the grid
+            self.state_table = rule_table()
+            if workers > 1:
+                # Dense strips, the same step on every worker
+                if self.life_rule is not None:
+                    step = partial(step_dense, table=life_table(*self.life_rule))
+                else:
+                    step = partial(step_cells, table=self.state_table)
+                self.parallel = ParallelStepper(self.cells, step, workers)
+                self.cells = self.parallel.cells
+            if display:
+                for contents, pos in self.grid.coord_iter():
+                    self.grid.place_agent(CellView(self), pos)
+            return
 
+        for contents, (x, y) in self.grid.coord_iter():
+            new_cell = EntityCell((x, y), self)  # starts dead
             self.grid.place_agent(new_cell, (x, y))
             self.schedule.add(new_cell)
 
-        self.running = True
-        self.datacollector.collect(self)
+    def load_cells(self):
+        """
+        Recount the cells after the whole cells array was written, and start
+        SparseLife over with every tile active.
+        """
+        if self.engine == "numpy" and self.life_rule is not None and self.parallel is None:
+            self.life = SparseLife(self.cells, life_table(*self.life_rule))
+        self.count_cells()
 
     def step(self):
         """
         Have the scheduler advance each cell by one step
         """
-        self.schedule.step()
+        if self.parallel is not None:
+            alive = self.parallel.step()
+            self.counts[1] = alive
+            self.counts[0] = self.cells.size - alive
+        elif self.engine == "numpy" and self.life_rule is not None:
+            self.life.step()
+            self.counts[1] = self.life.alive
+            self.counts[0] = self.cells.size - self.life.alive
+        elif self.engine == "numpy":
+            self.cells[...] = step_cells(self.cells, self.state_table)
+            self.count_cells()
+        else:
+            self.schedule.step()
+        self.generation += 1
         # collect data
+        self.collect()
+        self.check_cycle()
+
+    def collect(self):
+        """
+        Collect a DataCollector row for the current generation.
+        """
         self.datacollector.collect(self)
+        self.row_generations.append(self.generation)
+
+    def check_cycle(self):
+        """
+        Hash the current generation and stop the model when it repeats one
+        still in the cache.
+        """
+        if self.cycles is None or self.cycle is not None:
+            return
+        first = self.cycles.observe(self.generation, self.cells)
+        if first is not None:
+            self.cycle = (first, self.generation - first)
+            self.running = False
+
+    def project_model_vars(self, steps):
+        """
+        The DataCollector's model series up to generation steps, like
+        get_model_vars_dataframe() but indexed by generation. Generations
+        past the collected ones repeat the detected cycle instead of being
+        simulated; generations a jump() went over have no row.
+        """
+        collected = self.datacollector.model_vars
+        if steps > self.generation and self.cycle is None:
+            raise ValueError("No cycle detected yet, step the model further")
+        # Rows since the last jump are one generation apart, and the cycle
+        # cache starts over at each jump, so the cycle is among those rows
+        offset = self.generation - (len(self.row_generations) - 1)
+        cycle = (self.cycle[0] - offset, self.cycle[1]) if self.cycle is not None else None
+        rows = bisect_right(self.row_generations, steps)
+        index = self.row_generations[:rows] + list(range(self.generation + 1, steps + 1))
+        return pd.DataFrame(
+            {name: project_series(values, cycle, len(index)) for name, values in collected.items()},
+            index=index,
+        )
+
+    def jump(self, n):
+        """
+        Advance the model n generations at once with HashLife (hashlife.py)
+        and load the new generation into the cells array. EntityCell and
+        CellView read their condition from that array, so the server's
+        GoL_portrayal draws it with the agents engine or with display on.
+        The n generations get one DataCollector row, at generation
+        self.generation, and cycle detection starts over from it.
+
+        The memo holds whole grid states, not HashLife's hash-consed quadtree
+        nodes, so only the original (additive) rule jumps in closed form.
+        A Life rule run that has not yet settled into a fixed point or cycle
+        still costs one packed step per generation; the memo pays off once
+        its states repeat, or when the same states are jumped again.
+        """
+        if self.hashlife is None:
+            if self.life_rule is not None:
+                step = partial(step_dense, table=life_table(*self.life_rule))
+                linear = None
+            else:
+                table = rule_table()
+                step = partial(step_cells, table=table)
+                linear = linear_coefficients(table)
+            self.hashlife = HashLife(step, self.cells.shape, linear, self.jump_memory)
+        # Every cell (and tile) may have changed
+        self.cells[...] = self.hashlife.jump(self.cells, n)
+        self.load_cells()
+        self.generation += n
+        self.collect()
+
+        self.cycle = None
+        self.running = True
+        if self.cycles is not None:
+            self.cycles.clear()
+        self.check_cycle()
+
+    def close(self):
+        """
+        Stop the worker processes of the parallel engine, keeping the cells.
+        """
+        if self.parallel is not None:
+            self.parallel.close()
+            self.cells = self.parallel.cells
+            self.parallel = None
 
     # staticmethod is a Python decorator that makes a method callable without an instance.
     @staticmethod
@@ -73,8 +287,18 @@ class GameOfLife(Model):
         """
         Helper method to count trees in a given condition in a given model.
         """
-        count = 0
-        for tree in model.schedule.agents:
-            if tree.condition == tree_condition:
-                count += 1
-        return count
+        return model.counts[tree_condition]
+
+    def count_cells(self):
+        """
+        Recount the cells array after an array engine step or a load.
+        """
+        alive = int(np.count_nonzero(self.cells))
+        self.counts[1] = alive
+        self.counts[0] = self.cells.size - alive
+
+    def get_conditions(self):
+        """
+        Return a copy of the current conditions as a (width, height) uint8 array.
+        """
+        return self.cells.copy()
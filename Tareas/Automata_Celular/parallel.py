@@ -0,0 +1,190 @@
+# Multi-core stepping for big game of life grids
+# The cells array lives in shared memory and is split in strips of x rows
+# (contiguous in memory), one per worker process. Each tick a worker reads
+# its strip plus one halo row on each side (wrapping around, like the torus
+# grid), computes the next strip, waits for every worker to finish reading,
+# writes it back and waits again. Only the halo rows are read from other
+# workers' strips.
+# A worker whose step raises aborts the barrier, so the others fail out of
+# it instead of waiting forever, and sends the error back to be raised by
+# ParallelStepper.step.
+
+import multiprocessing as mp
+import threading
+import traceback
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def strip_bounds(width, workers):
+    """
+    (start, stop) x ranges splitting width rows in workers strips.
+    """
+    edges = [index * width // workers for index in range(workers + 1)]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+class _RemoteTraceback(Exception):
+    """
+    Traceback of an error raised in a worker process, chained to the error.
+    """
+
+    def __str__(self):
+        return self.args[0]
+
+
+def _worker(cells_name, alive_name, shape, index, start, stop, step, barrier, conn):
+    cells_memory = shared_memory.SharedMemory(name=cells_name)
+    alive_memory = shared_memory.SharedMemory(name=alive_name)
+    try:
+        cells = np.ndarray(shape, dtype=np.uint8, buffer=cells_memory.buf)
+        alive = np.ndarray((barrier.parties,), dtype=np.int64, buffer=alive_memory.buf)
+        width = shape[0]
+        # Strip plus one halo row on each side
+        block = np.empty((stop - start + 2, shape[1]), dtype=np.uint8)
+        while True:
+            steps = conn.recv()
+            if steps is None:
+                break
+            try:
+                for _ in range(steps):
+                    block[0] = cells[(start - 1) % width]
+                    block[1:-1] = cells[start:stop]
+                    block[-1] = cells[stop % width]
+                    new = step(block)[1:-1]
+                    barrier.wait()  # everyone has read the current grid
+                    cells[start:stop] = new
+                    barrier.wait()  # everyone has written the next one
+                alive[index] = np.count_nonzero(cells[start:stop])
+            except Exception as error:
+                barrier.abort()
+                trace = traceback.format_exc()
+                try:
+                    conn.send((error, trace))
+                except Exception:
+                    # The error does not pickle
+                    conn.send((RuntimeError(repr(error)), trace))
+                continue
+            conn.send(steps)
+    finally:
+        del cells, alive
+        cells_memory.close()
+        alive_memory.close()
+
+
+def _shutdown(processes, connections, memories):
+    for conn in connections:
+        try:
+            conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+    for process in processes:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+    for memory in memories:
+        try:
+            memory.close()
+        except BufferError:
+            pass  # a view of it is still alive, it is unmapped when freed
+        memory.unlink()
+
+
+class ParallelStepper:
+    """
+    Steps a (width, height) uint8 grid in a pool of worker processes.
+
+    Attributes:
+        cells: The grid, a view of the shared memory (read it between steps).
+        workers: Number of worker processes (at most one per x row).
+        strips: (start, stop) x range of each worker.
+    """
+
+    def __init__(self, cells, step, workers):
+        """
+        Args:
+            cells: Starting grid, copied into shared memory.
+            step: Picklable function from a (rows, height) block to its next
+                generation, wrapping around along y (e.g. step_cells or
+                step_dense with the table bound by functools.partial). The
+                first and last rows of the block are halo rows.
+            workers: Number of processes.
+        """
+        shape = cells.shape
+        self.workers = max(1, min(workers, shape[0]))
+        self.strips = strip_bounds(shape[0], self.workers)
+
+        self._cells_memory = shared_memory.SharedMemory(create=True, size=max(cells.nbytes, 1))
+        self._alive_memory = shared_memory.SharedMemory(create=True, size=8 * self.workers)
+        self.cells = np.ndarray(shape, dtype=np.uint8, buffer=self._cells_memory.buf)
+        self.cells[...] = cells
+        self.alive = np.ndarray((self.workers,), dtype=np.int64, buffer=self._alive_memory.buf)
+
+        context = mp.get_context()
+        barrier = self._barrier = context.Barrier(self.workers)
+        self._connections = []
+        self._processes = []
+        for index, (start, stop) in enumerate(self.strips):
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_worker,
+                args=(self._cells_memory.name, self._alive_memory.name, shape,
+                      index, start, stop, step, barrier, child),
+                daemon=True,
+            )
+            process.start()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+        self._finalizer = weakref.finalize(
+            self, _shutdown, self._processes, self._connections,
+            [self._cells_memory, self._alive_memory],
+        )
+
+    def step(self, steps=1):
+        """
+        Advance the grid steps generations.
+
+        Returns:
+            Number of live cells after the last one.
+
+        Raises:
+            The error of the first worker that failed. The stepper is closed
+            then, with cells left partway through the failed generation.
+        """
+        # Reply standing in for a worker process that died; the barrier is
+        # aborted so the others do not wait for it
+        lost = (RuntimeError("A worker process exited"), "")
+        errors = []
+        for conn in self._connections:
+            try:
+                conn.send(steps)
+            except OSError:
+                self._barrier.abort()
+                errors.append(lost)
+        for conn in self._connections:
+            try:
+                reply = conn.recv()
+            except (EOFError, OSError):
+                self._barrier.abort()
+                reply = lost
+            if isinstance(reply, tuple):
+                errors.append(reply)
+        if errors:
+            self.close()
+            # The workers the failed one released report BrokenBarrierError
+            failed = [reply for reply in errors if not isinstance(reply[0], threading.BrokenBarrierError)]
+            error, trace = (failed or errors)[0]
+            raise error from _RemoteTraceback(trace)
+        return int(self.alive.sum())
+
+    def close(self):
+        """
+        Stop the workers and free the shared memory (cells becomes a copy).
+        """
+        if self._finalizer.alive:
+            self.cells = self.cells.copy()
+            self.alive = self.alive.copy()
+            self._finalizer()
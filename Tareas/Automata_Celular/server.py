@@ -1,9 +1,23 @@
+import os
+import sys
+
 from mesa.visualization import CanvasGrid, ChartModule, PieChartModule
-from mesa.visualization import ModularServer
 from mesa.visualization import Slider
 
+# Modules shared with the other projects are in the repo's shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "shared"))
+from delta_canvas import DeltaCanvasGrid
+from fastforward import FastForwardServer
 from model import GameOfLife
 
+# Cells per side of the grid, drawn on a 500 x 500 pixel canvas
+GRID_SIZE = 50
+
+# Draw the model's cell array with DeltaCanvasGrid instead of a portrayal
+# per cell agent. The model then runs the numpy engine without display,
+# which is faster on large grids but leaves the CanvasGrid path unused.
+DELTA_CANVAS = False
+
 # Colors for living and dead cells
 COLORS = {1: "#000000", 0: "#AAAAAA"}
 
@@ -24,8 +38,13 @@ def GoL_portrayal(entityCell):
 
 # The canvas element will be 500x500 pixels, with each cell being 5x5 pixels.
 # The portrayal method will fill each cell with a representation of the entityCell
-# that is in that cell.
-canvas_element = CanvasGrid(GoL_portrayal, 50, 50, 500, 500)
+# that is in that cell. The delta canvas instead draws the model's cell array
+# with the COLORS above and, after the first frame, only sends the cells that
+# changed.
+if DELTA_CANVAS:
+    canvas_element = DeltaCanvasGrid(COLORS, GRID_SIZE, GRID_SIZE, 500, 500)
+else:
+    canvas_element = CanvasGrid(GoL_portrayal, GRID_SIZE, GRID_SIZE, 500, 500)
 
 # The chart will plot the number of each type of entityCell over time.
 entityCell_chart = ChartModule(
@@ -35,15 +54,18 @@ entityCell_chart = ChartModule(
 
 # The model parameters will be set by sliders controlling the initial density
 model_params = {
-    "height": 50,
-    "width": 50,
+    "height": GRID_SIZE,
+    "width": GRID_SIZE,
     "density": Slider("Cell density", 0.65, 0.01, 1.0, 0.01),
 }
+if DELTA_CANVAS:
+    model_params.update(engine="numpy", display=False)
 
 # The modular server is a special visualization server that allows multiple
 # elements to be displayed simultaneously, and for each of them to be updated
-# when the user interacts with them.
-server = ModularServer(
+# when the user interacts with them. This one can also run several model
+# steps per frame, or step the model in a background thread.
+server = FastForwardServer(
     GameOfLife, [canvas_element, entityCell_chart], "Game Of Life", model_params
 )
 
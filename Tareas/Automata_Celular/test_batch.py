@@ -0,0 +1,61 @@
+# run_batch must report the same counts as stepping the grids one by one
+# Skipping the configurations that cycle must not change any count.
+
+import random
+
+import numpy as np
+import pytest
+
+from batch import pack_rows, run_batch, unpack_rows
+from engine import random_cells
+from model import GameOfLife
+
+
+def reference_counts(rule, density, seed, steps, height, width):
+    """
+    Live cells at every step of each grid row run as its own elementary
+    automaton on a ring, one step at a time.
+    """
+    cells = random_cells(random.Random(seed), height, width, density).astype(np.int64)
+    table = np.array([(rule >> pattern) & 1 for pattern in range(8)], dtype=np.int64)
+    counts = [int(cells.sum())]
+    for _ in range(steps):
+        # Axis 0 is x, along each row
+        cells = table[4 * np.roll(cells, 1, axis=0) + 2 * cells + np.roll(cells, -1, axis=0)]
+        counts.append(int(cells.sum()))
+    return counts
+
+
+def test_pack_round_trip():
+    cells = random_cells(random.Random(4), 130, 7, 0.5)
+    assert (unpack_rows(pack_rows(cells), 130) == cells).all()
+
+
+@pytest.mark.parametrize("height, width", [(20, 30), (64, 9), (70, 12)])
+def test_rule_90_matches_game_of_life(height, width):
+    configs = [(90, density, seed) for density in (0.2, 0.65) for seed in range(3)]
+    counts = run_batch(configs, 40, height, width)
+    for index, (_, density, seed) in enumerate(configs):
+        model = GameOfLife(height, width, density, engine="numpy", display=False, seed=seed, cycle_states=0)
+        for _ in range(40):
+            model.step()
+        collected = model.datacollector.model_vars
+        assert counts[1][index].tolist() == collected[1]
+        assert counts[0][index].tolist() == collected[0]
+
+
+@pytest.mark.parametrize("window", [0, 8, 64])
+def test_every_rule_matches_reference(window):
+    configs = [(rule, 0.4, rule % 5) for rule in range(0, 256, 7)] + [(204, 0.5, 1), (0, 0.5, 2)]
+    counts = run_batch(configs, 60, 70, 6, window=window)
+    for index, config in enumerate(configs):
+        assert counts[1][index].tolist() == reference_counts(*config, 60, 70, 6)
+    assert (counts[0] + counts[1] == 70 * 6).all()
+
+
+def test_cycle_skipping_keeps_counts():
+    # Small rings cycle early, so most configurations are dropped on the way
+    configs = [(rule, 0.5, seed) for rule in (30, 90, 110, 150, 184) for seed in range(4)]
+    stepped = run_batch(configs, 300, 10, 4, window=0)
+    skipped = run_batch(configs, 300, 10, 4, window=64)
+    assert (stepped[1] == skipped[1]).all()
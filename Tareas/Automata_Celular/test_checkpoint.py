@@ -0,0 +1,53 @@
+# Restored runs must continue exactly like the uninterrupted run
+
+import pytest
+
+import checkpoint
+from model import GameOfLife
+
+
+def saved_bytes(model, path):
+    checkpoint.save(model, path)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(engine="agents"),
+        dict(engine="numpy"),
+        dict(engine="numpy", rule="B3/S23"),
+        dict(engine="numpy", rule="B3/S23", workers=2),
+        dict(engine="agents", rule="B36/S23", cycle_states=0),
+    ],
+)
+@pytest.mark.parametrize("cut", [0, 5, 60])
+def test_round_trip_is_bit_for_bit(tmp_path, kwargs, cut):
+    original = GameOfLife(20, 30, 0.4, seed=3, **kwargs)
+    for _ in range(cut):
+        if original.running:
+            original.step()
+    first = saved_bytes(original, tmp_path / "a.ckpt")
+    restored = checkpoint.restore(tmp_path / "a.ckpt")
+    assert saved_bytes(restored, tmp_path / "b.ckpt") == first
+
+    for _ in range(80):
+        if original.running:
+            original.step()
+        if restored.running:
+            restored.step()
+    assert saved_bytes(restored, tmp_path / "b.ckpt") == saved_bytes(original, tmp_path / "a.ckpt")
+    original.close()
+    restored.close()
+
+
+def test_round_trip_after_jump(tmp_path):
+    original = GameOfLife(20, 30, 0.4, seed=3, engine="numpy", rule="B3/S23")
+    original.step()
+    original.jump(50)
+    checkpoint.save(original, tmp_path / "a.ckpt")
+    restored = checkpoint.restore(tmp_path / "a.ckpt")
+    assert restored.generation == original.generation == 51
+    assert restored.row_generations == original.row_generations == [0, 1, 51]
+    assert saved_bytes(restored, tmp_path / "b.ckpt") == saved_bytes(original, tmp_path / "a.ckpt")
@@ -0,0 +1,30 @@
+# SparseLife must step exactly like the dense step over the whole grid
+
+import numpy as np
+import pytest
+
+from life import SparseLife, life_table, parse_rule, step_dense
+
+
+@pytest.mark.parametrize("dense_fraction", [0.3, 1.0])
+@pytest.mark.parametrize("rule", ["B3/S23", "B36/S23", "B2/S"])
+def test_sparse_matches_dense(rule, dense_fraction):
+    table = life_table(*parse_rule(rule))
+    # Tiles that do not divide the grid wrap around at the edges
+    cells = (np.random.default_rng(0).random((50, 37)) < 0.3).astype(np.uint8)
+    dense = cells.copy()
+    # dense_fraction=1.0 never falls back to a dense step
+    life = SparseLife(cells, table, tile=8, dense_fraction=dense_fraction)
+    for _ in range(60):
+        life.step()
+        dense = step_dense(dense, table)
+        assert (cells == dense).all()
+        assert life.alive == np.count_nonzero(dense)
+    if dense_fraction == 1.0:
+        assert life.dense_steps == 0
+
+
+def test_parse_rule_notations():
+    assert parse_rule("B3/S23") == parse_rule("23/3") == parse_rule("b3s23")
+    with pytest.raises(ValueError):
+        parse_rule("B9/S1")
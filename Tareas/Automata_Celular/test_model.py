@@ -0,0 +1,123 @@
+# Equivalence tests for the GameOfLife engines
+# Every faster path (numpy engine, SparseLife, worker processes, cycle
+# projection, jump) must give the same grids and series as stepping the
+# EntityCell agents one generation at a time.
+
+import pytest
+
+from agent import EntityCell
+from model import GameOfLife
+
+LIFE = "B3/S23"
+
+
+def run(steps, **kwargs):
+    model = GameOfLife(20, 30, 0.4, seed=2, **kwargs)
+    for _ in range(steps):
+        model.step()
+    model.close()
+    return model
+
+
+def assert_same(a, b):
+    assert (a.cells == b.cells).all()
+    assert a.counts == b.counts
+    assert a.datacollector.get_model_vars_dataframe().equals(b.datacollector.get_model_vars_dataframe())
+
+
+@pytest.mark.parametrize("rule", [None, LIFE])
+def test_numpy_engine_matches_agents(rule):
+    agents = run(40, engine="agents", rule=rule, cycle_states=0)
+    assert_same(run(40, engine="numpy", rule=rule, cycle_states=0), agents)
+    assert_same(run(40, engine="numpy", rule=rule, display=False, cycle_states=0), agents)
+
+
+@pytest.mark.parametrize("rule", [None, LIFE])
+def test_workers_match_one_process(rule):
+    assert_same(
+        run(25, engine="numpy", rule=rule, workers=3, cycle_states=0),
+        run(25, engine="numpy", rule=rule, cycle_states=0),
+    )
+
+
+def test_agents_engine_rejects_workers():
+    with pytest.raises(ValueError):
+        GameOfLife(10, 10, engine="agents", workers=2)
+
+
+@pytest.mark.parametrize("engine", ["agents", "numpy"])
+def test_cycle_projection_matches_full_run(engine):
+    model = GameOfLife(20, 20, 0.5, engine=engine, rule=LIFE, seed=1)
+    while model.running:
+        model.step()
+    assert model.cycle is not None
+    steps = model.cycle[0] + 3 * model.cycle[1] + 5
+
+    full = GameOfLife(20, 20, 0.5, engine=engine, rule=LIFE, seed=1, cycle_states=0)
+    for _ in range(steps):
+        full.step()
+    assert model.project_model_vars(steps).equals(full.datacollector.get_model_vars_dataframe())
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(engine="agents"),
+        dict(engine="numpy"),
+        dict(engine="agents", rule=LIFE),
+        dict(engine="numpy", rule=LIFE),
+        dict(engine="numpy", rule=LIFE, workers=2),
+    ],
+)
+def test_jump_matches_steps(kwargs):
+    stepped = GameOfLife(20, 30, 0.4, seed=2, cycle_states=0, **kwargs)
+    jumped = GameOfLife(20, 30, 0.4, seed=2, **kwargs)
+    for _ in range(3):
+        stepped.step()
+        jumped.step()
+    for _ in range(137):
+        stepped.step()
+    jumped.jump(137)
+    assert (stepped.cells == jumped.cells).all()
+    assert stepped.counts == jumped.counts
+
+    # Stepping goes on from the jumped grid
+    for _ in range(5):
+        stepped.step()
+        jumped.step()
+    assert (stepped.cells == jumped.cells).all()
+    if kwargs["engine"] == "agents":
+        assert all(cell.condition == jumped.cells[cell.pos] for cell in jumped.schedule.agents)
+    stepped.close()
+    jumped.close()
+
+
+@pytest.mark.parametrize("engine", ["agents", "numpy"])
+def test_cycle_after_jump_counts_generations(engine):
+    jumped = GameOfLife(20, 20, 0.5, engine=engine, rule=LIFE, seed=1)
+    jumped.step()
+    jumped.jump(7)
+    while jumped.running:
+        jumped.step()
+    assert jumped.generation == len(jumped.datacollector.model_vars[1]) - 1 + 6
+    assert jumped.row_generations[:3] == [0, 1, 8]
+
+    full = GameOfLife(20, 20, 0.5, engine=engine, rule=LIFE, seed=1)
+    while full.running:
+        full.step()
+    start, period = full.cycle
+    assert jumped.cycle[1] == period
+    assert jumped.cycle[0] == max(start, 8)
+
+    steps = jumped.generation + 2 * period + 3
+    projected = jumped.project_model_vars(steps)
+    expected = full.project_model_vars(steps)
+    assert list(projected.index) == [0, 1] + list(range(8, steps + 1))
+    assert projected.equals(expected.loc[projected.index])
+
+
+def test_entity_cells_have_no_dict():
+    model = GameOfLife(5, 5, engine="agents")
+    cell = model.grid[0, 0]
+    assert isinstance(cell, EntityCell)
+    assert not hasattr(cell, "__dict__")
@@ -0,0 +1,49 @@
+# ParallelStepper must step like one process and report worker errors
+# instead of leaving the other workers at the barrier
+
+from functools import partial
+
+import numpy as np
+import pytest
+
+from engine import rule_table, step_cells
+from parallel import ParallelStepper
+
+TABLE = rule_table()
+
+
+def narrow_strip_fails(block):
+    # Picklable step that fails on the workers with the narrowest strips
+    if block.shape[0] < 10:
+        raise ZeroDivisionError("strip too narrow")
+    return step_cells(block, TABLE)
+
+
+def test_matches_one_process():
+    cells = (np.random.default_rng(0).random((31, 24)) < 0.5).astype(np.uint8)
+    stepper = ParallelStepper(cells, partial(step_cells, table=TABLE), 3)
+    try:
+        alive = stepper.step(7)
+        expected = cells
+        for _ in range(7):
+            expected = step_cells(expected, TABLE)
+        assert (stepper.cells == expected).all()
+        assert alive == np.count_nonzero(expected)
+    finally:
+        stepper.close()
+
+
+def test_worker_error_is_raised():
+    # Strips of 7, 7 and 8 rows: two workers fail, the third waits for them
+    stepper = ParallelStepper(np.zeros((22, 10), dtype=np.uint8), narrow_strip_fails, 3)
+    with pytest.raises(ZeroDivisionError, match="strip too narrow"):
+        stepper.step()
+    assert not any(process.is_alive() for process in stepper._processes)
+
+
+def test_dead_worker_is_raised():
+    stepper = ParallelStepper(np.zeros((30, 10), dtype=np.uint8), partial(step_cells, table=TABLE), 3)
+    stepper._processes[1].kill()
+    stepper._processes[1].join()
+    with pytest.raises(RuntimeError):
+        stepper.step()
@@ -2,11 +2,18 @@
 # OCT 30 2024
 # Cell script for game of life
 
-from mesa import Agent
 
+class EntityCell:
+    """
+    Cell agent stepped by the model's SimultaneousActivation.
 
-class EntityCell(Agent):
-    """ """
+    Has the parts of mesa's Agent the scheduler and the grid use (unique_id,
+    model, pos, step, advance) but does not subclass it: Agent has no
+    __slots__, so every subclass instance keeps a __dict__. __weakref__ lets
+    the scheduler's AgentSet hold the cells.
+    """
+
+    __slots__ = ("unique_id", "model", "pos", "_next_condition", "__weakref__")
 
     def __init__(self, pos, model):
         """
@@ -16,32 +23,33 @@ class EntityCell(Agent):
             pos: The entity's coordinates on the grid.
             model: standard model reference for agent.
         """
-        super().__init__(pos, model)
+        self.unique_id = pos
+        self.model = model
         self.pos = pos
         self.condition = 0
         self._next_condition = None
 
+    # The condition lives in the model's uint8 cells array, not on the agent
+    @property
+    def condition(self):
+        return int(self.model.cells[self.pos])
+
+    @condition.setter
+    def condition(self, value):
+        self.model.cells[self.pos] = value
+
     def step(self):
         joined_top = "   "  # string to save the combined 3 top cells
         x, y = self.pos  # self coords
 
         # Result map from game rules
-        state_result = {
-            "111": 0,
-            "110": 1,
-            "101": 0,
-            "100": 1,
-            "011": 1,
-            "010": 0,
-            "001": 1,
-            "000": 0,
-        }
+        state_result = self.model.state_result
 
         # Boundary check
         if (
             self.pos[0] < self.model.grid.width - 1
             and self.pos[0] > 0
-            and self.pos[1] != 49
+            and self.pos[1] != self.model.top_row
         ):
             # gets top neighbors and saves their conditions in an array
             for neighbor in self.model.grid.iter_neighbors(self.pos, True):
@@ -69,4 +77,28 @@ class EntityCell(Agent):
         Advance the model by one step.
         """
         if self._next_condition is not None:
+            if self._next_condition != self.condition:
+                # keep the model's population counters up to date
+                self.model.counts[self.condition] -= 1
+                self.model.counts[self._next_condition] += 1
             self.condition = self._next_condition
+
+
+class CellView:
+    """
+    Light grid entry for the array engines.
+
+    Never added to the schedule; it only lets CanvasGrid and GoL_portrayal
+    read a cell's condition from the model's cells array. Uses __slots__
+    instead of a per instance dict.
+    """
+
+    __slots__ = ("pos", "model")
+
+    def __init__(self, model):
+        self.pos = None  # set by the grid
+        self.model = model
+
+    @property
+    def condition(self):
+        return int(self.model.cells[self.pos])
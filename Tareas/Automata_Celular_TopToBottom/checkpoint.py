@@ -0,0 +1,93 @@
+# Checkpoint and restore for GameOfLife runs
+# The file format (a JSON header plus memory-mapped arrays) is in the shared
+# checkpoint_file.py. Restored runs continue exactly like the uninterrupted
+# run.
+
+import os
+import sys
+
+import numpy as np
+
+# Modules shared with the other projects are in the repo's shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "shared"))
+from checkpoint_file import read_checkpoint, rng_state, set_rng_state, write_checkpoint
+from model import GameOfLife
+
+
+def save(model, path):
+    """
+    Write the full state of a GameOfLife to path.
+    """
+    rng_scalars, rng_internal = rng_state(model.random)
+    collector = model.datacollector
+    meta = {
+        "model": "GameOfLife",
+        # GameOfLife(height, width) builds SingleGrid(height, width), whose
+        # width is the height argument
+        "height": model.grid.width,
+        "width": model.grid.height,
+        "rule": model.rule,
+        "steps": model.steps,
+        "engine": model.engine,
+        "seed": model._seed,
+        "rng": rng_scalars,
+        "running": model.running,
+        "model_steps": model._steps,
+        "model_time": model._time,
+        "schedule_steps": model.schedule.steps,
+        "schedule_time": model.schedule.time,
+        "counts": [model.counts[0], model.counts[1]],
+        "model_reporters": list(collector.model_vars),
+        "cycle": model.cycle,
+        "cycle_states": model.cycles.max_states if model.cycles is not None else 0,
+    }
+    arrays = {
+        "rng": rng_internal,
+        "cells": model.cells,
+        "model_vars": np.array(list(zip(*collector.model_vars.values())), dtype=np.int64).reshape(
+            -1, len(collector.model_vars)
+        ),
+    }
+    if model.cycles is not None:
+        arrays["cycle_digests"], arrays["cycle_steps"] = model.cycles.arrays()
+    write_checkpoint(path, meta, arrays)
+
+
+def restore(path, display=False):
+    """
+    Rebuild a GameOfLife from a checkpoint.
+
+    Args:
+        display: Place grid entries for CanvasGrid (array engines only).
+    """
+    meta, arrays = read_checkpoint(path)
+    if meta.get("model") != "GameOfLife":
+        raise ValueError(f"{path} is not a GameOfLife checkpoint")
+
+    # Build the model with every cell dead, without drawing a random start,
+    # then load the saved state
+    model = GameOfLife.__new__(GameOfLife, seed=meta["seed"])
+    model.setup(
+        meta["height"], meta["width"], meta["rule"], meta["engine"], display,
+        meta.get("cycle_states", 0),
+    )
+    model.cells[...] = arrays["cells"]
+    model.count_cells()
+
+    collector = model.datacollector
+    columns = arrays["model_vars"].T.tolist()
+    collector.model_vars = {
+        name: column for name, column in zip(collector.model_vars, columns)
+    }
+
+    if model.cycles is not None:
+        model.cycles.load(arrays["cycle_digests"], arrays["cycle_steps"])
+    model.cycle = tuple(meta["cycle"]) if meta.get("cycle") else None
+    model.running = meta["running"]
+    model.steps = meta["steps"]
+    model._steps = meta["model_steps"]
+    model._time = meta["model_time"]
+    model.schedule.steps = meta["schedule_steps"]
+    model.schedule.time = meta["schedule_time"]
+    set_rng_state(model.random, meta["rng"], arrays["rng"])
+    return model
@@ -0,0 +1,42 @@
+# Row sweep engine for the top to bottom game of life
+# Only the row under the frontier changes each step, so only that row is computed
+
+import numpy as np
+
+
+def state_result(rule=90):
+    """
+    Build the result map for an elementary rule number (0 - 255).
+
+    Args:
+        rule: Wolfram rule number. 90 gives the original game rules.
+
+    Returns:
+        Dict keyed by the 3 cells over a cell ("101", ...) with the next condition.
+    """
+    if not 0 <= rule <= 255:
+        raise ValueError(f"Rule must be between 0 and 255, got {rule}")
+    return {format(pattern, "03b"): (rule >> pattern) & 1 for pattern in range(8)}
+
+
+def rule_table(rule=90):
+    """
+    Lookup table for a rule number, indexed by (left << 2) | (center << 1) | right.
+    """
+    return np.array([(rule >> pattern) & 1 for pattern in range(8)], dtype=np.uint8)
+
+
+def next_row(top, table):
+    """
+    Compute a row from the row over it.
+
+    Like EntityCell.step, the first and last cells are left out of the rule
+    and stay dead.
+
+    Args:
+        top: uint8 array with the conditions of the row over it.
+        table: Lookup table from rule_table().
+    """
+    row = np.zeros_like(top)
+    row[1:-1] = table[(top[:-2] << 2) | (top[1:-1] << 1) | top[2:]]
+    return row
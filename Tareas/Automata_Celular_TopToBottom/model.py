@@ -1,9 +1,19 @@
+import os
+import sys
+
 import mesa
 from mesa import Model, DataCollector
 from mesa.space import SingleGrid
 from mesa.time import SimultaneousActivation
 
-from agent import EntityCell
+import numpy as np
+import pandas as pd
+
+# Modules shared with the other projects are in the repo's shared folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "shared"))
+from agent import CellView, EntityCell
+from cycles import DEFAULT_STATES, StateCache, project_series
+from engine import next_row, rule_table, state_result
 
 
 class GameOfLife(Model):
@@ -13,16 +23,71 @@ class GameOfLife(Model):
     Attributes:
         height, width: Grid size.
         density: What fraction of grid cells have a tree in them.
+        rule: Elementary rule number (0 - 255) applied to the 3 cells over a cell.
+        engine: "agents" steps every EntityCell each tick, "sweep" only
+            computes the row under the frontier from the row over it.
+        cells: uint8 array with the condition of every cell, indexed [x, y].
+        cycle: (start, period) once step start + period repeated step start,
+            None until then. A finished sweep is a fixed point, (top_row, 1).
     """
 
-    def __init__(self, height=50, width=50, density=0.65):
+    def __init__(
+        self,
+        height=50,
+        width=50,
+        density=0.65,
+        rule=90,
+        engine="agents",
+        display=True,
+        seed=None,
+        cycle_states=DEFAULT_STATES,
+    ):
         """
         Create a new forest fire model.
 
         Args:
             height, width: The size of the grid to model
             density: What fraction of grid cells have a tree in them.
+            rule: Elementary rule number, 90 gives the original game rules.
+            engine: "agents" or "sweep". Both reach the same final grid; with
+                rules where "000" gives 1 the agent engine also fills the rows
+                under the frontier on the way, the sweep leaves them dead.
+            display: With the sweep engine, place a CellView in every grid cell
+                so CanvasGrid can draw it. Headless runs can skip it.
+            seed: Seed for the model's random generator (read by mesa's Model).
+            cycle_states: States kept to detect cycles (see cycles.py), 0
+                turns detection off. The agent engine stops on the first
+                repeated grid. The sweep hashes each new row instead: once a
+                row repeats, the rows under it repeat too, so the rest of the
+                sweep is filled in at once.
         """
+        self.setup(height, width, rule, engine, display, cycle_states)
+
+        # Spawns cells randomly based on the density on the top row
+        for contents, (x, y) in self.grid.coord_iter():
+            if y == self.top_row and self.random.random() < density:
+                # Create a tree
+                self.cells[x, y] = 1
+        self.count_cells()
+
+        self.running = True
+        self.datacollector.collect(self)
+        self.check_cycle()
+
+    def setup(self, height, width, rule, engine, display, cycle_states):
+        """
+        Build the model with every cell dead: grid, cells array, engine,
+        schedule and datacollector. Used by __init__ and by
+        checkpoint.restore, which then write the cells array and call
+        count_cells().
+        """
+        if engine not in ("agents", "sweep"):
+            raise ValueError(f"Unknown engine: {engine}")
+        self.engine = engine
+        self.rule = rule
+        self.state_result = state_result(rule)
+        self.cycles = StateCache(cycle_states) if cycle_states else None
+        self.cycle = None
 
         # Set up model objects
         # SimultaneousActivation is a Mesa object that runs all the agents at the same time.
@@ -32,6 +97,12 @@ class GameOfLife(Model):
         self.schedule = SimultaneousActivation(self)
         self.grid = SingleGrid(height, width, torus=True)
         self.steps = 0
+        self.top_row = self.grid.height - 1
+        self.cells = np.zeros((self.grid.width, self.grid.height), dtype=np.uint8)
+
+        # Number of cells in each condition, updated as cells change so the
+        # datacollector does not have to scan every agent
+        self.counts = {0: self.cells.size, 1: 0}
 
         # A datacollector is a Mesa object for collecting data about the model.
         # We'll use it to count the number of trees in each condition each step.
@@ -42,46 +113,119 @@ class GameOfLife(Model):
             }
         )
 
-        # Spawns cells randomly based on the density on the top row
-        for contents, (x, y) in self.grid.coord_iter():
-            new_cell = EntityCell((x, y), self)
-            if y == 49 and self.random.random() < density:
-                # Create a tree
-                new_cell.condition = 1
-            else:
-                new_cell.condition = 0
+        if self.engine == "sweep":
+            # The sweep engine only needs light views of the array
+            self.state_table = rule_table(rule)
+            if display:
+                for contents, pos in self.grid.coord_iter():
+                    self.grid.place_agent(CellView(self), pos)
+            return
 
+        for contents, (x, y) in self.grid.coord_iter():
+            new_cell = EntityCell((x, y), self)  # starts dead
             self.grid.place_agent(new_cell, (x, y))
             self.schedule.add(new_cell)
 
-            if y == 0:
-                self.running = False
-
-        self.running = True
-        self.datacollector.collect(self)
+    def count_cells(self):
+        """
+        Recount the cells array after it was written as a whole.
+        """
+        alive = int(np.count_nonzero(self.cells))
+        self.counts[1] = alive
+        self.counts[0] = self.cells.size - alive
 
     def step(self):
         """
         Have the scheduler advance each cell by one step
         """
-        self.schedule.step()
+        if self.engine == "sweep":
+            self.sweep_row()
+        else:
+            self.schedule.step()
         # collect data
         self.datacollector.collect(self)
 
         self.steps += 1
+        self.check_cycle()
 
         # Halt if the model reached the bottom
-        if self.steps == 49:
+        if self.steps == self.top_row:
             self.running = False
 
+    def sweep_row(self):
+        """
+        Compute the row under the frontier from the row over it.
+        """
+        y = self.top_row - 1 - self.steps  # frontier row
+        if y < 0:
+            return
+        row = next_row(self.cells[:, y + 1], self.state_table)
+        alive = int(np.count_nonzero(row)) - int(np.count_nonzero(self.cells[:, y]))
+        self.counts[1] += alive
+        self.counts[0] -= alive
+        self.cells[:, y] = row
+
+    def check_cycle(self):
+        """
+        Hash the current grid (or the sweep's newest row) and stop the model
+        when it repeats one still in the cache.
+        """
+        if self.cycles is None or self.cycle is not None:
+            return
+        if self.engine == "sweep":
+            if self.steps >= self.top_row:
+                self.cycle = (self.top_row, 1)
+                return
+            first = self.cycles.observe(self.steps, self.cells[:, self.top_row - self.steps])
+            if first is not None:
+                self.finish_sweep(first)
+            return
+        first = self.cycles.observe(self.steps, self.cells)
+        if first is not None:
+            self.cycle = (first, self.steps - first)
+            self.running = False
+
+    def finish_sweep(self, first):
+        """
+        The newest row repeats the row swept at step first: copy the rows of
+        the cycle into the rest of the grid and collect the counts the
+        remaining steps would have, without stepping.
+        """
+        period = self.steps - first
+        remaining = np.arange(self.steps + 1, self.top_row + 1)
+        source = first + (remaining - first) % period
+        rows = self.cells[:, self.top_row - source]
+        alive = np.count_nonzero(rows, axis=0) - np.count_nonzero(self.cells[:, self.top_row - remaining], axis=0)
+        self.cells[:, self.top_row - remaining] = rows
+
+        total = self.cells.size
+        collected = self.datacollector.model_vars
+        for value in (self.counts[1] + np.cumsum(alive)).tolist():
+            collected[0].append(total - value)
+            collected[1].append(value)
+        self.counts[1] = int(self.cells.sum(dtype=np.int64))
+        self.counts[0] = total - self.counts[1]
+        self.steps = self.top_row
+        self.cycle = (self.top_row, 1)
+
+    def project_model_vars(self, steps=None):
+        """
+        The DataCollector's model series up to step steps (top_row by
+        default), like get_model_vars_dataframe(). Steps past the collected
+        ones repeat the detected cycle instead of being simulated.
+        """
+        steps = self.top_row if steps is None else steps
+        collected = self.datacollector.model_vars
+        if steps >= len(collected[1]) and self.cycle is None:
+            raise ValueError("No cycle detected yet, step the model further")
+        return pd.DataFrame(
+            {name: project_series(values, self.cycle, steps + 1) for name, values in collected.items()}
+        )
+
     # staticmethod is a Python decorator that makes a method callable without an instance.
     @staticmethod
     def count_type(model, tree_condition):
         """
         Helper method to count agents in a given condition in a given model.
         """
-        count = 0
-        for tree in model.schedule.agents:
-            if tree.condition == tree_condition:
-                count += 1
-        return count
+        return model.counts[tree_condition]
@@ -0,0 +1,31 @@
+# Restored runs must continue exactly like the uninterrupted run
+
+import pytest
+
+import checkpoint
+from model import GameOfLife
+
+
+def saved_bytes(model, path):
+    checkpoint.save(model, path)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("engine", ["agents", "sweep"])
+@pytest.mark.parametrize("rule", [90, 30, 184])
+@pytest.mark.parametrize("cut", [0, 5, 17])
+def test_round_trip_is_bit_for_bit(tmp_path, engine, rule, cut):
+    original = GameOfLife(30, 40, rule=rule, engine=engine, seed=3)
+    for _ in range(cut):
+        if original.running:
+            original.step()
+    first = saved_bytes(original, tmp_path / "a.ckpt")
+    restored = checkpoint.restore(tmp_path / "a.ckpt")
+    assert saved_bytes(restored, tmp_path / "b.ckpt") == first
+
+    while original.running:
+        original.step()
+    while restored.running:
+        restored.step()
+    assert saved_bytes(restored, tmp_path / "b.ckpt") == saved_bytes(original, tmp_path / "a.ckpt")
@@ -0,0 +1,53 @@
+# Equivalence tests for the top to bottom GameOfLife engines
+# The sweep engine and the detected cycles must reach the same grid and
+# series as stepping the EntityCell agents over every row.
+
+import pytest
+
+from agent import EntityCell
+from model import GameOfLife
+
+
+def run(**kwargs):
+    model = GameOfLife(**kwargs)
+    while model.running:
+        model.step()
+    return model
+
+
+@pytest.mark.parametrize("rule", [90, 30, 110, 184])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_sweep_matches_agents(rule, seed):
+    kwargs = dict(height=16, width=30, density=0.5, rule=rule, seed=seed, cycle_states=0)
+    sweep = run(engine="sweep", **kwargs)
+    agents = run(engine="agents", **kwargs)
+    assert (sweep.cells == agents.cells).all()
+    assert sweep.counts == agents.counts
+
+
+@pytest.mark.parametrize("rule", [90, 30, 4, 184])
+@pytest.mark.parametrize("size", [(8, 60), (40, 50)])
+def test_finished_sweep_matches_full_sweep(rule, size):
+    kwargs = dict(height=size[0], width=size[1], density=0.5, rule=rule, engine="sweep", display=False, seed=1)
+    cycled = run(**kwargs)
+    full = run(cycle_states=0, **kwargs)
+    assert (cycled.cells == full.cells).all()
+    assert cycled.counts == full.counts
+    assert cycled.datacollector.get_model_vars_dataframe().equals(full.datacollector.get_model_vars_dataframe())
+
+
+@pytest.mark.parametrize("rule, seed", [(184, 0), (4, 1), (255, 0), (1, 1)])
+def test_cycle_projection_matches_agents_run(rule, seed):
+    # Starts that repeat a grid before the frontier reaches the bottom
+    kwargs = dict(height=12, width=40, density=0.5, rule=rule, engine="agents", seed=seed)
+    cycled = run(**kwargs)
+    full = run(cycle_states=0, **kwargs)
+    assert cycled.cycle is not None
+    assert cycled.project_model_vars().equals(full.datacollector.get_model_vars_dataframe())
+
+
+def test_entity_cells_have_no_dict():
+    model = GameOfLife(5, 5, engine="agents")
+    cell = model.grid[0, 0]
+    assert isinstance(cell, EntityCell)
+    assert not hasattr(cell, "__dict__")
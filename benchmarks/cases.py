@@ -0,0 +1,263 @@
+"""
+Runs one benchmark case and prints its measurements as one line of JSON.
+run.py starts this script in a fresh interpreter with the project folder as
+the working directory, so each project imports its own model and agent
+modules and the memory of one case does not leak into the next.
+Usage: python cases.py '{"kind": "random_agents", "params": {...}}'
+"""
+import json
+import os
+import random
+import resource
+import sys
+import time
+import tracemalloc
+import warnings
+
+# The project folder, not this one, provides model.py and agent.py
+sys.path.insert(0, os.getcwd())
+
+def time_steps(model, steps):
+    """
+    Seconds of each model.step(). Steps keep going after the model stops so
+    every run of a case times the same number of steps.
+    """
+    times = []
+    for _ in range(steps):
+        start = time.perf_counter()
+        model.step()
+        times.append(time.perf_counter() - start)
+    return times
+
+def peak_memory(build, steps):
+    """
+    Peak MiB traced by tracemalloc while building a model and running steps.
+    """
+    tracemalloc.start()
+    model = build()
+    for _ in range(steps):
+        model.step()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    close(model)
+    return peak / 2**20
+
+def close(model):
+    if callable(getattr(model, "close", None)):
+        model.close()
+
+def measure(build, steps, memory_steps=1, setup=None):
+    """
+    Common measurements of a model.
+    Args:
+        build: Function returning a new model
+        steps: Steps to time after building it
+        memory_steps: Steps included in the traced peak memory
+        setup: Called with the timed model before it steps (e.g. to count
+            searches), returns a function giving extra measurements at the end
+    Returns:
+        (dict of measurements, the timed model)
+    """
+    start = time.perf_counter()
+    model = build()
+    init_s = time.perf_counter() - start
+    extra = setup(model) if setup is not None else None
+    times = sorted(time_steps(model, steps))
+    result = {
+        "init_s": init_s,
+        "step_ms": 1000 * times[len(times) // 2] if times else 0.0,
+        "step_ms_mean": 1000 * sum(times) / len(times) if times else 0.0,
+    }
+    if extra is not None:
+        result.update(extra())
+    close(model)
+    result["peak_mib"] = peak_memory(build, memory_steps)
+    return result, model
+
+def count_searches(model):
+    """
+    Wrap model.pathfinder.search to add up the nodes of every A* search.
+    """
+    pathfinder = model.pathfinder
+    search = pathfinder.search
+    totals = {"searches": 0, "expanded": 0}
+
+    def counted(*args, **kwargs):
+        path = search(*args, **kwargs)
+        totals["searches"] += 1
+        totals["expanded"] += pathfinder.stats.expanded
+        return path
+
+    pathfinder.search = counted
+    return lambda: dict(totals)
+
+def random_agents(params):
+    from model import RandomModel
+
+    def build():
+        return RandomModel(
+            params["N"], params["M"], params["O"], params["size"], params["size"],
+            max_steps=params["steps"] + 1, exploration=params.get("exploration", "random"),
+            dispatch=params.get("dispatch"), seed=params["seed"],
+        )
+
+    result, model = measure(build, params["steps"], setup=count_searches)
+    result["check"] = [model.count_dirty_cells(), model.accumulated_steps]
+    return result
+
+def fleet(params):
+    from fleet import FleetModel
+
+    def build():
+        return FleetModel(
+            params["N"], params["M"], params["O"], params["size"], params["size"],
+            max_steps=params["steps"] + 1, seed=params["seed"],
+        )
+
+    result, model = measure(build, params["steps"], setup=count_searches)
+    result["check"] = [model.count_dirty_cells(), model.accumulated_steps]
+    return result
+
+def pathfinding(params):
+    """
+    A* and jump point search between random connected pairs of free cells of
+    a RandomModel's grid.
+    """
+    from model import RandomModel
+
+    model = RandomModel(1, 0.0, params["O"], params["size"], params["size"], seed=params["seed"])
+    grid, navigation, search = model.grid, model.navigation, model.pathfinder
+    free = [pos for pos in ((x, y) for x in range(grid.width) for y in range(grid.height))
+            if not grid.obstacles[pos]]
+    rng = random.Random(params["seed"])
+    pairs = []
+    while len(pairs) < params["pairs"]:
+        start, goal = rng.choice(free), rng.choice(free)
+        if navigation.distance(goal, start) is not None:
+            pairs.append((start, goal))
+
+    result = {}
+    length = 0
+    for name, jump in (("astar", False), ("jps", True)):
+        expanded = 0
+        start_time = time.perf_counter()
+        for start, goal in pairs:
+            path = search.search(start, goal, jump=jump)
+            expanded += search.stats.expanded
+            if not jump:
+                length += len(path) - 1
+        result[f"{name}_ms"] = 1000 * (time.perf_counter() - start_time) / len(pairs)
+        result[f"{name}_expanded"] = expanded
+    result["check"] = length
+    return result
+
+def game_of_life(params):
+    from model import GameOfLife
+
+    kwargs = {key: params[key] for key in ("density", "engine", "rule", "seed") if key in params}
+    if params["engine"] != "agents":
+        kwargs["display"] = False
+
+    def build():
+        return GameOfLife(params["size"], params["size"], **kwargs)
+
+    result, model = measure(build, params["steps"])
+    result["check"] = int(model.counts[1])
+    return result
+
+def parallel(params):
+    """
+    Median step time of the numpy engine split over 1, 2 ... max_workers
+    processes (ParallelStepper), every run from the same starting grid, and
+    the speedup over 1 worker. Extra workers only add overhead past
+    cpu_count cores, so compare runs from machines with enough of them.
+    """
+    from hashlife import DEFAULT_MAX_BYTES
+    from model import GameOfLife
+
+    size, rule = params["size"], params.get("rule")
+    start = time.perf_counter()
+    model = GameOfLife(size, size, params.get("density", 0.65), engine="numpy", display=False,
+                       seed=params["seed"], rule=rule, cycle_states=0)
+    init_s = time.perf_counter() - start
+    cells = model.cells.copy()
+
+    sweep = {}
+    check = []
+    for workers in range(1, params["max_workers"] + 1):
+        if workers > 1:
+            # The same starting grid without drawing it again, as checkpoint.restore does
+            model = GameOfLife.__new__(GameOfLife, seed=params["seed"])
+            model.setup(size, size, "numpy", False, rule, workers, 0, DEFAULT_MAX_BYTES)
+            model.cells[...] = cells
+            model.load_cells()
+        model.step()  # warm up the worker processes
+        times = sorted(time_steps(model, params["steps"]))
+        step_ms = 1000 * times[len(times) // 2]
+        sweep[workers] = {"step_ms": step_ms, "speedup": sweep[1]["step_ms"] / step_ms if sweep else 1.0}
+        check.append(int(model.counts[1]))
+        close(model)
+    return {
+        "init_s": init_s,
+        "step_ms": sweep[params["max_workers"]]["step_ms"],
+        "cpu_count": os.cpu_count(),
+        "sweep": sweep,
+        "check": check,
+    }
+
+def construction(params):
+    """
+    Build time and traced peak memory of one model, also per grid cell, so
+    the size of the per cell objects (EntityCell, CellView, StaticEntity) is
+    tracked on its own.
+    """
+    size = params["size"]
+    if params["model"] == "random_agents":
+        from model import RandomModel
+
+        def build():
+            return RandomModel(params["N"], params["M"], params["O"], size, size, seed=params["seed"])
+    else:
+        from model import GameOfLife
+
+        options = {key: params[key] for key in ("engine", "display") if key in params}
+
+        def build():
+            return GameOfLife(size, size, seed=params["seed"], **options)
+
+    start = time.perf_counter()
+    model = build()
+    init_s = time.perf_counter() - start
+    close(model)
+    del model
+
+    tracemalloc.start()
+    model = build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    close(model)
+    if params["model"] == "random_agents":
+        check = model.count_dirty_cells()
+    else:
+        check = int(model.counts[1])
+    return {"init_s": init_s, "peak_mib": peak / 2**20, "bytes_per_cell": peak / size**2, "check": check}
+
+KINDS = {
+    "random_agents": random_agents,
+    "fleet": fleet,
+    "pathfinding": pathfinding,
+    "game_of_life": game_of_life,
+    "parallel": parallel,
+    "construction": construction,
+}
+
+def main():
+    warnings.simplefilter("ignore")
+    case = json.loads(sys.argv[1])
+    result = KINDS[case["kind"]](case["params"])
+    # Peak resident memory of the whole process (interpreter and imports too)
+    result["max_rss_mib"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
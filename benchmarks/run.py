@@ -0,0 +1,240 @@
+"""
+Benchmark and regression suite for RandomModel, FleetModel and both GameOfLife models.
+Every case builds and steps one model in its own interpreter (see cases.py)
+and records the init time, the median time per step, the peak memory traced
+while building it and, for RandomModel, the nodes its A* searches expand.
+Construction cases only build the model and also record its memory per
+grid cell. Parallel cases time the GameOfLife numpy engine at 1 ... N worker
+processes and record the speedup over 1 worker.
+Results are written as JSON. With --compare they are checked against a
+stored baseline and the run exits with status 1 if a metric got worse by
+more than its tolerance (node counts are deterministic and must not grow).
+Usage:
+    python run.py [--suite quick|full] [--output results.json]
+    python run.py --suite quick --compare baseline.json
+    python run.py --compare baseline.json --results results.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CASES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cases.py")
+
+PROJECTS = {
+    "random_agents": os.path.join("Actividades", "randomAgents"),
+    "automata_celular": os.path.join("Tareas", "Automata_Celular"),
+    "top_to_bottom": os.path.join("Tareas", "Automata_Celular_TopToBottom"),
+}
+
+# metric: (relative tolerance, absolute tolerance); a metric regresses when
+# it grows by more than both. Timings are noisy, node counts are exact.
+TOLERANCES = {
+    "init_s": (0.25, 0.005),
+    "step_ms": (0.25, 0.05),
+    "peak_mib": (0.10, 0.5),
+    "bytes_per_cell": (0.10, 8),
+    "expanded": (0.0, 0),
+    "astar_ms": (0.25, 0.05),
+    "jps_ms": (0.25, 0.05),
+    "astar_expanded": (0.0, 0),
+    "jps_expanded": (0.0, 0),
+}
+
+def grid(**values):
+    """
+    Every combination of the given parameter values, as dicts.
+    """
+    keys = list(values)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values.values())]
+
+def case(project, kind, **params):
+    params.setdefault("seed", 0)
+    name = ",".join(f"{key}={value}" for key, value in params.items())
+    return {"id": f"{project}/{kind}/{name}", "project": project, "kind": kind, "params": params}
+
+def suite(name):
+    """
+    Cases of the quick (a minute or so) or full suite.
+    """
+    quick = name == "quick"
+    cases = []
+    random_grid = grid(
+        size=[30] if quick else [30, 100], O=[0.2] if quick else [0.1, 0.3],
+        M=[0.2] if quick else [0.1, 0.3], dispatch=[None, "hungarian"],
+    )
+    for params in random_grid:
+        cases.append(case("random_agents", "random_agents", N=10, steps=100, **params))
+    for N, size in [(1000, 160)] if quick else [(1000, 160), (10000, 500)]:
+        cases.append(case("random_agents", "fleet", N=N, size=size, O=0.1, M=0.1, steps=50))
+    for params in grid(size=[100] if quick else [100, 300], O=[0.1, 0.3]):
+        cases.append(case("random_agents", "pathfinding", pairs=30, **params))
+
+    densities = [0.65] if quick else [0.3, 0.65]
+    for params in grid(size=[50] if quick else [50, 100], density=densities):
+        cases.append(case("automata_celular", "game_of_life", engine="agents", rule=None, steps=10, **params))
+        cases.append(case("top_to_bottom", "game_of_life", engine="agents", rule=90, steps=10, **params))
+    for params in grid(size=[200] if quick else [200, 1000], density=densities):
+        for rule in (None, "B3/S23"):
+            cases.append(case("automata_celular", "game_of_life", engine="numpy", rule=rule, steps=50, **params))
+        cases.append(case("top_to_bottom", "game_of_life", engine="sweep", rule=90, steps=50, **params))
+    if not quick:
+        for rule in (None, "B3/S23"):
+            cases.append(case("automata_celular", "parallel", size=4000, rule=rule, max_workers=4, steps=10))
+
+    for size in [200] if quick else [200, 500]:
+        cases.append(case("random_agents", "construction", model="random_agents", N=10, M=0.1, O=0.1, size=size))
+        cases.append(case("automata_celular", "construction", model="game_of_life", engine="agents", size=size))
+        cases.append(case("automata_celular", "construction", model="game_of_life", engine="numpy", size=size))
+        cases.append(case("top_to_bottom", "construction", model="game_of_life", engine="agents", size=size))
+        cases.append(case("top_to_bottom", "construction", model="game_of_life", engine="sweep", size=size))
+    return cases
+
+def run_case(entry):
+    """
+    Run one case in a new interpreter inside its project folder.
+    """
+    process = subprocess.run(
+        [sys.executable, CASES, json.dumps({"kind": entry["kind"], "params": entry["params"]})],
+        cwd=os.path.join(ROOT, PROJECTS[entry["project"]]),
+        capture_output=True, text=True,
+    )
+    if process.returncode != 0:
+        return {"error": process.stderr.strip().splitlines()[-1] if process.stderr.strip() else "failed"}
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+def environment():
+    versions = {}
+    for module in ("numpy", "mesa"):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            versions[module] = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": git_commit(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        **versions,
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(name, only=None):
+    results = {}
+    for entry in suite(name):
+        if only and not any(pattern in entry["id"] for pattern in only):
+            continue
+        start = time.perf_counter()
+        metrics = run_case(entry)
+        results[entry["id"]] = {"project": entry["project"], "kind": entry["kind"],
+                                "params": entry["params"], **metrics}
+        status = metrics.get("error") or f"{time.perf_counter() - start:.1f} s"
+        print(f"{entry['id']:<100} {status}", file=sys.stderr)
+    return {"suite": name, "environment": environment(), "results": results}
+
+def compare(baseline, current):
+    """
+    Regressions of current against baseline.
+    Returns:
+        list of (case id, metric, baseline value, current value, label) rows,
+        labelled "slower"/"more" (a regression), "error", "missing" or
+        "changed" (the case ended on another state, e.g. a behavior change)
+    """
+    rows = []
+    for case_id, before in baseline["results"].items():
+        after = current["results"].get(case_id)
+        if after is None:
+            rows.append((case_id, "-", None, None, "missing"))
+            continue
+        if "error" in after:
+            rows.append((case_id, "-", None, after["error"], "error"))
+            continue
+        for metric, (relative, absolute) in TOLERANCES.items():
+            if metric not in before or metric not in after:
+                continue
+            old, new = before[metric], after[metric]
+            if new - old > absolute and new > old * (1 + relative):
+                label = "slower" if metric.endswith(("_s", "_ms")) else "more"
+                rows.append((case_id, metric, old, new, label))
+        if before.get("check") != after.get("check"):
+            rows.append((case_id, "check", before.get("check"), after.get("check"), "changed"))
+    return rows
+
+def print_summary(results):
+    print(f"{'case':<100} {'init s':>8} {'ms/step':>9} {'peak MiB':>9} {'expanded':>9} {'B/cell':>7}")
+    for case_id, result in results["results"].items():
+        if "error" in result:
+            print(f"{case_id:<100} error: {result['error']}")
+            continue
+        if result["kind"] == "pathfinding":
+            print(f"{case_id:<100} {'-':>8} {result['astar_ms']:9.3f} {'-':>9} {result['astar_expanded']:9d}")
+            continue
+        if result["kind"] == "parallel":
+            speedups = " ".join(f"{workers}:{run['speedup']:.2f}x" for workers, run in result["sweep"].items())
+            print(f"{case_id:<100} {result['init_s']:8.3f} {result['step_ms']:9.3f} {'-':>9} {speedups}")
+            continue
+        expanded = result.get("expanded", "-")
+        step = f"{result['step_ms']:9.3f}" if "step_ms" in result else f"{'-':>9}"
+        per_cell = f"{result['bytes_per_cell']:7.0f}" if "bytes_per_cell" in result else f"{'-':>7}"
+        print(f"{case_id:<100} {result['init_s']:8.3f} {step} {result['peak_mib']:9.1f} {expanded:>9} {per_cell}")
+
+def show(value):
+    return f"{value:.4g}" if isinstance(value, float) else str(value)
+
+def print_comparison(rows):
+    if not rows:
+        print("No regressions")
+        return
+    print(f"{'case':<100} {'metric':>14} {'baseline':>10} {'current':>10} {'change':>8}")
+    for case_id, metric, old, new, label in rows:
+        change = ""
+        if isinstance(old, (int, float)) and isinstance(new, (int, float)) and old:
+            change = f"{100 * (new - old) / old:+.1f}%"
+        print(f"{case_id:<100} {metric:>14} {show(old):>10} {show(new):>10} {change:>8} {label}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suite", choices=["quick", "full"], default="full")
+    parser.add_argument("--only", nargs="+", default=None, help="Run the cases whose id contains one of these")
+    parser.add_argument("--output", default=None, help="Write the results to this JSON file")
+    parser.add_argument("--compare", default=None, help="Baseline JSON file to check the results against")
+    parser.add_argument("--results", default=None, help="Compare this results file instead of running the suite")
+    args = parser.parse_args()
+
+    if args.results:
+        with open(args.results) as f:
+            results = json.load(f)
+    else:
+        results = run_suite(args.suite, args.only)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+    print_summary(results)
+
+    failed = any("error" in result for result in results["results"].values())
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(baseline, results)
+        if args.only and not args.results:
+            rows = [row for row in rows if row[4] != "missing"]
+        print()
+        print_comparison(rows)
+        failed = failed or any(label != "missing" for *_, label in rows)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
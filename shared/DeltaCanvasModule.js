@@ -0,0 +1,88 @@
+// Client side of DeltaCanvasGrid: keeps one pixel per cell in an ImageData,
+// patches the runs of changed cells it receives and scales it onto the canvas
+const DeltaCanvasModule = function (
+  canvas_width,
+  canvas_height,
+  grid_width,
+  grid_height,
+  palette
+) {
+  const parent = document.createElement("div");
+  parent.style.height = `${canvas_height}px`;
+  parent.className = "world-grid-parent";
+
+  const canvas = document.createElement("canvas");
+  canvas.width = canvas_width;
+  canvas.height = canvas_height;
+  canvas.className = "world-grid";
+  parent.appendChild(canvas);
+  document.getElementById("elements").appendChild(parent);
+
+  const context = canvas.getContext("2d");
+
+  // One pixel per cell
+  const buffer = document.createElement("canvas");
+  buffer.width = grid_width;
+  buffer.height = grid_height;
+  const bufferContext = buffer.getContext("2d");
+  const image = bufferContext.createImageData(grid_width, grid_height);
+  const pixels = image.data;
+
+  // "#RRGGBB" -> [r, g, b, a], values without a color are transparent
+  const transparent = [0, 0, 0, 0];
+  const colors = palette.map((color) =>
+    color
+      ? [1, 3, 5].map((i) => parseInt(color.slice(i, i + 2), 16)).concat(255)
+      : transparent
+  );
+
+  const decode = (text) => {
+    const raw = atob(text);
+    const bytes = new Uint8Array(raw.length);
+    for (let i = 0; i < raw.length; i++) {
+      bytes[i] = raw.charCodeAt(i);
+    }
+    return bytes;
+  };
+
+  const draw = () => {
+    bufferContext.putImageData(image, 0, 0);
+    context.imageSmoothingEnabled = false;
+    context.clearRect(0, 0, canvas_width, canvas_height);
+    context.drawImage(buffer, 0, 0, canvas_width, canvas_height);
+  };
+
+  this.render = function (data) {
+    const bytes = decode(data.cells);
+    if (data.full) {
+      // Every cell, 1 bit (most significant first) or 1 byte per cell
+      const cells = grid_width * grid_height;
+      for (let cell = 0; cell < cells; cell++) {
+        const value =
+          data.bits === 1 ? (bytes[cell >> 3] >> (7 - (cell & 7))) & 1 : bytes[cell];
+        pixels.set(colors[value] || transparent, cell * 4);
+      }
+      draw();
+      return;
+    }
+
+    // Runs of changed cells
+    const view = new DataView(bytes.buffer);
+    const runs = view.getUint32(0, true);
+    let value = 4 + runs * 8;
+    for (let r = 0; r < runs; r++) {
+      const start = view.getUint32(4 + r * 4, true);
+      const length = view.getUint32(4 + (runs + r) * 4, true);
+      for (let cell = start; cell < start + length; cell++) {
+        const color = colors[bytes[value++]] || transparent;
+        pixels.set(color, cell * 4);
+      }
+    }
+    draw();
+  };
+
+  this.reset = function () {
+    pixels.fill(0);
+    context.clearRect(0, 0, canvas_width, canvas_height);
+  };
+};
@@ -0,0 +1,81 @@
+# Checkpoint file format shared by the models' checkpoint modules
+# A checkpoint is one binary file: a JSON header with the model's scalars and
+# a table of arrays, followed by the raw arrays, each aligned to 64 bytes.
+# Arrays are read back with np.memmap, so loading a checkpoint does not parse
+# or copy anything until the model is rebuilt from it, and many runs can be
+# forked from the same file.
+
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b"MESACKPT"
+VERSION = 1
+ALIGN = 64
+# magic, format version, header length
+PREFIX = struct.Struct("<8sIQ")
+
+
+def write_checkpoint(path, meta, arrays):
+    """
+    Write meta (a JSON-ready dict) and arrays (dict of name to array) to path.
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    table = {}
+    offset = 0
+    for name, array in arrays.items():
+        table[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes // ALIGN) * ALIGN
+    header = json.dumps({"meta": meta, "arrays": table}).encode()
+    start = -(-(PREFIX.size + len(header)) // ALIGN) * ALIGN
+
+    with open(path, "wb") as f:
+        f.write(PREFIX.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(start + table[name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(start + offset)
+
+
+def read_checkpoint(path, mode="r"):
+    """
+    Read a checkpoint written by write_checkpoint.
+
+    Returns:
+        (meta, arrays) where arrays are np.memmap views of the file
+        (mode "r" read only, "c" copy on write).
+    """
+    with open(path, "rb") as f:
+        magic, version, header_length = PREFIX.unpack(f.read(PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a checkpoint")
+        if version != VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {version}")
+        header = json.loads(f.read(header_length))
+    start = -(-(PREFIX.size + header_length) // ALIGN) * ALIGN
+
+    arrays = {}
+    for name, info in header["arrays"].items():
+        shape = tuple(info["shape"])
+        if 0 in shape:
+            arrays[name] = np.empty(shape, dtype=info["dtype"])
+        else:
+            arrays[name] = np.memmap(path, dtype=info["dtype"], mode=mode, offset=start + info["offset"], shape=shape)
+    return header["meta"], arrays
+
+
+def rng_state(random):
+    """
+    random.Random state as (JSON-ready scalars, uint32 array).
+    """
+    version, internal, gauss_next = random.getstate()
+    return {"version": version, "gauss_next": gauss_next}, np.array(internal, dtype=np.uint32)
+
+
+def set_rng_state(random, scalars, internal):
+    """
+    Restore a random.Random state saved with rng_state.
+    """
+    random.setstate((scalars["version"], tuple(int(value) for value in internal), scalars["gauss_next"]))
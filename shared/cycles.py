@@ -0,0 +1,87 @@
+# Cycle detection for the game of life models
+# The rules are deterministic, so once a generation repeats an earlier one the
+# run repeats the same states with a fixed period forever. Each generation is
+# hashed into a bounded cache of recent states; on the first repeat the model
+# stops, and its DataCollector series can be continued without stepping.
+
+import hashlib
+
+import numpy as np
+
+# Generations kept by default, cycles longer than this are not detected
+DEFAULT_STATES = 1024
+DIGEST_SIZE = 16
+
+
+def digest(state):
+    """
+    128 bit digest of an array of 0/1 conditions, packed to bits first so
+    there are 8 times fewer bytes to hash.
+    """
+    return hashlib.blake2b(np.packbits(state).tobytes(), digest_size=DIGEST_SIZE).digest()
+
+
+class StateCache:
+    """
+    Digests of the last max_states generations and the step each was seen at.
+
+    Attributes:
+        max_states: Size bound of the cache, the oldest digest is dropped first.
+        seen: Dict of digest (bytes) to step, in the order they were added.
+    """
+
+    def __init__(self, max_states=DEFAULT_STATES):
+        if max_states < 1:
+            raise ValueError("max_states must be at least 1")
+        self.max_states = max_states
+        self.seen = {}
+
+    def observe(self, step, state):
+        """
+        Record the state (a numpy array) of generation step.
+
+        Returns:
+            The step the same state was seen at before, or None.
+        """
+        key = digest(state)
+        first = self.seen.get(key)
+        if first is not None:
+            return first
+        if len(self.seen) >= self.max_states:
+            del self.seen[next(iter(self.seen))]
+        self.seen[key] = step
+        return None
+
+    def clear(self):
+        self.seen = {}
+
+    def arrays(self):
+        """
+        The cache as (uint8 digests of shape (n, DIGEST_SIZE), int64 steps).
+        """
+        keys = b"".join(self.seen)
+        digests = np.frombuffer(keys, dtype=np.uint8).reshape(-1, DIGEST_SIZE)
+        return digests, np.array(list(self.seen.values()), dtype=np.int64)
+
+    def load(self, digests, steps):
+        """
+        Replace the cache with arrays from arrays().
+        """
+        self.seen = {bytes(key): int(step) for key, step in zip(digests, steps)}
+
+
+def project_series(series, cycle, length):
+    """
+    Continue a series collected once per generation up to length values.
+
+    Args:
+        series: Values of generations 0, 1, ... (at least up to the repeat).
+        cycle: (start, period), generation start + period repeats start.
+        length: Number of values to return.
+    """
+    values = list(series[:length])
+    if len(values) < length:
+        start, period = cycle
+        for generation in range(len(values), length):
+            values.append(series[start + (generation - start) % period])
+    return values
@@ -0,0 +1,113 @@
+# Canvas element that streams only the cells that changed since the last frame
+# Replaces CanvasGrid for big grids: no portrayal dict per cell, the browser
+# keeps the picture and patches it
+
+import base64
+import os
+import weakref
+
+import numpy as np
+from mesa.visualization import VisualizationElement
+
+from fastforward import RENDERING_FOR
+
+
+def encode_changes(indices, frame):
+    """
+    Pack the cells at indices (sorted flat indices into frame) as runs.
+
+    Layout, little endian: uint32 number of runs, uint32 start of every run,
+    uint32 length of every run, then one uint8 value per changed cell.
+    """
+    if indices.size:
+        breaks = np.flatnonzero(np.diff(indices) != 1) + 1
+        starts = indices[np.concatenate(([0], breaks))]
+        ends = indices[np.concatenate((breaks - 1, [-1]))] + 1
+    else:
+        starts = ends = indices
+    header = np.concatenate(([len(starts)], starts, ends - starts)).astype("<u4")
+    return header.tobytes() + frame[indices].tobytes()
+
+
+def encode_frame(frame):
+    """
+    Pack every cell: 1 bit per cell when all values are 0 or 1 (most
+    significant bit first), else 1 byte per cell.
+
+    Returns:
+        (bits per cell, packed bytes)
+    """
+    if frame.size and frame.max() <= 1:
+        return 1, np.packbits(frame).tobytes()
+    return 8, frame.tobytes()
+
+
+class DeltaCanvasGrid(VisualizationElement):
+    """
+    Grid drawn in the browser from the model's cell array.
+
+    The first frame after a reset sends every cell; the next ones only send
+    the runs of cells whose value changed, unless most cells changed and the
+    whole (bit packed) frame is smaller. Changes are computed against the
+    last frame sent to the same browser connection, so each tab and each
+    reconnect starts with a full frame. That needs FastForwardServer, which
+    tells the element the connection; under another server every frame is
+    full. Each cell is painted with
+    colors[value], the same colors the portrayal uses, and row y = 0 is at
+    the bottom like in CanvasGrid.
+
+    Attributes:
+        colors: Dict of cell value (0 - 255) to a "#RRGGBB" color.
+        grid_width, grid_height: Size of the grid in cells.
+        frame: Function of the model returning the uint8 [x, y] values to draw.
+        previous: WeakKeyDictionary of connection to (model, flat values in
+            image row order) of the last frame sent to it.
+    """
+
+    local_includes = ["DeltaCanvasModule.js"]
+    local_dir = os.path.dirname(os.path.abspath(__file__))
+
+    def __init__(
+        self,
+        colors,
+        grid_width,
+        grid_height,
+        canvas_width=500,
+        canvas_height=500,
+        frame=lambda model: model.cells,
+    ):
+        super().__init__()
+        self.colors = colors
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.frame = frame
+        self.previous = weakref.WeakKeyDictionary()
+
+        palette = [colors.get(value, "") for value in range(max(colors) + 1)]
+        self.js_code = (
+            f"elements.push(new DeltaCanvasModule({canvas_width}, {canvas_height}, "
+            f"{grid_width}, {grid_height}, {palette!r}));"
+        )
+
+    def render(self, model):
+        # Image row order: top row first, so y is flipped
+        frame = np.array(self.frame(model)[:, ::-1].T, dtype=np.uint8).ravel()
+
+        connection = RENDERING_FOR.get()
+        last = self.previous.get(connection) if connection is not None else None
+        # A reset builds a new model object
+        full = last is None or last[0] is not model or last[1].shape != frame.shape
+        bits, packed = encode_frame(frame)
+        if not full:
+            changes = encode_changes(np.flatnonzero(frame != last[1]), frame)
+            full = len(changes) >= len(packed)
+            if not full:
+                packed = changes
+
+        if connection is not None:
+            self.previous[connection] = (model, frame)
+        return {
+            "full": bool(full),
+            "bits": bits,
+            "cells": base64.b64encode(packed).decode("ascii"),
+        }
@@ -0,0 +1,197 @@
+"""
+ModularServer that runs the model faster than it is drawn.
+Two run modes, picked from the controls on the page:
+    frame skip: every Step/tick of the page advances the model steps_per_frame
+        steps before rendering once.
+    background: a thread steps the model as fast as it can while the page is
+        running; each tick only renders a snapshot of the current state.
+The model's step() is not changed: the server wraps it on the model instance
+after each reset, and removes its own controls from the model parameters.
+The websocket is served by ConnectionSocketHandler, so elements can keep
+state per browser connection (see RENDERING_FOR).
+"""
+import contextvars
+import threading
+import time
+
+import tornado.web
+from mesa.visualization import Checkbox, ModularServer, Slider, TextElement
+from mesa.visualization.ModularVisualization import SocketHandler
+
+# Model parameters read by the server and never passed to the model
+CONTROL_PARAMS = ("steps_per_frame", "background")
+
+# Seconds without a request from the page before the background thread pauses
+IDLE_TIMEOUT = 2.0
+
+# Browser connection (a ConnectionSocketHandler) the frame being rendered is
+# for, None when the frame is not rendered for a connection
+RENDERING_FOR = contextvars.ContextVar("rendering_for", default=None)
+
+def control_value(param):
+    return param.value if hasattr(param, "value") else param
+
+class ConnectionSocketHandler(SocketHandler):
+    """
+    SocketHandler that sets RENDERING_FOR to itself while it renders a frame.
+    """
+    @property
+    def viz_state_message(self):
+        token = RENDERING_FOR.set(self)
+        try:
+            return super().viz_state_message
+        finally:
+            RENDERING_FOR.reset(token)
+
+class ConnectionSockets(tornado.web.Application):
+    """
+    Serves the websocket with ConnectionSocketHandler. Listed after
+    ModularServer in the bases, it receives ModularServer's handler list.
+    """
+    def __init__(self, handlers, **settings):
+        handlers = [
+            (handler[0], ConnectionSocketHandler, *handler[2:]) if handler[1] is SocketHandler else handler
+            for handler in handlers
+        ]
+        super().__init__(handlers, **settings)
+
+class SpeedElement(TextElement):
+    """
+    Steps per second reached since the previous frame.
+    """
+    def __init__(self):
+        super().__init__()
+        self.server = None
+
+    def render(self, model):
+        server = self.server
+        if server is None:
+            return ""
+        mode = "background" if server.background else f"{server.steps_per_frame} steps per frame"
+        return (
+            f"<b>Steps per second:</b> {server.steps_per_second():.0f} "
+            f"({server.steps} steps, {mode})"
+        )
+
+class FastForwardServer(ModularServer, ConnectionSockets):
+    """
+    ModularServer with frame skipping and a background stepping thread.
+    Args:
+        steps_per_frame: Initial model steps per rendered frame
+        background: Start in background mode
+        max_steps_per_frame: Upper end of the steps per frame slider
+    Attributes:
+        steps: Model steps run since the last reset
+        lock: Held while the model steps or is rendered
+        turn: Condition the background thread waits on after each step until
+            no render is waiting for the lock (RLock is not fair, so the
+            thread could otherwise take it back before a render gets it)
+        renders_waiting: Renders waiting for the lock, guarded by turn
+    """
+    def __init__(self, model_cls, visualization_elements, name="Mesa Model",
+                 model_params=None, port=None, steps_per_frame=1, background=False,
+                 max_steps_per_frame=500):
+        model_params = dict(model_params or {})
+        model_params["steps_per_frame"] = Slider("Steps per frame", steps_per_frame, 1, max_steps_per_frame, 1)
+        model_params["background"] = Checkbox("Run in background thread", background)
+        self.speed = SpeedElement()
+
+        self.lock = threading.RLock()
+        self.turn = threading.Condition()
+        self.renders_waiting = 0
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.last_request = 0.0
+        self.steps = 0
+        self.steps_per_frame = steps_per_frame
+        self.background = background
+        self.sample = (time.perf_counter(), 0)  # (time, steps) at the last frame
+        super().__init__(model_cls, list(visualization_elements) + [self.speed], name, model_params, port)
+        self.speed.server = self
+
+    def reset_model(self):
+        """
+        Build a new model with the current parameters (without the controls)
+        and wrap its step.
+        """
+        self.stop_thread()
+        controls = {key: self.model_kwargs.pop(key) for key in CONTROL_PARAMS if key in self.model_kwargs}
+        try:
+            super().reset_model()
+        finally:
+            self.model_kwargs.update(controls)
+        self.steps_per_frame = max(1, int(control_value(controls.get("steps_per_frame", 1))))
+        self.background = bool(control_value(controls.get("background", False)))
+        self.steps = 0
+        self.sample = (time.perf_counter(), 0)
+
+        model = self.model
+        model_step = model.step  # the class's step, bound to this model
+
+        def step():
+            """
+            Called once per page tick instead of the model's step.
+            """
+            self.last_request = time.perf_counter()
+            if self.background:
+                self.start_thread(model, model_step)
+                return
+            with self.lock:
+                for _ in range(self.steps_per_frame):
+                    if not model.running:
+                        break
+                    model_step()
+                    self.steps += 1
+
+        model.step = step
+
+    def start_thread(self, model, model_step):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, args=(model, model_step), daemon=True)
+        self.thread.start()
+
+    def run(self, model, model_step):
+        """
+        Step the model until it stops, the server resets it or the page stops
+        asking for frames.
+        """
+        while not self.stop_event.is_set() and model.running:
+            if time.perf_counter() - self.last_request > IDLE_TIMEOUT:
+                break  # the page was stopped, the next tick starts a new thread
+            with self.lock:
+                model_step()
+                self.steps += 1
+            # Let a waiting render take the lock before the next step
+            with self.turn:
+                self.turn.wait_for(lambda: not self.renders_waiting, IDLE_TIMEOUT)
+
+    def stop_thread(self):
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+    def steps_per_second(self):
+        """
+        Steps per second since the previous call (one call per frame).
+        """
+        now, steps = time.perf_counter(), self.steps
+        last_time, last_steps = self.sample
+        self.sample = (now, steps)
+        if now <= last_time:
+            return 0.0
+        return (steps - last_steps) / (now - last_time)
+
+    def render_model(self):
+        # Never render a model in the middle of a step
+        with self.turn:
+            self.renders_waiting += 1
+        try:
+            with self.lock:
+                return super().render_model()
+        finally:
+            with self.turn:
+                self.renders_waiting -= 1
+                self.turn.notify_all()
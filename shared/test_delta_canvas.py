@@ -0,0 +1,127 @@
+# DeltaCanvasGrid must let every browser connection rebuild the model's grid
+
+import asyncio
+import base64
+import json
+
+import mesa
+import numpy as np
+import tornado.httpserver
+import tornado.testing
+import tornado.websocket
+
+from delta_canvas import DeltaCanvasGrid, encode_changes, encode_frame
+from fastforward import FastForwardServer
+
+
+def apply(picture, data):
+    """
+    Patch a client's flat picture with one rendered frame, like
+    DeltaCanvasModule.js does.
+    """
+    raw = base64.b64decode(data["cells"])
+    if data["full"]:
+        values = np.frombuffer(raw, dtype=np.uint8)
+        picture[:] = np.unpackbits(values, count=picture.size) if data["bits"] == 1 else values
+        return
+    runs = int(np.frombuffer(raw, dtype="<u4", count=1)[0])
+    header = np.frombuffer(raw, dtype="<u4", count=1 + 2 * runs)
+    values = np.frombuffer(raw, dtype=np.uint8, offset=4 * (1 + 2 * runs))
+    for start, length in zip(header[1:1 + runs], header[1 + runs:]):
+        picture[start:start + length] = values[:length]
+        values = values[length:]
+
+
+def image(cells):
+    # Image row order, top row first
+    return np.array(cells[:, ::-1].T).ravel()
+
+
+def test_encode_changes_runs():
+    frame = np.arange(10, dtype=np.uint8)
+    picture = np.zeros(10, dtype=np.uint8)
+    data = encode_changes(np.array([1, 2, 3, 7]), frame)
+    apply(picture, {"full": False, "cells": base64.b64encode(data)})
+    assert picture.tolist() == [0, 1, 2, 3, 0, 0, 0, 7, 0, 0]
+    assert np.frombuffer(data[:20], dtype="<u4").tolist() == [2, 1, 7, 3, 1]
+
+
+def test_encode_frame_packs_bits():
+    assert encode_frame(np.array([1, 0, 1, 1, 0, 0, 0, 0, 1], dtype=np.uint8)) == (1, bytes([0b10110000, 0b10000000]))
+    assert encode_frame(np.array([2, 0], dtype=np.uint8)) == (8, bytes([2, 0]))
+
+
+class Flicker(mesa.Model):
+    """
+    A few random cells flip each step.
+    """
+
+    def __init__(self, width=64, height=48, seed=None):
+        super().__init__()
+        self.cells = np.zeros((width, height), dtype=np.uint8)
+
+    def step(self):
+        for _ in range(3):
+            x, y = self.random.randrange(self.cells.shape[0]), self.random.randrange(self.cells.shape[1])
+            self.cells[x, y] ^= 1
+
+
+async def exchange(client, message):
+    await client.write_message(json.dumps(message))
+    return json.loads(await client.read_message())["data"][0]
+
+
+async def browse():
+    server = FastForwardServer(Flicker, [DeltaCanvasGrid({0: "#FFFFFF", 1: "#000000"}, 64, 48)], "Flicker",
+                               {"width": 64, "height": 48})
+    sock, port = tornado.testing.bind_unused_port()
+    http = tornado.httpserver.HTTPServer(server)
+    http.add_sockets([sock])
+    url = f"ws://127.0.0.1:{port}/ws"
+
+    async def connect():
+        client = await tornado.websocket.websocket_connect(url)
+        await client.read_message()  # model parameters
+        return client, np.zeros(64 * 48, dtype=np.uint8)
+
+    try:
+        first, first_picture = await connect()
+        apply(first_picture, await exchange(first, {"type": "reset"}))
+        for _ in range(3):
+            apply(first_picture, await exchange(first, {"type": "get_step", "step": 1}))
+            assert (first_picture == image(server.model.cells)).all()
+
+        # A second tab steps the same model; each tab gets the changes since
+        # its own last frame
+        second, second_picture = await connect()
+        sent = []
+        for client, picture in [(second, second_picture)] * 3 + [(first, first_picture)] * 2:
+            data = await exchange(client, {"type": "get_step", "step": 1})
+            sent.append(data["full"])
+            apply(picture, data)
+            assert (picture == image(server.model.cells)).all()
+        assert sent == [True, False, False, False, False]
+
+        # A reconnect starts over with a full frame
+        first.close()
+        first, first_picture = await connect()
+        data = await exchange(first, {"type": "get_step", "step": 1})
+        assert data["full"]
+        apply(first_picture, data)
+        assert (first_picture == image(server.model.cells)).all()
+        first.close()
+        second.close()
+    finally:
+        http.stop()
+
+
+def test_every_connection_rebuilds_the_grid():
+    asyncio.run(browse())
+
+
+def test_full_frames_without_a_connection():
+    element = DeltaCanvasGrid({0: "#FFFFFF", 1: "#000000"}, 64, 48)
+    model = Flicker()
+    assert element.render(model)["full"]
+    model.step()
+    assert element.render(model)["full"]